@@ -16,7 +16,9 @@ def main():
     """Main function."""
     node = kwargs["node"]
 
-    ht.nodes.colors.colorNode(node)
+    # Color the node once Houdini is idle so loading files and pasting nodes
+    # don't color each node as it is created.
+    ht.nodes.colors.queueNode(node)
 
 # =============================================================================
 
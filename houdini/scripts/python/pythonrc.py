@@ -1,9 +1 @@
 """Run code on Houdini startup."""
-
-# =============================================================================
-# IMPORTS
-# =============================================================================
-
-# Houdini Toolbox Imports
-import ht.sohohooks.aovs
-
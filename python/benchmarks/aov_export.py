@@ -0,0 +1,263 @@
+#!/usr/bin/python
+"""This script benchmarks adding automatic AOVs to the ifd.
+
+It uses the offline stand-ins in the stubs directory for the soho, IFDapi,
+IFDsettings, IFDhooks and hou modules so it can be run with regular Python
+without Houdini.  AOV definitions and lights are generated synthetically and
+AOVManager.addAOVsToIfd is run for a number of frames while scaling the light
+count, AOV count and export mode.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import argparse
+import os
+import sys
+import time
+
+# Make the stand-in modules and the ht package available.
+_BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.join(_BENCHMARK_DIR, "stubs"))
+sys.path.insert(1, os.path.dirname(_BENCHMARK_DIR))
+
+# Houdini Toolbox Imports
+from ht.sohohooks.aovs.aov import AOV, AOVGroup
+from ht.sohohooks.aovs import manager
+import ht.sohohooks.manager
+
+# Stand-in Imports
+import hou
+import soho
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The export modes to benchmark.  'component' exports the 'diffuse',
+# 'reflect' and 'refract' components for each AOV.
+EXPORT_MODES = (
+    "none",
+    "per-light",
+    "single",
+    "per-category",
+    "per-cluster",
+    "component"
+)
+
+# The number of categories lights are distributed between.
+NUM_CATEGORIES = 8
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class _PlaneCounter(object):
+    """File-like object which counts the planes written to it."""
+
+    def __init__(self):
+        self.planes = 0
+        self.size = 0
+
+    def write(self, text):
+        """Count the planes in the text."""
+        self.planes += text.count("ray_start plane")
+        self.size += len(text)
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _buildCamera(num_lights):
+    """Build a camera with a number of synthetic lights."""
+    lights = []
+
+    for idx in range(num_lights):
+        name = "light{}".format(idx)
+
+        path = "/obj/{}".format(name)
+
+        # Make the light nodes available so their changes can be watched.
+        if path not in hou.NODES:
+            hou.NODES[path] = hou.Node(path)
+
+        lights.append(
+            soho.SohoObject(
+                path,
+                {
+                    "categories": "cat{}".format(idx % NUM_CATEGORIES),
+                    "vm_export_prefix": name,
+                    "vm_export_suffix": "",
+                }
+            )
+        )
+
+    return soho.SohoCamera(
+        "/obj/cam1",
+        {"vm_exportcomponents": "diffuse reflect refract"},
+        lights
+    )
+
+
+def _buildManager(num_aovs, mode):
+    """Build an AOVManager with a number of synthetic AOVs and a group
+    containing them.
+
+    """
+    aov_manager = manager.AOVManager()
+
+    group = AOVGroup("benchmark")
+
+    for idx in range(num_aovs):
+        data = {
+            "variable": "aov{}".format(idx),
+            "vextype": "vector",
+            "quantize": "half",
+        }
+
+        if mode == "component":
+            data["componentexport"] = True
+
+        elif mode != "none":
+            data["lightexport"] = mode
+
+        aov = AOV(data)
+
+        aov_manager.addAOV(aov)
+        group.aovs.append(aov)
+
+    aov_manager.addGroup(group)
+
+    # Make the manager the one used by addAOVsToIfd.
+    hou.session.aov_manager = aov_manager
+
+    return aov_manager
+
+
+def _runScenario(num_lights, num_aovs, mode, num_frames):
+    """Run addAOVsToIfd for a number of frames, returning the first frame
+    time, the average time of the remaining frames and the planes per frame.
+
+    """
+    cam = _buildCamera(num_lights)
+    cam.parms["auto_aovs"] = "@benchmark"
+
+    _buildManager(num_aovs, mode)
+
+    counter = _PlaneCounter()
+    times = []
+
+    stdout = sys.stdout
+    sys.stdout = counter
+
+    try:
+        for frame in range(1, num_frames + 1):
+            start = time.time()
+
+            manager.AOVManager.addAOVsToIfd(None, cam, frame / 24.0)
+
+            times.append(time.time() - start)
+
+    finally:
+        sys.stdout = stdout
+
+    if len(times) > 1:
+        average = sum(times[1:]) / (len(times) - 1)
+
+    else:
+        average = times[0]
+
+    return times[0], average, counter.planes / num_frames
+
+
+def _parseArgs():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark adding automatic AOVs to the ifd."
+    )
+
+    parser.add_argument(
+        "--lights",
+        nargs="+",
+        type=int,
+        default=[10, 100, 1000, 10000],
+        help="Light counts to benchmark."
+    )
+
+    parser.add_argument(
+        "--aovs",
+        nargs="+",
+        type=int,
+        default=[1, 5, 20],
+        help="AOV counts to benchmark."
+    )
+
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=EXPORT_MODES,
+        default=list(EXPORT_MODES),
+        help="Export modes to benchmark."
+    )
+
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=5,
+        help="Number of frames to generate for each scenario."
+    )
+
+    parser.add_argument(
+        "--hooks",
+        action="store_true",
+        help="Register no-op 'pre_defplane' and 'post_defplane' hooks."
+    )
+
+    return parser.parse_args()
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def main():
+    """Main function."""
+    args = _parseArgs()
+
+    if args.hooks:
+        hook_manager = ht.sohohooks.manager.getManager()
+
+        hook_manager.registerHook("pre_defplane", lambda *args: False)
+        hook_manager.registerHook("post_defplane", lambda *args: False)
+
+    row = "{:<14}{:>8}{:>6}{:>10}{:>14}{:>14}"
+
+    print row.format("mode", "lights", "aovs", "planes", "first (s)", "frame (s)")
+
+    for mode in args.modes:
+        for num_lights in args.lights:
+            for num_aovs in args.aovs:
+                first, average, planes = _runScenario(
+                    num_lights,
+                    num_aovs,
+                    mode,
+                    args.frames
+                )
+
+                print row.format(
+                    mode,
+                    num_lights,
+                    num_aovs,
+                    planes,
+                    "{:0.5f}".format(first),
+                    "{:0.5f}".format(average)
+                )
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
+
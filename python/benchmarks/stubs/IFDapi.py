@@ -0,0 +1,42 @@
+"""Offline stand-in for the SOHO IFDapi module.
+
+Output is written to sys.stdout like the real module.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import sys
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def ray_comment(comment):
+    """Write a comment."""
+    sys.stdout.write("# {}\n".format(comment))
+
+
+def ray_end():
+    """End a block."""
+    sys.stdout.write("ray_end\n")
+
+
+def ray_property(style, name, value):
+    """Write a property."""
+    sys.stdout.write(
+        "\tray_property {} {} {}\n".format(
+            style,
+            name,
+            ' '.join(['"{}"'.format(val) for val in value])
+        )
+    )
+
+
+def ray_start(block_type):
+    """Start a block."""
+    sys.stdout.write("ray_start {}\n".format(block_type))
+
@@ -0,0 +1,24 @@
+"""Offline stand-in for the SOHO IFDhooks module.
+
+Hooks are dispatched to the Houdini Toolbox soho hook manager the same way as
+houdini/soho/IFDuserhooks.py.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Houdini Toolbox Imports
+import ht.sohohooks.manager
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def call(hook_name="", *args, **kwargs):
+    """Hook callback function."""
+    manager = ht.sohohooks.manager.getManager()
+
+    return manager.callHook(hook_name, *args, **kwargs)
+
@@ -0,0 +1,8 @@
+"""Offline stand-in for the SOHO IFDsettings module."""
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+_GenerateOpId = False
+
@@ -0,0 +1,310 @@
+"""Offline stand-in for the hou module.
+
+Only the functionality needed to import and use the AOV manager and the node
+color manager is provided.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import colorsys
+import contextlib
+import fnmatch
+import os
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class Color(object):
+    """Stand-in for hou.Color.  Values are stored as RGB.  LAB and XYZ
+    values are stored unconverted.
+
+    """
+
+    def __init__(self, rgb=(0.0, 0.0, 0.0)):
+        self._rgb = tuple(rgb)
+
+    def __eq__(self, color):
+        return isinstance(color, Color) and self._rgb == color._rgb
+
+    def __ne__(self, color):
+        return not self == color
+
+    def __repr__(self):
+        return "<hou.Color r={}, g={}, b={}>".format(*self._rgb)
+
+    def hsl(self):
+        """Get the HSL value."""
+        hue, lightness, saturation = colorsys.rgb_to_hls(*self._rgb)
+
+        return (hue * 360, saturation, lightness)
+
+    def hsv(self):
+        """Get the HSV value."""
+        hue, saturation, value = colorsys.rgb_to_hsv(*self._rgb)
+
+        return (hue * 360, saturation, value)
+
+    def rgb(self):
+        """Get the RGB value."""
+        return self._rgb
+
+    def setHSL(self, value):
+        """Set the color from an HSL value."""
+        self._rgb = colorsys.hls_to_rgb(value[0] / 360.0, value[2], value[1])
+
+    def setHSV(self, value):
+        """Set the color from an HSV value."""
+        self._rgb = colorsys.hsv_to_rgb(value[0] / 360.0, value[1], value[2])
+
+    def setLAB(self, value):
+        """Set the color from a LAB value."""
+        self._rgb = tuple(value)
+
+    def setRGB(self, value):
+        """Set the color from an RGB value."""
+        self._rgb = tuple(value)
+
+    def setXYZ(self, value):
+        """Set the color from an XYZ value."""
+        self._rgb = tuple(value)
+
+
+class Node(object):
+    """Stand-in for hou.Node.  Only parameters and event callbacks are
+    provided.
+
+    Nodes added to NODES are found by node().
+
+    """
+
+    def __init__(self, path, time_dependent=()):
+        self._callbacks = []
+        self._path = path
+        self._time_dependent = set(time_dependent)
+
+    def __repr__(self):
+        return "<hou.Node {}>".format(self._path)
+
+    def addEventCallback(self, event_types, callback):
+        """Add an event callback."""
+        self._callbacks.append((tuple(event_types), callback))
+
+    def eventCallbacks(self):
+        """Get a tuple of (event types, callback) tuples."""
+        return tuple(self._callbacks)
+
+    def parm(self, name):
+        """Get a parameter.  Every parameter exists."""
+        return Parm(name, name in self._time_dependent)
+
+    def path(self):
+        """Get the path of the node."""
+        return self._path
+
+    def sendEvent(self, event_type):
+        """Call the callbacks for an event type."""
+        for event_types, callback in list(self._callbacks):
+            if event_type in event_types:
+                callback(event_type=event_type, node=self)
+
+
+class ObjectWasDeleted(Exception):
+    """Stand-in for hou.ObjectWasDeleted."""
+    pass
+
+
+class OperationFailed(Exception):
+    """Stand-in for hou.OperationFailed."""
+    pass
+
+
+class Parm(object):
+    """Stand-in for hou.Parm."""
+
+    def __init__(self, name, time_dependent=False):
+        self._name = name
+        self._time_dependent = time_dependent
+
+    def isTimeDependent(self):
+        """Whether the value of the parameter is animated."""
+        return self._time_dependent
+
+    def name(self):
+        """Get the name of the parameter."""
+        return self._name
+
+
+class _Session(object):
+    """Stand-in for the hou.session module."""
+    pass
+
+
+class _Shelves(object):
+    """Stand-in for the hou.shelves module.  There are no tools."""
+
+    def defaultToolName(self, category_name, type_name):
+        """Get the default tool name for a node type."""
+        return "{}_{}".format(category_name.lower(), type_name)
+
+    def tools(self):
+        """Get a dictionary of all the tools."""
+        return {}
+
+
+class _UI(object):
+    """Stand-in for the hou.ui module.
+
+    Event loop callbacks are stored and only run by runEventLoopCallbacks().
+
+    """
+
+    def __init__(self):
+        self.callbacks = []
+        self.update_mode = updateMode.AutoUpdate
+
+    def addEventLoopCallback(self, callback):
+        """Add an event loop callback."""
+        self.callbacks.append(callback)
+
+    def removeEventLoopCallback(self, callback):
+        """Remove an event loop callback."""
+        self.callbacks.remove(callback)
+
+    def runEventLoopCallbacks(self):
+        """Run each event loop callback once."""
+        for callback in list(self.callbacks):
+            callback()
+
+    def setUpdateMode(self, mode):
+        """Set the update mode."""
+        self.update_mode = mode
+
+
+class _Undos(object):
+    """Stand-in for the hou.undos module."""
+
+    def __init__(self):
+        # The labels of undo groups which were entered.
+        self.groups = []
+
+    @contextlib.contextmanager
+    def disabler(self):
+        """Disable undos."""
+        yield
+
+    @contextlib.contextmanager
+    def group(self, label):
+        """Group undos."""
+        self.groups.append(label)
+        yield
+
+# =============================================================================
+
+
+class colorType(object):
+    """Stand-in for hou.colorType."""
+    HSL = "HSL"
+    HSV = "HSV"
+    LAB = "LAB"
+    RGB = "RGB"
+    XYZ = "XYZ"
+
+
+class nodeEventType(object):
+    """Stand-in for hou.nodeEventType."""
+    BeingDeleted = "BeingDeleted"
+    NameChanged = "NameChanged"
+    ParmTupleChanged = "ParmTupleChanged"
+
+
+class updateMode(object):
+    """Stand-in for hou.updateMode."""
+    AutoUpdate = "AutoUpdate"
+    Manual = "Manual"
+    OnMouseUp = "OnMouseUp"
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def findDirectories(directory_name):
+    """No directories are ever found."""
+    raise OperationFailed()
+
+
+def findFiles(file_name):
+    """No files are ever found."""
+    raise OperationFailed()
+
+
+def homeHoudiniDirectory():
+    """Get the user's Houdini directory.  Uses $HOUDINI_USER_PREF_DIR if
+    it is set.
+
+    """
+    return os.environ.get(
+        "HOUDINI_USER_PREF_DIR",
+        os.path.expanduser("~/houdini")
+    )
+
+
+def isUIAvailable():
+    """Whether the interface is available.  Set UI_AVAILABLE to change."""
+    return UI_AVAILABLE
+
+
+def node(path):
+    """Get a node added to NODES."""
+    return NODES.get(path)
+
+
+def nodeType(category, name):
+    """No node types are installed."""
+    return None
+
+
+def nodeTypeCategories():
+    """There are no node type categories."""
+    return {}
+
+
+def patternMatch(pattern, string):
+    """Match a string against a space separated list of patterns, which
+    may exclude strings using '^'.
+
+    """
+    matched = False
+
+    for part in pattern.split():
+        if part.startswith('^'):
+            if fnmatch.fnmatchcase(string, part[1:]):
+                matched = False
+
+        elif fnmatch.fnmatchcase(string, part):
+            matched = True
+
+    return matched
+
+
+def updateModeSetting():
+    """Get the current update mode."""
+    return ui.update_mode
+
+# =============================================================================
+
+NODES = {}
+
+UI_AVAILABLE = False
+
+session = _Session()
+
+shelves = _Shelves()
+
+ui = _UI()
+
+undos = _Undos()
@@ -0,0 +1,149 @@
+"""Offline stand-in for the SOHO soho module.
+
+Only the functionality used by the AOV export code is provided.  Objects are
+backed by synthetic data so IFD generation code can be exercised without
+running SOHO inside Houdini.
+
+"""
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class SohoObject(object):
+    """Stand-in for a SOHO object with parameter values in a dictionary."""
+
+    def __init__(self, name, parms=None):
+        self._name = name
+        self._parms = parms or {}
+
+    def __repr__(self):
+        return "<SohoObject {}>".format(self.getName())
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def parms(self):
+        """Dictionary of parameter values."""
+        return self._parms
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def evalFloat(self, name, now, value):
+        """Evaluate a float parameter, appending the values to the list."""
+        if name not in self.parms:
+            return False
+
+        value.extend(self.parms[name])
+
+        return True
+
+    def evalString(self, name, now, value):
+        """Evaluate a string parameter, appending the value to the list."""
+        if name not in self.parms:
+            return False
+
+        value.append(self.parms[name])
+
+        return True
+
+    def getDefaultedString(self, name, now, default):
+        """Evaluate a string parameter, returning the default if it doesn't
+        exist.
+
+        """
+        if name not in self.parms:
+            return default
+
+        return [self.parms[name]]
+
+    def getName(self):
+        """The full path of the object."""
+        return self._name
+
+
+class SohoCamera(SohoObject):
+    """Stand-in for a SOHO camera object."""
+
+    def __init__(self, name, parms=None, lights=()):
+        super(SohoCamera, self).__init__(name, parms)
+
+        self._lights = list(lights)
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def lights(self):
+        """List of lights available to the camera."""
+        return self._lights
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def objectList(self, object_type, now, scope="*", select="*"):
+        """Get a list of objects.  All the lights are always returned."""
+        if object_type == "objlist:light":
+            return list(self.lights)
+
+        return []
+
+    def wrangleInt(self, wrangler, name, now, default):
+        """Evaluate an int parameter, returning the default if it doesn't
+        exist.
+
+        """
+        return list(self.parms.get(name, default))
+
+    def wrangle(self, wrangler, parms, now):
+        """Evaluate a dictionary of SohoParms."""
+        plist = {}
+
+        for parm in parms.itervalues():
+            value = self.parms.get(parm.name, parm.default[0])
+
+            plist[parm.name] = SohoParm(
+                parm.name,
+                parm.type,
+                [value],
+                parm.skipdefault
+            )
+
+        return plist
+
+
+class SohoParm(object):
+    """Stand-in for a SOHO parameter."""
+
+    def __init__(self, name, parm_type, default, skipdefault=True):
+        self.default = default
+        self.name = name
+        self.skipdefault = skipdefault
+        self.type = parm_type
+        self.Value = default
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def error(message):
+    """Record an error."""
+    ERRORS.append(message)
+
+
+def getOutputDriver():
+    """Get the output driver."""
+    return OUTPUT_DRIVER
+
+# =============================================================================
+
+ERRORS = []
+
+OUTPUT_DRIVER = SohoObject("/out/mantra1")
+
@@ -7,12 +7,26 @@ colors in Houdini.
 # IMPORTS
 # =============================================================================
 
+# Standard Library Imports
+import sys
+import time
+
 # Houdini Toolbox Imports
 from ht.nodes.colors.manager import ColorManager
 
 # Houdini Imports
 import hou
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The state of the color file watcher.
+_WATCHER = {
+    "interval": None,
+    "last_poll": 0,
+}
+
 # =============================================================================
 # NON-PUBLIC FUNCTIONS
 # =============================================================================
@@ -30,6 +44,33 @@ def _findSessionColorManager():
 
     return manager
 
+
+def _pollColorFiles():
+    """Event loop callback to update the session color manager when the
+    color files change.
+
+    """
+    now = time.time()
+
+    if now - _WATCHER["last_poll"] < _WATCHER["interval"]:
+        return
+
+    _WATCHER["last_poll"] = now
+
+    # Try to find the session color manager.
+    manager = _findSessionColorManager()
+
+    # If one exists, update it from any changed files.
+    if manager is not None:
+        try:
+            manager.update()
+
+        # Errors can't be raised into the event loop.  The manager keeps its
+        # previous colors and doesn't read the files again until they change,
+        # so the error is only reported once.
+        except Exception as e:
+            sys.stderr.write("Could not update node colors: {}\n".format(e))
+
 # =============================================================================
 # FUNCTIONS
 # =============================================================================
@@ -60,6 +101,16 @@ def colorNodeByName(node):
         manager.colorNodeByName(node)
 
 
+def colorNodes(nodes):
+    """Color a number of nodes given their properties and names."""
+    # Try to find the session color manager.
+    manager = _findSessionColorManager()
+
+    # If one exists, use it to try to color the nodes.
+    if manager is not None:
+        manager.colorNodes(nodes)
+
+
 def createSessionColorManager():
     """Create a new ColorManager object and store it in
     hou.session.color_manager.
@@ -68,3 +119,48 @@ def createSessionColorManager():
     manager = ColorManager()
     hou.session.color_manager = manager
 
+
+def queueNode(node):
+    """Queue a node to be colored given its properties the next time
+    Houdini is idle.
+
+    """
+    # Try to find the session color manager.
+    manager = _findSessionColorManager()
+
+    # If one exists, use it to queue the node.
+    if manager is not None:
+        manager.queueNode(node)
+
+
+def recolorScene(root=None):
+    """Color all the nodes inside a node, or the entire scene."""
+    # Try to find the session color manager.
+    manager = _findSessionColorManager()
+
+    # If one exists, use it to try to color the nodes.
+    if manager is not None:
+        manager.recolorScene(root)
+
+
+def startWatching(interval=10):
+    """Watch the color files for changes, checking every interval seconds.
+
+    When files change the session color manager is updated and existing
+    nodes are recolored.  The session color manager is found on each check
+    so the watcher keeps working after other files are loaded.
+
+    """
+    if _WATCHER["interval"] is None:
+        hou.ui.addEventLoopCallback(_pollColorFiles)
+
+    _WATCHER["interval"] = interval
+    _WATCHER["last_poll"] = time.time()
+
+
+def stopWatching():
+    """Stop watching the color files for changes."""
+    if _WATCHER["interval"] is not None:
+        hou.ui.removeEventLoopCallback(_pollColorFiles)
+
+        _WATCHER["interval"] = None
@@ -7,6 +7,22 @@
 # Standard Library Imports
 import re
 
+# Houdini Imports
+import hou
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# Python's re module supports at most 100 groups per expression.
+_MAX_PATTERN_GROUPS = 99
+
+# Characters which make an entry name a pattern.
+_PATTERN_CHARS = re.compile(r"[*?\[\]^ ]")
+
+# Characters which need hou.patternMatch to match a pattern.
+_COMPLEX_PATTERN_CHARS = re.compile(r"[\[\]^ ]")
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -182,3 +198,116 @@ class ConstantEntry(object):
         """The name the color is mapped to."""
         return self._name
 
+
+class EntryMatcher(object):
+    """This class matches names against a category of color entries.
+
+    Entries with plain names are looked up by name and wildcard patterns are
+    compiled into a single expression so a name is matched without checking
+    each entry.  The first matching entry in the category order is returned,
+    the same as checking each entry with hou.patternMatch.
+
+    """
+
+    def __init__(self, entries):
+        # Dictionary of exact entry names to (index, entry) tuples.
+        self._exact = {}
+
+        # List of (index, entry) tuples for patterns using only '*' and '?'.
+        patterns = []
+
+        # List of (index, entry) tuples for patterns hou needs to match.
+        self._complex = []
+
+        for idx, entry in enumerate(entries):
+            name = entry.name
+
+            if _COMPLEX_PATTERN_CHARS.search(name):
+                self._complex.append((idx, entry))
+
+            elif _PATTERN_CHARS.search(name):
+                patterns.append((idx, entry))
+
+            else:
+                self._exact.setdefault(name, (idx, entry))
+
+        self._expressions = []
+        self._patterns = patterns
+
+        for start in range(0, len(patterns), _MAX_PATTERN_GROUPS):
+            chunk = patterns[start:start + _MAX_PATTERN_GROUPS]
+
+            alternatives = [
+                "(?P<p{}>{})".format(
+                    start + offset,
+                    _translatePattern(entry.name)
+                )
+                for offset, (_, entry) in enumerate(chunk)
+            ]
+
+            self._expressions.append(
+                re.compile("(?:{})\\Z".format("|".join(alternatives)), re.S)
+            )
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<EntryMatcher ({} entries)>".format(
+            len(self._exact) + len(self._patterns) + len(self._complex)
+        )
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def match(self, name):
+        """Find the first entry matching a name."""
+        result = self._exact.get(name)
+
+        for expression in self._expressions:
+            match = expression.match(name)
+
+            if match is not None:
+                found = self._patterns[int(match.lastgroup[1:])]
+
+                if result is None or found[0] < result[0]:
+                    result = found
+
+                # Expressions are in entry order so later ones can't match an
+                # earlier entry.
+                break
+
+        for idx, entry in self._complex:
+            if result is not None and idx > result[0]:
+                break
+
+            if hou.patternMatch(entry.name, name):
+                result = (idx, entry)
+                break
+
+        if result is None:
+            return None
+
+        return result[1]
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _translatePattern(pattern):
+    """Translate a pattern using '*' and '?' wildcards to an expression."""
+    parts = []
+
+    for char in pattern:
+        if char == '*':
+            parts.append(".*")
+
+        elif char == '?':
+            parts.append(".")
+
+        else:
+            parts.append(re.escape(char))
+
+    return "".join(parts)
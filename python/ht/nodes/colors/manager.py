@@ -8,17 +8,38 @@ colors in Houdini.
 # =============================================================================
 
 # Standard Library Imports
+import cPickle
 import glob
 import json
 import os
+import tempfile
 
 # Houdini Toolbox Imports
 from ht.nodes.colors.colors import ColorConstant, ColorEntry, ConstantEntry
+from ht.nodes.colors.colors import EntryMatcher
 import ht.utils
 
 # Houdini Imports
 import hou
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The version of the compiled mappings format.  Change this when the format
+# changes so older cache files are ignored.
+_CACHE_VERSION = 2
+
+# The name of the compiled mappings cache file in the user's Houdini
+# directory.
+_CACHE_FILE_NAME = "ht_node_colors.cache"
+
+# The key and the constants, entries and file data last built in this
+# session.  Python
+# modules persist between files being loaded so managers created for later
+# files can reuse them without building their colors again.
+_COMPILED_MAPPINGS = {}
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -31,10 +52,22 @@ class ColorManager(object):
 
     def __init__(self):
         self._constants = {}
+        self._file_data = {}
+        self._key = None
+        self._matchers = {}
         self._names = {}
         self._nodes = {}
+        self._queue = []
+        self._tool_locations = None
         self._tools = {}
 
+        # Whether the tool locations table was built since Houdini was last
+        # idle.
+        self._tool_locations_current = False
+
+        # Resolved colors of node types, or None if a type has no color.
+        self._type_colors = {}
+
         # Build mappings for this object.
         self._buildMappings()
 
@@ -125,29 +158,200 @@ class ColorManager(object):
                                 path
                             )
 
-    def _buildMappings(self):
-        """Build mappings from files."""
+    def _buildMappings(self, use_cache=True):
+        """Build mappings from files.
+
+        If the files haven't changed since mappings were last built the
+        compiled mappings are used instead of reading the files.
+
+        """
         files = _findFiles()
 
+        key = _getCacheKey(files)
+
+        self._key = key
+
+        if use_cache:
+            built = _getSessionMappings(key)
+
+            if built is not None:
+                self._setBuiltMappings(built)
+                return
+
+            compiled = _loadCompiledMappings(key)
+
+            if compiled is not None:
+                self._setCompiledMappings(compiled)
+                _setSessionMappings(key, self._getBuiltMappings())
+                return
+
         all_data = []
 
-        # Read all the target files in reverse.
-        for path in reversed(files):
-            # Open the target file.
-            with open(path) as handle:
-                # Load the json data and convert the data from unicde.
-                data = json.load(
-                    handle,
-                    object_hook=ht.utils.convertFromUnicode
-                )
+        file_data = {}
+
+        # Read all the target files in reverse.  Files which haven't changed
+        # since they were last read by this manager aren't read again.
+        for path, mtime, size in reversed(key[1:]):
+            state = (mtime, size)
+
+            if path in self._file_data and self._file_data[path][0] == state:
+                data = self._file_data[path][1]
 
-            data["path"] = path
+            else:
+                # Open the target file.
+                with open(path) as handle:
+                    # Load the json data and convert the data from unicde.
+                    data = json.load(
+                        handle,
+                        object_hook=ht.utils.convertFromUnicode
+                    )
+
+                data["path"] = path
+
+            file_data[path] = (state, data)
             all_data.append(data)
 
+        self._file_data = file_data
+
         self._buildConstantsFromData(all_data)
 
         self._buildEntriesFromData(all_data)
 
+        _saveCompiledMappings(key, self._getCompiledMappings())
+        _setSessionMappings(key, self._getBuiltMappings())
+
+    def _colorNodes(self, nodes, by_name=True):
+        """Color nodes by their type and optionally then their name."""
+        for node in nodes:
+            color = self._getResolvedTypeColor(node.type())
+
+            # A name entry takes precedence the same as when a node is
+            # renamed after being created.
+            if by_name:
+                name_color = self._getNameEntry(node)
+
+                if name_color is not None:
+                    color = name_color
+
+            # Only set colors which are different to avoid needlessly
+            # modifying nodes.
+            if color is not None and node.color() != color:
+                node.setColor(color)
+
+    def _colorQueuedNodes(self):
+        """Event loop callback to color all the queued nodes."""
+        hou.ui.removeEventLoopCallback(self._colorQueuedNodes)
+
+        queue = self._queue
+        self._queue = []
+
+        nodes = []
+
+        for node in queue:
+            # Nodes may have been deleted since they were queued.
+            try:
+                color = node.color()
+
+            except hou.ObjectWasDeleted:
+                continue
+
+            # Nodes which have been colored since they were created, such as
+            # by their name or a tool script, keep their color.
+            if color != node.type().defaultColor():
+                continue
+
+            nodes.append(node)
+
+        # The colors are recorded as an undo group so redoing creating the
+        # nodes is followed by redoing their colors.
+        with hou.undos.group("Color nodes"):
+            with ht.utils.updateMode(hou.updateMode.Manual):
+                self._colorNodes(nodes, by_name=False)
+
+    def _clearMappings(self):
+        """Clear all the mappings and anything derived from them."""
+        self.constants.clear()
+        self._matchers.clear()
+        self.names.clear()
+        self.nodes.clear()
+        self.tools.clear()
+        self._type_colors.clear()
+
+    def _expireToolLocations(self):
+        """Event loop callback to allow the tool locations table to be
+        rebuilt.
+
+        """
+        hou.ui.removeEventLoopCallback(self._expireToolLocations)
+
+        self._tool_locations_current = False
+
+    def _getBuiltMappings(self):
+        """Get copies of the constants, entry mappings and file data."""
+        entries = dict(
+            (
+                assign_type,
+                dict(
+                    (category_name, category_entries.copy())
+                    for category_name, category_entries in
+                    getattr(self, assign_type).iteritems()
+                )
+            )
+            for assign_type in ("names", "nodes", "tools")
+        )
+
+        return self.constants.copy(), entries, self._file_data.copy()
+
+    def _getCompiledMappings(self):
+        """Get the constants, entries and file data as data which can be
+        pickled.
+
+        The data read from each file is included so only changed files need
+        to be read when updating.
+
+        """
+        constants = [
+            (
+                name,
+                constant.color.rgb(),
+                constant.color_type,
+                constant.file_path
+            )
+            for name, constant in self.constants.iteritems()
+        ]
+
+        entries = {}
+
+        for assign_type in ("names", "nodes", "tools"):
+            categories = entries[assign_type] = {}
+
+            for category_name, category_entries in \
+                    getattr(self, assign_type).iteritems():
+                compiled = categories[category_name] = []
+
+                for entry in category_entries.itervalues():
+                    if isinstance(entry, ConstantEntry):
+                        compiled.append(
+                            (
+                                entry.name,
+                                "constant",
+                                entry.constant_name,
+                                entry.file_path
+                            )
+                        )
+
+                    else:
+                        compiled.append(
+                            (
+                                entry.name,
+                                entry.color_type,
+                                entry.color.rgb(),
+                                entry.file_path
+                            )
+                        )
+
+        return constants, entries, self._file_data
+
     def _getManagerGeneratorColor(self, node_type):
         """Look for a color match based on the node type being a manager or
         generator type.
@@ -174,6 +378,74 @@ class ColorManager(object):
 
         return None
 
+    def _getMatcher(self, assign_type, category_name):
+        """Get an EntryMatcher for the entries of a category of an
+        assignment type.
+
+        Returns None if the category has no entries.
+
+        """
+        key = (assign_type, category_name)
+
+        if key not in self._matchers:
+            entries = getattr(self, assign_type).get(category_name)
+
+            matcher = None
+
+            if entries:
+                matcher = EntryMatcher(entries.values())
+
+            self._matchers[key] = matcher
+
+        return self._matchers[key]
+
+    def _getNameChanges(self, old_names, old_constants, old_colors):
+        """Get the nodes in the scene whose name entry color changed and
+        their new colors.
+
+        """
+        old_matchers = _buildNameMatchers(old_names)
+
+        changes = []
+
+        for node in hou.node("/").allSubChildren():
+            if node.isInsideLockedHDA():
+                continue
+
+            old_color = _getNameColor(old_matchers, old_constants, node)
+            color = self._getNameEntry(node)
+
+            if color is None or old_color is None:
+                if color is old_color:
+                    continue
+
+            elif color == old_color:
+                continue
+
+            node_type = node.type()
+
+            # Nodes which didn't match a name entry have their type color.
+            if old_color is None:
+                old_color = old_colors.get(
+                    (node_type.category().name(), node_type.name())
+                )
+
+                if old_color is None:
+                    old_color = node_type.defaultColor()
+
+            # Nodes which no longer match a name entry get their type color.
+            if color is None:
+                color = self._getResolvedTypeColor(node_type)
+
+                if color is None:
+                    color = node_type.defaultColor()
+
+            # Nodes with other colors have been colored by hand.
+            if node.color() == old_color:
+                changes.append(((node,), color))
+
+        return changes
+
     def _getNameEntry(self, node):
         """Look for a color match based on the node name."""
         # The node name.
@@ -182,12 +454,15 @@ class ColorManager(object):
         categories = (node.type().category().name(), "all")
 
         for category_name in categories:
+            matcher = self._getMatcher("names", category_name)
+
             # Check for entries for the node type category.
-            if category_name in self.names:
+            if matcher is not None:
                 # Check if the name matches any of the category entries.
-                for color_entry in self.names[category_name].itervalues():
-                    if hou.patternMatch(color_entry.name, name):
-                        return self._resolveEntry(color_entry)
+                color_entry = matcher.match(name)
+
+                if color_entry is not None:
+                    return self._resolveEntry(color_entry)
 
         return None
 
@@ -199,22 +474,80 @@ class ColorManager(object):
         categories = (node_type.category().name(), "all")
 
         for category_name in categories:
+            matcher = self._getMatcher("tools", category_name)
+
             # Check for entries for the node type category.
-            if category_name in self.tools:
+            if matcher is not None:
                 # Get any Tab menu locations the node type might show up in.
-                menu_locations = _getToolMenuLocations(node_type)
+                menu_locations = self._getToolMenuLocations(node_type)
 
                 # Process the locations, looking for the first match.
                 for location in menu_locations:
-                    # Check if the node name is in the mapping.
-
                     # Check if the location matches any of the category entries.
-                    for color_entry in self.tools[category_name].itervalues():
-                        if hou.patternMatch(color_entry.name, location):
-                            return self._resolveEntry(color_entry)
+                    color_entry = matcher.match(location)
+
+                    if color_entry is not None:
+                        return self._resolveEntry(color_entry)
 
         return None
 
+    def _getResolvedTypeColor(self, node_type):
+        """Get the color of a node type, resolving it the first time the type
+        is seen.
+
+        The color only depends on the node type and the loaded mappings so
+        it is stored until the mappings are reloaded.
+
+        """
+        key = (node_type.category().name(), node_type.name())
+
+        if key not in self._type_colors:
+            # Look for a match with the node type name.
+            color = self._getTypeColor(node_type)
+
+            # Look for a match given the node's Tab menu entries.
+            if color is None:
+                color = self._getToolColor(node_type)
+
+            if color is None:
+                # Check if the node is a manager or generator.
+                if node_type.isManager() or node_type.isGenerator():
+                    color = self._getManagerGeneratorColor(node_type)
+
+            self._type_colors[key] = color
+
+        return self._type_colors[key]
+
+    def _getToolMenuLocations(self, node_type):
+        """Get any Tab menu locations the tool for the node type lives in.
+
+        The locations of all tools are stored in a table built the first time
+        it is needed.  The table is rebuilt when a tool isn't found in it in
+        case the tool was added after it was built, but at most once each
+        time Houdini is idle, or once without an interface.
+
+        """
+        # Figure out what the tool name should be for the give node type
+        # information.
+        tool_name = hou.shelves.defaultToolName(
+            node_type.category().name(),
+            node_type.name()
+        )
+
+        if self._tool_locations is None or (
+                tool_name not in self._tool_locations and
+                not self._tool_locations_current
+        ):
+            self._tool_locations = _buildToolMenuLocations()
+
+            # Only register the callback for the first rebuild.
+            if not self._tool_locations_current and hou.isUIAvailable():
+                hou.ui.addEventLoopCallback(self._expireToolLocations)
+
+            self._tool_locations_current = True
+
+        return self._tool_locations.get(tool_name, ())
+
     def _getTypeColor(self, node_type):
         """Look for a color match based on the node type's name."""
         type_name = node_type.nameComponents()[2]
@@ -224,16 +557,74 @@ class ColorManager(object):
         categories = (node_type.category().name(), "all")
 
         for category_name in categories:
+            matcher = self._getMatcher("nodes", category_name)
+
             # Check if the category has any entries.
-            if category_name in self.nodes:
+            if matcher is not None:
                 # Check if the node type name matches any of the category
                 # entries.
-                for color_entry in self.nodes[category_name].itervalues():
-                    if hou.patternMatch(color_entry.name, type_name):
-                        return self._resolveEntry(color_entry)
+                color_entry = matcher.match(type_name)
+
+                if color_entry is not None:
+                    return self._resolveEntry(color_entry)
 
         return None
 
+    def _setBuiltMappings(self, built):
+        """Set the constants, entries and file data from built mappings.
+
+        The constant and entry objects are shared but the dictionaries
+        holding them are not.
+
+        """
+        constants, entries, file_data = built
+
+        self._file_data = file_data.copy()
+
+        self.constants.update(constants)
+
+        for assign_type, categories in entries.iteritems():
+            color_type_map = getattr(self, assign_type)
+
+            for category_name, category_entries in categories.iteritems():
+                color_type_map[category_name] = category_entries.copy()
+
+    def _setCompiledMappings(self, compiled):
+        """Build the constants and entries from compiled mappings."""
+        constants, entries, file_data = compiled
+
+        self._file_data = file_data.copy()
+
+        for name, rgb, color_type, path in constants:
+            self.constants[name] = ColorConstant(
+                name,
+                _buildRGBColor(rgb),
+                color_type,
+                path
+            )
+
+        for assign_type, categories in entries.iteritems():
+            color_type_map = getattr(self, assign_type)
+
+            for category_name, category_entries in categories.iteritems():
+                category_list = color_type_map.setdefault(category_name, {})
+
+                for entry_name, color_type, value, path in category_entries:
+                    if color_type == "constant":
+                        category_list[entry_name] = ConstantEntry(
+                            entry_name,
+                            value,
+                            path
+                        )
+
+                    else:
+                        category_list[entry_name] = ColorEntry(
+                            entry_name,
+                            _buildRGBColor(value),
+                            color_type,
+                            path
+                        )
+
     def _resolveEntry(self, entry):
         # If the entry object is a ColorEntry then we can just return the
         # color.
@@ -283,19 +674,7 @@ class ColorManager(object):
         is a manager or generator type.
 
         """
-        node_type = node.type()
-
-        # Look for a match with the node type name.
-        color = self._getTypeColor(node_type)
-
-        # Look for a match given the node's Tab menu entries.
-        if color is None:
-            color = self._getToolColor(node_type)
-
-        if color is None:
-            # Check if the node is a manager or generator.
-            if node_type.isManager() or node_type.isGenerator():
-                color = self._getManagerGeneratorColor(node_type)
+        color = self._getResolvedTypeColor(node.type())
 
         # If a color was found, set it.
         if color is not None:
@@ -310,14 +689,169 @@ class ColorManager(object):
         if color is not None:
             node.setColor(color)
 
+    def colorNodes(self, nodes):
+        """Color a number of nodes given their properties and names.
+
+        The color of each node type is only resolved once.  The colors are
+        applied in a single undo group and without updating the interface
+        after each node.
+
+        """
+        with hou.undos.group("Color nodes"):
+            if hou.isUIAvailable():
+                with ht.utils.updateMode(hou.updateMode.Manual):
+                    self._colorNodes(nodes)
+
+            else:
+                self._colorNodes(nodes)
+
+    def queueNode(self, node):
+        """Queue a node to be colored given its properties.
+
+        Queued nodes are colored together the next time Houdini is idle,
+        such as after a file is loaded or nodes are pasted.  Only nodes
+        which still have their default color by then are colored.  If there
+        is no interface the node is colored immediately.
+
+        """
+        if not hou.isUIAvailable():
+            self.colorNode(node)
+            return
+
+        # Only register the callback for the first node.
+        if not self._queue:
+            hou.ui.addEventLoopCallback(self._colorQueuedNodes)
+
+        self._queue.append(node)
+
+    def recolorScene(self, root=None):
+        """Color all the nodes inside a node, or the entire scene.
+
+        Nodes inside locked digital assets are not colored.
+
+        """
+        if root is None:
+            root = hou.node("/")
+
+        nodes = [
+            node for node in root.allSubChildren()
+            if not node.isInsideLockedHDA()
+        ]
+
+        self.colorNodes(nodes)
+
     def reload(self):
         """Reload all color mappings."""
-        self.constants.clear()
-        self.names.clear()
-        self.nodes.clear()
-        self.tools.clear()
+        self._clearMappings()
+        self._file_data.clear()
+        self._tool_locations = None
 
-        self._buildMappings()
+        # Always read the files when explicitly reloading.
+        self._buildMappings(use_cache=False)
+
+    def update(self):
+        """Update the color mappings if any files have changed.
+
+        Only changed files are read again.  Existing nodes of types whose
+        color changed are recolored if they still have the previous color.
+        When name entries change, nodes in the scene whose names match a
+        different color are recolored the same way.  Returns whether any
+        files had changed.
+
+        """
+        if _getCacheKey(_findFiles()) == self._key:
+            return False
+
+        old_colors = self._type_colors.copy()
+
+        old_mappings = [
+            mapping.copy()
+            for mapping in (self.constants, self.names, self.nodes, self.tools)
+        ]
+
+        self._clearMappings()
+
+        try:
+            self._buildMappings(use_cache=False)
+
+        # Keep using the previous mappings if the changed files are invalid.
+        # The files aren't checked again until they change.
+        except Exception:
+            self._clearMappings()
+
+            for mapping, old_mapping in zip(
+                    (self.constants, self.names, self.nodes, self.tools),
+                    old_mappings
+            ):
+                mapping.update(old_mapping)
+
+            self._type_colors.update(old_colors)
+
+            raise
+
+        old_constants, old_names = old_mappings[:2]
+
+        # Tuples of nodes to recolor and their new color.
+        changes = []
+
+        categories = hou.nodeTypeCategories()
+
+        # Only node types which have been colored can have nodes which
+        # need updating.
+        for (category_name, type_name), old_color in old_colors.iteritems():
+            category = categories.get(category_name)
+
+            if category is None:
+                continue
+
+            node_type = hou.nodeType(category, type_name)
+
+            # The node type may no longer be installed.
+            if node_type is None:
+                continue
+
+            color = self._getResolvedTypeColor(node_type)
+
+            if color is None or old_color is None:
+                if color is old_color:
+                    continue
+
+            elif color == old_color:
+                continue
+
+            # Types without a color have nodes with the default color.
+            if old_color is None:
+                old_color = node_type.defaultColor()
+
+            if color is None:
+                color = node_type.defaultColor()
+
+            # Nodes with other colors have been colored by name or by hand.
+            nodes = [
+                node for node in node_type.instances()
+                if node.color() == old_color
+            ]
+
+            if nodes:
+                changes.append((nodes, color))
+
+        # Name colors are applied after type colors so they take precedence.
+        if _getNameColors(old_names, old_constants) != \
+                _getNameColors(self.names, self.constants):
+            changes.extend(
+                self._getNameChanges(old_names, old_constants, old_colors)
+            )
+
+        if changes:
+            with hou.undos.disabler():
+                if hou.isUIAvailable():
+                    with ht.utils.updateMode(hou.updateMode.Manual):
+                        _applyColors(changes)
+
+                else:
+                    _applyColors(changes)
+
+        return True
 
 # =============================================================================
 # EXCEPTIONS
@@ -345,6 +879,13 @@ class InvalidColorTypeError(Exception):
 # NON-PUBLIC FUNCTIONS
 # =============================================================================
 
+def _applyColors(changes):
+    """Set the colors of lists of nodes."""
+    for nodes, color in changes:
+        for node in nodes:
+            node.setColor(color)
+
+
 def _buildColor(data):
     """Build a hou.Color object from data."""
     value = data["color"]
@@ -385,6 +926,37 @@ def _buildColor(data):
     return color
 
 
+def _buildNameMatchers(names):
+    """Build EntryMatchers for the categories of name entries."""
+    return dict(
+        (category_name, EntryMatcher(entries.values()))
+        for category_name, entries in names.iteritems()
+        if entries
+    )
+
+
+def _buildRGBColor(rgb):
+    """Build a hou.Color object from an RGB value."""
+    color = hou.Color()
+    color.setRGB(rgb)
+
+    return color
+
+
+def _buildToolMenuLocations():
+    """Build a dictionary of tool names and the Tab menu locations the tools
+    live in.
+
+    """
+    # Need to get all of Houdini's tools.
+    tools = hou.shelves.tools()
+
+    return dict(
+        (tool_name, tool.toolMenuLocations())
+        for tool_name, tool in tools.iteritems()
+    )
+
+
 def _findFiles():
     """Find any .json files that should be read."""
     try:
@@ -401,24 +973,129 @@ def _findFiles():
     return all_files
 
 
-def _getToolMenuLocations(node_type):
-    """Get any Tab menu locations the tool for the node type lives in."""
-    # Need to get all of Houdini's tools.
-    tools = hou.shelves.tools()
+def _getCacheKey(files):
+    """Get a key identifying the current state of the color files."""
+    key = [_CACHE_VERSION]
 
-    # Figure out what the tool name should be for the give node type
-    # information.
-    tool_name = hou.shelves.defaultToolName(
-        node_type.category().name(),
-        node_type.name()
-    )
+    for path in files:
+        stat = os.stat(path)
+
+        key.append((path, stat.st_mtime, stat.st_size))
+
+    return tuple(key)
+
+
+def _getCachePath():
+    """Get the path of the compiled mappings cache file."""
+    return os.path.join(hou.homeHoudiniDirectory(), _CACHE_FILE_NAME)
+
+
+def _getNameColor(matchers, constants, node):
+    """Get the color of the name entry matching a node.
+
+    Returns None if no entry matches.
+
+    """
+    name = node.name()
+
+    for category_name in (node.type().category().name(), "all"):
+        matcher = matchers.get(category_name)
+
+        if matcher is None:
+            continue
+
+        entry = matcher.match(name)
+
+        if entry is None:
+            continue
+
+        if isinstance(entry, ColorEntry):
+            return entry.color
+
+        return constants[entry.constant_name].color
+
+    return None
+
+
+def _getNameColors(names, constants):
+    """Get the resolved RGB values of name entries by category and name."""
+    colors = {}
+
+    for category_name, entries in names.iteritems():
+        for entry_name, entry in entries.iteritems():
+            if isinstance(entry, ColorEntry):
+                color = entry.color
+
+            else:
+                color = constants[entry.constant_name].color
+
+            colors[(category_name, entry_name)] = color.rgb()
+
+    return colors
+
+
+def _getSessionMappings(key):
+    """Get the mappings built in this session for a key.
+
+    Returns None if the mappings were last built for a different key.
+
+    """
+    if _COMPILED_MAPPINGS.get("key") == key:
+        return _COMPILED_MAPPINGS["built"]
+
+    return None
+
+
+def _loadCompiledMappings(key):
+    """Load compiled mappings for a key from the cache file.
+
+    Returns None if there are no compiled mappings matching the key.
+
+    """
+    try:
+        with open(_getCachePath(), "rb") as handle:
+            cached_key, compiled = cPickle.load(handle)
+
+    # A missing, unreadable or corrupt cache file just means the files need
+    # to be read.
+    except Exception:
+        return None
+
+    if cached_key != key:
+        return None
+
+    return compiled
+
+
+def _saveCompiledMappings(key, compiled):
+    """Save compiled mappings for a key to the cache file."""
+    cache_path = _getCachePath()
+
+    directory = os.path.dirname(cache_path)
+
+    # Failing to write the cache file shouldn't prevent colors from working.
+    try:
+        handle, temp_path = tempfile.mkstemp(dir=directory)
+
+    except (IOError, OSError):
+        return
+
+    try:
+        with os.fdopen(handle, "wb") as temp_file:
+            cPickle.dump((key, compiled), temp_file, cPickle.HIGHEST_PROTOCOL)
+
+        # Windows can't rename over an existing file.
+        if os.name == "nt" and os.path.exists(cache_path):
+            os.remove(cache_path)
 
-    # Check the tool name corresponds to a valid tool.
-    if tool_name in tools:
-        tool = tools[tool_name]
+        os.rename(temp_path, cache_path)
 
-        # Return the menu locations.
-        return tool.toolMenuLocations()
+    except (IOError, OSError):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-    return ()
 
+def _setSessionMappings(key, built):
+    """Set the mappings built in this session and their key."""
+    _COMPILED_MAPPINGS["key"] = key
+    _COMPILED_MAPPINGS["built"] = built
@@ -1,6 +1,18 @@
 """This module contains classes to define AOVs and groups of AOVs."""
 
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import contextlib
 import copy
+import functools
+import re
+import sys
+
+# Houdini Toolbox Imports
+from ht.sohohooks.manager import getManager
 
 # =============================================================================
 # GLOBALS
@@ -8,7 +20,8 @@ import copy
 
 # Allowable values for various settings.
 ALLOWABLE_VALUES = {
-    "lightexport": ("per-category", "per-light", "single"),
+    "lightexport": ("per-category", "per-light", "single", "per-cluster"),
+    "lightexport_cluster_by": ("category", "prefix", "position"),
     "quantization": ("8", "16", "half", "float"),
     "vextype": ("float", "unitvector", "vector", "vector4")
 }
@@ -22,6 +35,8 @@ _DEFAULT_AOV_DATA = {
     "comment": "",
     "intrinsic": None,
     "lightexport": None,
+    "lightexport_cluster_by": "category",
+    "lightexport_clusters": 8,
     "lightexport_scope": "*",
     "lightexport_select": "*",
     "path": None,
@@ -32,6 +47,16 @@ _DEFAULT_AOV_DATA = {
     "sfilter": None,
 }
 
+# The light parameters used for light exports.
+_LIGHT_EXPORT_PARMS = ("categories", "vm_export_prefix", "vm_export_suffix")
+
+# The maximum number of iterations when clustering lights by position.
+_MAX_CLUSTER_ITERATIONS = 10
+
+# The name of the cluster containing lights which didn't fit in the maximum
+# number of clusters.
+_OTHER_CLUSTER = "__other__"
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -40,8 +65,15 @@ _DEFAULT_AOV_DATA = {
 class AOV(object):
     """This class represents an AOV to be exported."""
 
+    __slots__ = tuple(
+        ["_hash"] + ["_{}".format(name) for name in _DEFAULT_AOV_DATA]
+    )
+
     def __init__(self, data):
-        self._data = copy.copy(_DEFAULT_AOV_DATA)
+        self._hash = None
+
+        for name, value in _DEFAULT_AOV_DATA.iteritems():
+            setattr(self, "_{}".format(name), copy.copy(value))
 
         self._updateData(data)
 
@@ -51,12 +83,25 @@ class AOV(object):
 
     def __cmp__(self, other):
         if isinstance(other, self.__class__):
-            return cmp(self.variable, other.variable)
+            return cmp(self._variable, other._variable)
 
         return -1
 
+    def __getstate__(self):
+        return dict(
+            (name, getattr(self, "_{}".format(name)))
+            for name in _DEFAULT_AOV_DATA
+        )
+
     def __hash__(self):
-        return hash(self.variable)
+        return self._hash
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            setattr(self, "_{}".format(name), value)
+
+        # Set the variable again so the hash is computed.
+        self.variable = state["variable"]
 
     def __repr__(self):
         return "<AOV {} ({})>".format(self.variable, self.vextype)
@@ -68,136 +113,45 @@ class AOV(object):
     # NON-PUBLIC METHODS
     # =========================================================================
 
-    def _lightExportPlanes(self, data, wrangler, cam, now):
-        """Handle exporting the image planes based on their export settings."""
+    def _lightExportPlanes(self, data, cam, now):
+        """Get a list of image plane data based on the export settings."""
         import soho
 
-        base_channel = data["channel"]
-
         # Handle any light exporting.
         if self.lightexport is not None:
-            # Get a list of lights matching our mask and selection.
-            lights = cam.objectList(
-                "objlist:light",
+            # Get the export plan for the lights matching our mask and
+            # selection.  The plan is reused across frames as long as the
+            # lights and their export parameters do not change.
+            plan = _LIGHT_EXPORT_CACHE.getPlan(
+                cam,
                 now,
+                self.lightexport,
+                data["channel"],
                 self.lightexport_scope,
-                self.lightexport_select
+                self.lightexport_select,
+                self.lightexport_clusters,
+                self.lightexport_cluster_by
             )
 
-            if self.lightexport == "per-light":
-                # Process each light.
-                for light in lights:
-                    # Try and find the suffix using the 'vm_export_suffix'
-                    # parameter.  If it doesn't exist, use an emptry string.
-                    suffix = light.getDefaultedString(
-                        "vm_export_suffix", now, ['']
-                    )[0]
-
-                    prefix = []
-
-                    # Look for the prefix parameter.  If it doesn't exist, use
-                    # the light's name and replace the '/' with '_'.  The
-                    # default value of 'vm_export_prefix' is usually $OS.
-                    if not light.evalString("vm_export_prefix", now, prefix):
-                        prefix = [light.getName()[1:].replace('/', '_')]
-
-                    # If there is a prefix we construct the channel name using
-                    # it and the suffix.
-                    if prefix:
-                        channel = "{}_{}{}".format(
-                            prefix[0],
-                            base_channel,
-                            suffix
-                        )
-
-                    # If not and there is a valid suffix, add it to the channel
-                    # name.
-                    elif suffix:
-                        channel = "{}{}".format(base_channel, suffix)
-
-                    # Throw an error because all the per-light channels will
-                    # have the same name.
-                    else:
-                        soho.error("Empty suffix for per-light exports.")
-                        channel = base_channel
-
-                    data["channel"] = channel
-                    data["lightexport"] = light.getName()
-
-                    # Write this light export to the ifd.
-                    self.writeDataToIfd(data, wrangler, cam, now)
-
-            elif self.lightexport == "single":
-                # Take all the light names and join them together.
-                lightexport = ' '.join([light.getName() for light in lights])
-
-                # If there are no lights, we can't pass in an empty string
-                # since then mantra will think that light exports are
-                # disabled.  So pass down an string that presumably doesn't
-                # match any light name.
-                if not lightexport:
-                    lightexport = "__nolights__"
-
-                data["lightexport"] = lightexport
-
-                # Write the combined light export to the ifd.
-                self.writeDataToIfd(data, wrangler, cam, now)
-
-            elif self.lightexport == "per-category":
-                # A mapping between category names and their member lights.
-                category_map = {}
-
-                # Process each selected light.
-                for light in lights:
-                    # Get the category for the light.
-                    categories = []
-                    light.evalString("categories", now, categories)
-
-                    # Light doesn't have a 'categories' parameter.
-                    if not categories:
-                        continue
-
-                    # Get the raw string.
-                    categories = categories[0]
-
-                    # Since the categories value can be space or comma
-                    # separated we replace the commas with spaces then split.
-                    categories = categories.replace(',', ' ')
-                    categories = categories.split()
-
-                    # If the categories list was empty, put the light in a fake
-                    # category.
-                    if not categories:
-                        no_category_lights = category_map.setdefault("__none__", [])
-                        no_category_lights.append(light)
-
-                    else:
-                        # For each category the light belongs to, add it to
-                        # the list.
-                        for category in categories:
-                            category_lights = category_map.setdefault(category, [])
-                            category_lights.append(light)
-
-                # Process all the found categories and their member lights.
-                for category, lights in category_map.iteritems():
-                    # Construct the export string to contain all the member
-                    # lights.
-                    lightexport = ' '.join(
-                        [light.getName() for light in lights]
-                    )
-
-                    data["lightexport"] = lightexport
-
-                    # The channel is the regular channel named prefixed with
-                    # the category name.
-                    data["channel"] = "{}_{}".format(category, base_channel)
-
-                    # Write the per-category light export to the ifd.
-                    self.writeDataToIfd(data, wrangler, cam, now)
+            # Throw an error because all the per-light channels will have the
+            # same name.
+            if plan.empty_suffix:
+                soho.error("Empty suffix for per-light exports.")
 
-        else:
-            # Write a normal AOV definition.
-            self.writeDataToIfd(data, wrangler, cam, now)
+            planes = []
+
+            for channel, lightexport in plan.planes:
+                plane_data = dict(data)
+
+                plane_data["channel"] = channel
+                plane_data["lightexport"] = lightexport
+
+                planes.append(plane_data)
+
+            return planes
+
+        # A normal AOV definition.
+        return [dict(data)]
 
     def _updateData(self, data):
         """Update internal data with new data."""
@@ -213,8 +167,8 @@ class AOV(object):
 
             # If the key corresponds to the data in this object we store the
             # data.
-            if name in self._data:
-                self._data[name] = value
+            if name in _DEFAULT_AOV_DATA:
+                setattr(self, name, value)
 
         # Verify the new data is valid.
         self._verifyInternalData()
@@ -234,175 +188,202 @@ class AOV(object):
     @property
     def channel(self):
         """The name of the output AOV's channel."""
-        return self._data["channel"]
+        return self._channel
 
     @channel.setter
     def channel(self, channel):
-        self._data["channel"] = channel
+        self._channel = channel
 
     # =========================================================================
 
     @property
     def comment(self):
         """Optional comment about this AOV."""
-        return self._data["comment"]
+        return self._comment
 
     @comment.setter
     def comment(self, comment):
-        self._data["comment"] = comment
+        self._comment = comment
 
     # =========================================================================
 
     @property
     def componentexport(self):
         """Whether or not components are being exported."""
-        return self._data["componentexport"]
+        return self._componentexport
 
     @componentexport.setter
     def componentexport(self, componentexport):
-        self._data["componentexport"] = componentexport
+        self._componentexport = componentexport
 
     # =========================================================================
 
     @property
     def components(self):
         """List of components to export."""
-        return self._data["components"]
+        return self._components
 
     @components.setter
     def components(self, components):
-        self._data["components"] = components
+        self._components = components
 
     # =========================================================================
 
     @property
     def intrinsic(self):
-        return self._data["intrinsic"]
+        return self._intrinsic
 
     @intrinsic.setter
     def intrinsic(self, intrinsic):
-        self._data["intrinsic"] = intrinsic
+        self._intrinsic = intrinsic
 
     # =========================================================================
 
     @property
     def lightexport(self):
         """The light output mode."""
-        return self._data["lightexport"]
+        return self._lightexport
 
     @lightexport.setter
     def lightexport(self, lightexport):
-        self._data["lightexport"] = lightexport
+        self._lightexport = lightexport
+
+    # =========================================================================
+
+    @property
+    def lightexport_cluster_by(self):
+        """How lights are clustered for 'per-cluster' light exports."""
+        return self._lightexport_cluster_by
+
+    @lightexport_cluster_by.setter
+    def lightexport_cluster_by(self, lightexport_cluster_by):
+        self._lightexport_cluster_by = lightexport_cluster_by
+
+    # =========================================================================
+
+    @property
+    def lightexport_clusters(self):
+        """The maximum number of 'per-cluster' light exports."""
+        return self._lightexport_clusters
+
+    @lightexport_clusters.setter
+    def lightexport_clusters(self, lightexport_clusters):
+        self._lightexport_clusters = lightexport_clusters
 
     # =========================================================================
 
     @property
     def lightexport_scope(self):
         """The light mask."""
-        return self._data["lightexport_scope"]
+        return self._lightexport_scope
 
     @lightexport_scope.setter
     def lightexport_scope(self, lightexport_scope):
-        self._data["lightexport_scope"] = lightexport_scope
+        self._lightexport_scope = lightexport_scope
 
     # =========================================================================
 
     @property
     def lightexport_select(self):
         """The light selection (categories)."""
-        return self._data["lightexport_select"]
+        return self._lightexport_select
 
     @lightexport_select.setter
     def lightexport_select(self, lightexport_select):
-        self._data["lightexport_select"] = lightexport_select
+        self._lightexport_select = lightexport_select
 
     # =========================================================================
 
     @property
     def path(self):
         """The path containing the AOV definition."""
-        return self._data["path"]
+        return self._path
 
     @path.setter
     def path(self, path):
-        self._data["path"] = path
+        self._path = path
 
     # =========================================================================
 
     @property
     def pfilter(self):
         """The name of the output AOV's pixel filter."""
-        return self._data["pfilter"]
+        return self._pfilter
 
     @pfilter.setter
     def pfilter(self, pfilter):
-        self._data["pfilter"] = pfilter
+        self._pfilter = pfilter
 
     # =========================================================================
 
     @property
     def planefile(self):
         """The name of the output AOV's specific file, if any."""
-        return self._data["planefile"]
+        return self._planefile
 
     @planefile.setter
     def planefile(self, planefile):
-        self._data["planefile"] = planefile
+        self._planefile = planefile
 
     # =========================================================================
 
     @property
     def priority(self):
         """Group priority."""
-        return self._data["priority"]
+        return self._priority
 
     @priority.setter
     def priority(self, priority):
-        self._data["priority"] = priority
+        self._priority = priority
 
     # =========================================================================
 
     @property
     def quantize(self):
         """The type of quantization for the output AOV."""
-        return self._data["quantize"]
+        return self._quantize
 
     @quantize.setter
     def quantize(self, quantize):
-        self._data["quantize"] = quantize
+        self._quantize = quantize
 
     # =========================================================================
 
     @property
     def sfilter(self):
         """The name of the output AOV's sample filter."""
-        return self._data["sfilter"]
+        return self._sfilter
 
     @sfilter.setter
     def sfilter(self, sfilter):
-        self._data["sfilter"] = sfilter
+        self._sfilter = sfilter
 
     # =========================================================================
 
     @property
     def variable(self):
         """The name of the output AOV's vex variable."""
-        return self._data["variable"]
+        return self._variable
 
     @variable.setter
     def variable(self, variable):
-        self._data["variable"] = variable
+        # Intern the name since it is used for hashing, sorting and lookups.
+        if isinstance(variable, str):
+            variable = intern(variable)
+
+        self._variable = variable
+        self._hash = hash(variable)
 
     # =========================================================================
 
     @property
     def vextype(self):
         """The data type of the output AOV."""
-        return self._data["vextype"]
+        return self._vextype
 
     @vextype.setter
     def vextype(self, vextype):
-        self._data["vextype"] = vextype
+        self._vextype = vextype
 
     # =========================================================================
     # STATIC METHODS
@@ -413,6 +394,18 @@ class AOV(object):
         """Write AOV data to the ifd."""
         import IFDapi
 
+        if _PLANE_BATCH is not None:
+            # Skip any planes which are duplicates or conflict with planes
+            # that have already been output.
+            if not _PLANE_BATCH.checkPlane(data):
+                return
+
+            # If there are no hooks to call, the plane is formatted and
+            # written with the rest of the batch.
+            if _PLANE_BATCH.deferred:
+                _PLANE_BATCH.addPlane(data)
+                return
+
         # Call the 'pre_defplane' hook.  If the function returns True,
         # return.
         if _callPreDefPlane(data, wrangler, cam, now):
@@ -491,6 +484,10 @@ class AOV(object):
                 d["lightexport_scope"] = self.lightexport_scope
                 d["lightexport_select"] = self.lightexport_select
 
+            if self.lightexport == "per-cluster":
+                d["lightexport_cluster_by"] = self.lightexport_cluster_by
+                d["lightexport_clusters"] = self.lightexport_clusters
+
         if self.intrinsic:
             d["intrinsic"] = self.intrinsic
 
@@ -504,10 +501,8 @@ class AOV(object):
 
     # =========================================================================
 
-    def writeToIfd(self, wrangler, cam, now):
-        """Output the AOV."""
-        import soho
-
+    def getPlanes(self, wrangler, cam, now):
+        """Get a list of data for each image plane the AOV outputs."""
         # The base data to pass along.
         data = self.getData()
 
@@ -524,33 +519,30 @@ class AOV(object):
             # If no components are explicitly set on the AOV, use the
             # vm_exportcomponents parameter from the Mantra ROP.
             if not components:
-                parms = {
-                    "components": soho.SohoParm(
-                        "vm_exportcomponents",
-                        "str",
-                        [""],
-                        skipdefault=False
-                    ),
-                }
-
-                plist = cam.wrangle(wrangler, parms, now)
-
-                if plist:
-                    components = plist["vm_exportcomponents"].Value[0]
-                    components = components.split()
-
-            # Create a unique channel for each component and output the block.
+                components = getExportComponents(wrangler, cam, now)
+
+            planes = []
+
+            # Create a unique channel for each component.
             for component in components:
                 data["channel"] = "{}_{}".format(channel, component)
                 data["component"] = component
 
-                self._lightExportPlanes(data, wrangler, cam, now)
+                planes.extend(self._lightExportPlanes(data, cam, now))
 
-        else:
-            # Update the data with the channel.
-            data["channel"] = channel
+            return planes
+
+        # Update the data with the channel.
+        data["channel"] = channel
+
+        return self._lightExportPlanes(data, cam, now)
+
+    # =========================================================================
 
-            self._lightExportPlanes(data, wrangler, cam, now)
+    def writeToIfd(self, wrangler, cam, now):
+        """Output the AOV."""
+        for data in self.getPlanes(wrangler, cam, now):
+            self.writeDataToIfd(data, wrangler, cam, now)
 
 # =============================================================================
 
@@ -560,12 +552,34 @@ class AOVGroup(object):
 
     """
 
+    __slots__ = (
+        "_aovs",
+        "_comment",
+        "_flattened",
+        "_groups",
+        "_hash",
+        "_icon",
+        "_includes",
+        "_name",
+        "_parents",
+        "_path",
+        "_priority",
+    )
+
     def __init__(self, name):
-        self._aovs = []
+        # Intern the name since it is used for hashing, sorting and lookups.
+        if isinstance(name, str):
+            name = intern(name)
+
+        self._aovs = _MemberList(self)
         self._comment = ""
+        self._flattened = None
+        self._groups = _MemberList(self)
+        self._hash = hash(name)
         self._icon = None
         self._includes = []
         self._name = name
+        self._parents = []
         self._path = None
         self._priority = -1
 
@@ -575,10 +589,34 @@ class AOVGroup(object):
 
     def __cmp__(self, other):
         if isinstance(other, self.__class__):
-            return cmp(self.name, other.name)
+            return cmp(self._name, other._name)
 
         return -1
 
+    def __getstate__(self):
+        state = dict(
+            (name, getattr(self, name)) for name in AOVGroup.__slots__
+        )
+
+        # Member lists are stored as regular lists and any cached or parent
+        # information is not stored.
+        state["_aovs"] = list(self._aovs)
+        state["_groups"] = list(self._groups)
+        state["_flattened"] = None
+        state["_parents"] = []
+
+        return state
+
+    def __hash__(self):
+        return self._hash
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            setattr(self, name, value)
+
+        self._aovs = _MemberList(self, self._aovs)
+        self._groups = _MemberList(self, self._groups)
+
     def __repr__(self):
         return "<{} {} ({} AOVs)>".format(
             self.__class__.__name__,
@@ -586,6 +624,25 @@ class AOVGroup(object):
             len(self.aovs)
         )
 
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _invalidate(self):
+        """Invalidate the flattened AOVs of this group and any groups which
+        include it.
+
+        """
+        # If the group has no flattened AOVs then neither will any groups
+        # including it.
+        if self._flattened is None:
+            return
+
+        self._flattened = None
+
+        for parent in self._parents:
+            parent._invalidate()
+
     # =========================================================================
     # PROPERTIES
     # =========================================================================
@@ -597,6 +654,60 @@ class AOVGroup(object):
 
     # =========================================================================
 
+    @property
+    def flattened_aovs(self):
+        """A tuple of all the AOVs in the group and any included groups.
+
+        AOVs are ordered by the group's includes and duplicates are removed.
+        The result is cached until a member of the group, or any included
+        group, changes.
+
+        """
+        if self._flattened is None:
+            aovs = []
+            variables = set()
+
+            def _addAOV(aov):
+                if aov.variable not in variables:
+                    variables.add(aov.variable)
+                    aovs.append(aov)
+
+            members = dict((aov.variable, aov) for aov in self.aovs)
+            groups = dict((group.name, group) for group in self.groups)
+
+            # Add members in the order of the includes.
+            for include in self.includes:
+                if include.startswith('@'):
+                    group = groups.get(include[1:])
+
+                    if group is not None:
+                        for aov in group.flattened_aovs:
+                            _addAOV(aov)
+
+                elif include in members:
+                    _addAOV(members[include])
+
+            # Add any members that were added outside of the includes.
+            for aov in self.aovs:
+                _addAOV(aov)
+
+            for group in self.groups:
+                for aov in group.flattened_aovs:
+                    _addAOV(aov)
+
+            self._flattened = tuple(aovs)
+
+        return self._flattened
+
+    # =========================================================================
+
+    @property
+    def groups(self):
+        """A list of AOVGroups included in the group."""
+        return self._groups
+
+    # =========================================================================
+
     @property
     def comment(self):
         """Optional comment about this AOV."""
@@ -621,7 +732,10 @@ class AOVGroup(object):
 
     @property
     def includes(self):
-        """List of AOV names belonging to the group."""
+        """List of AOV names belonging to the group.  Names of included
+        groups are prefixed with '@'.
+
+        """
         return self._includes
 
     # =========================================================================
@@ -657,15 +771,34 @@ class AOVGroup(object):
     # METHODS
     # =========================================================================
 
+    def addGroup(self, group):
+        """Include another group in this group."""
+        self.groups.append(group)
+
+        group._parents.append(self)
+
     def clear(self):
         """Clear the list of AOVs belonging to this group."""
-        self._aovs = []
+        self._aovs = _MemberList(self)
+
+        self._invalidate()
+
+    def clearGroups(self):
+        """Clear the list of groups included in this group."""
+        for group in self.groups:
+            if self in group._parents:
+                group._parents.remove(self)
+
+        self._groups = _MemberList(self)
+
+        self._invalidate()
 
     def getData(self):
         """Get a dictionary representing the group."""
         d = {
             self.name: {
-                "include": [aov.variable for aov in self.aovs],
+                "include": [aov.variable for aov in self.aovs] +
+                           ["@" + group.name for group in self.groups],
             }
         }
 
@@ -679,7 +812,7 @@ class AOVGroup(object):
 
     def writeToIfd(self, wrangler, cam, now):
         """Write all AOVs in the group to the ifd."""
-        for aov in self.aovs:
+        for aov in self.flattened_aovs:
             aov.writeToIfd(wrangler, cam, now)
 
 # =============================================================================
@@ -688,12 +821,591 @@ class AOVGroup(object):
 class IntrinsicAOVGroup(AOVGroup):
     """An intrinsic grouping of AOVs."""
 
+    __slots__ = ()
+
     def __init__(self, name):
         super(IntrinsicAOVGroup, self).__init__(name)
 
         self.comment = "Automatically generated"
 
 # =============================================================================
+
+
+class LightExportCache(object):
+    """This class caches light export plans across frames.
+
+    The lights matching a scope and selection mask are found at most once
+    per frame and shared by all AOVs using that mask.  Export plans are reused
+    for as long as the lights and their export parameters do not change.
+
+    The export information of each light is kept until its node changes.
+    Lights whose export parameters are animated are only evaluated again for
+    a different time, and lights without a node are always evaluated.
+
+    Lights can be added or removed between renders of the same frame so
+    expireLights() should be called before each ifd is generated.
+
+    """
+
+    def __init__(self):
+        self._category_indexes = {}
+        self._evaluation = 0
+        self._light_positions = {}
+        self._light_sets = {}
+        self._plans = {}
+
+        # Dictionary of light names to (record, time) tuples.  The time is
+        # None if the export parameters aren't animated.
+        self._records = {}
+
+        # The names of light nodes being watched for changes.
+        self._watched = set()
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<LightExportCache ({} plans)>".format(len(self._plans))
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _getCategoryIndex(self, scope, select, lights):
+        """Get the category index for the lights matching the mask and
+        selection.
+
+        The index is built once per light set and shared by all per-category
+        AOVs using the same mask and selection.
+
+        """
+        key = (scope, select)
+
+        category_index = self._category_indexes.get(key)
+
+        if category_index is None or category_index[0] is not lights:
+            category_index = (lights, _buildCategoryIndex(lights))
+
+            self._category_indexes[key] = category_index
+
+        return category_index[1]
+
+    def _getLightRecord(self, light, now):
+        """Get the export information for a light, only evaluating it if it
+        could have changed.
+
+        """
+        name = light.getName()
+
+        cached = self._records.get(name)
+
+        if cached is not None and (cached[1] is None or cached[1] == now):
+            return cached[0]
+
+        record = _getLightExportInfo(light, now)
+
+        static = self._watchLight(name)
+
+        if static is not None:
+            self._records[name] = (record, None if static else now)
+
+        return record
+
+    def _lightChanged(self, name, **kwargs):
+        """Event callback to discard the information of a changed light."""
+        import hou
+
+        self._records.pop(name, None)
+
+        # The callback is removed with a deleted node and a renamed node will
+        # be watched under its new name.
+        if kwargs.get("event_type") in (
+                hou.nodeEventType.BeingDeleted,
+                hou.nodeEventType.NameChanged
+        ):
+            self._watched.discard(name)
+
+    def _watchLight(self, name):
+        """Watch a light node for changes.
+
+        Returns whether the export parameters of the light are static, or
+        None if there is no node to watch.
+
+        """
+        import hou
+
+        node = hou.node(name)
+
+        if node is None:
+            return None
+
+        if name not in self._watched:
+            node.addEventCallback(
+                (
+                    hou.nodeEventType.BeingDeleted,
+                    hou.nodeEventType.NameChanged,
+                    hou.nodeEventType.ParmTupleChanged,
+                ),
+                functools.partial(self._lightChanged, name)
+            )
+
+            self._watched.add(name)
+
+        for parm_name in _LIGHT_EXPORT_PARMS:
+            parm = node.parm(parm_name)
+
+            if parm is not None and parm.isTimeDependent():
+                return False
+
+        return True
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def clear(self):
+        """Clear all cached lights and plans."""
+        self._category_indexes.clear()
+        self._evaluation += 1
+        self._light_positions.clear()
+        self._light_sets.clear()
+        self._plans.clear()
+        self._records.clear()
+
+    def expireLights(self):
+        """Find the lights again the next time they are needed.
+
+        Only lights which could have changed are evaluated again so plans are
+        still reused if the lights haven't changed.
+
+        """
+        self._evaluation += 1
+
+    def getLights(self, cam, now, scope, select):
+        """Get the export information for all lights matching the mask and
+        selection.
+
+        """
+        import soho
+
+        # Light lists are only valid for the current driver, camera and time
+        # until they are expired.
+        frame = (
+            soho.getOutputDriver().getName(),
+            cam.getName(),
+            now,
+            self._evaluation
+        )
+
+        key = (scope, select)
+
+        light_set = self._light_sets.get(key)
+
+        if light_set is not None and light_set[0] == frame:
+            return light_set[1]
+
+        lights = cam.objectList("objlist:light", now, scope, select)
+
+        records = tuple(
+            [self._getLightRecord(light, now) for light in lights]
+        )
+
+        # If nothing has changed since the last evaluation, keep the existing
+        # records so plans built from them remain valid.
+        if light_set is not None and light_set[1] == records:
+            records = light_set[1]
+
+        self._light_sets[key] = (frame, records)
+
+        return records
+
+    def getLightPositions(self, cam, now, scope, select):
+        """Get the world space positions of all lights matching the mask and
+        selection.
+
+        """
+        import soho
+
+        frame = (
+            soho.getOutputDriver().getName(),
+            cam.getName(),
+            now,
+            self._evaluation
+        )
+
+        key = (scope, select)
+
+        light_positions = self._light_positions.get(key)
+
+        if light_positions is not None and light_positions[0] == frame:
+            return light_positions[1]
+
+        lights = cam.objectList("objlist:light", now, scope, select)
+
+        positions = tuple([_getLightPosition(light, now) for light in lights])
+
+        # If the lights haven't moved since the last evaluation, keep the
+        # existing positions so plans built from them remain valid.
+        if light_positions is not None and light_positions[1] == positions:
+            positions = light_positions[1]
+
+        self._light_positions[key] = (frame, positions)
+
+        return positions
+
+    def getPlan(self, cam, now, lightexport, channel, scope, select,
+                clusters=None, cluster_by=None):
+        """Get the export plan for a light export mode, base channel, mask and
+        selection.
+
+        'per-cluster' exports also use the maximum number of clusters and how
+        the lights are clustered.
+
+        """
+        lights = self.getLights(cam, now, scope, select)
+
+        positions = None
+
+        if lightexport == "per-cluster":
+            key = (lightexport, channel, scope, select, clusters, cluster_by)
+
+            if cluster_by == "position":
+                positions = self.getLightPositions(cam, now, scope, select)
+
+        else:
+            key = (lightexport, channel, scope, select)
+
+        plan = self._plans.get(key)
+
+        if plan is None or not plan.isValid(lights, positions):
+            category_index = None
+
+            if lightexport == "per-category":
+                category_index = self._getCategoryIndex(scope, select, lights)
+
+            elif lightexport == "per-cluster":
+                category_index = _buildLightClusters(
+                    lights,
+                    clusters,
+                    cluster_by,
+                    positions
+                )
+
+            planes, empty_suffix = _buildLightExportPlanes(
+                lightexport,
+                channel,
+                lights,
+                category_index
+            )
+
+            plan = LightExportPlan(lights, planes, empty_suffix, positions)
+
+            self._plans[key] = plan
+
+        return plan
+
+# =============================================================================
+
+
+class LightExportPlan(object):
+    """This class represents the resolved image planes of a light export."""
+
+    def __init__(self, lights, planes, empty_suffix=False, positions=None):
+        self._empty_suffix = empty_suffix
+        self._lights = lights
+        self._planes = planes
+        self._positions = positions
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<LightExportPlan ({} planes)>".format(len(self.planes))
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def empty_suffix(self):
+        """Whether or not per-light exports had no prefix or suffix."""
+        return self._empty_suffix
+
+    # =========================================================================
+
+    @property
+    def lights(self):
+        """The light export information the plan was built from."""
+        return self._lights
+
+    # =========================================================================
+
+    @property
+    def planes(self):
+        """A list of (channel, lightexport) tuples to output."""
+        return self._planes
+
+    # =========================================================================
+
+    @property
+    def positions(self):
+        """The light positions the plan was built from, if any."""
+        return self._positions
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def isValid(self, lights, positions=None):
+        """Check if the plan is still valid for the light information and
+        positions.
+
+        Unchanged light information and positions are shared between
+        evaluations so this is an identity check.
+
+        """
+        return lights is self.lights and positions is self.positions
+
+# =============================================================================
+
+
+class PlaneBatch(object):
+    """This class tracks the image planes output to the ifd for a frame.
+
+    Exact duplicate planes are skipped and planes whose channel conflicts
+    with an existing plane are reported.  If the batch is deferred, plane
+    blocks are formatted as they are added and written to the ifd at once.
+
+    """
+
+    def __init__(self, deferred=False):
+        self._blocks = []
+        self._channels = {}
+        self._conflicts = []
+        self._deferred = deferred
+        self._planes = []
+
+        # Formatted properties shared by the planes of the same AOV.
+        self._templates = {}
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __repr__(self):
+        return "<PlaneBatch ({} planes)>".format(len(self._channels))
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _formatBlock(self, data):
+        """Format a plane block for AOV data.
+
+        The properties are written in the same order as writeDataToIfd().
+
+        """
+        key = (
+            data["variable"],
+            data["vextype"],
+            "quantize" in data,
+            data.get("quantize"),
+            data.get("planefile"),
+            "pfilter" in data,
+            data.get("pfilter"),
+            "sfilter" in data,
+            data.get("sfilter"),
+        )
+
+        template = self._templates.get(key)
+
+        if template is None:
+            template = _formatPlaneTemplate(data)
+            self._templates[key] = template
+
+        start, middle, end = template
+
+        block = [
+            start,
+            _formatPlaneProperty("channel", data["channel"]),
+            middle
+        ]
+
+        if "lightexport" in data:
+            block.append(
+                _formatPlaneProperty("lightexport", data["lightexport"])
+            )
+
+        block.append(end)
+
+        if "component" in data:
+            block.append(_formatPlaneProperty("component", data["component"]))
+
+        block.append("ray_end\n")
+
+        return ''.join(block)
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def conflicts(self):
+        """A list of (channel, existing key, conflicting key) tuples for
+        planes which were skipped due to conflicting channels.
+
+        """
+        return self._conflicts
+
+    @property
+    def deferred(self):
+        """Whether planes are written to the ifd when the batch is written."""
+        return self._deferred
+
+    @property
+    def planes(self):
+        """A list of the AOV data of the planes which were output."""
+        return self._planes
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def addPlane(self, data):
+        """Add a plane block for AOV data to be written with the batch."""
+        self._blocks.append(self._formatBlock(data))
+
+    def checkPlane(self, data):
+        """Check if the plane for AOV data should be output.
+
+        Planes are identified by their variable, channel, light export and
+        component.  If the plane has already been output, or its channel is
+        used by a different plane, it should not be output.
+
+        """
+        channel = data["channel"]
+
+        key = (
+            data["variable"],
+            channel,
+            data.get("lightexport"),
+            data.get("component")
+        )
+
+        existing = self._channels.get(channel)
+
+        if existing is None:
+            self._channels[channel] = key
+            self._planes.append(data)
+
+            return True
+
+        if existing != key:
+            self._conflicts.append((channel, existing, key))
+
+        return False
+
+    def reportConflicts(self):
+        """Report any conflicting channels as a single error."""
+        import soho
+
+        if not self.conflicts:
+            return
+
+        messages = [
+            "'{}' ({} and {})".format(channel, existing[0], key[0])
+            for channel, existing, key in self.conflicts
+        ]
+
+        soho.error(
+            "Skipped planes with conflicting channels: {}".format(
+                ", ".join(messages)
+            )
+        )
+
+    def write(self):
+        """Write any added plane blocks to the ifd in a single write."""
+        if self._blocks:
+            sys.stdout.write(''.join(self._blocks))
+
+        self._blocks = []
+
+# =============================================================================
+
+
+class _MemberList(list):
+    """A list of group members which invalidates the group's flattened AOVs
+    when it is modified.
+
+    """
+
+    def __init__(self, group, members=()):
+        super(_MemberList, self).__init__(members)
+
+        self._group = group
+
+    def __reduce__(self):
+        # Pickle as a regular list.
+        return (list, (list(self),))
+
+    def __delitem__(self, key):
+        super(_MemberList, self).__delitem__(key)
+        self._group._invalidate()
+
+    def __delslice__(self, i, j):
+        super(_MemberList, self).__delslice__(i, j)
+        self._group._invalidate()
+
+    def __iadd__(self, other):
+        result = super(_MemberList, self).__iadd__(other)
+        self._group._invalidate()
+
+        return result
+
+    def __setitem__(self, key, value):
+        super(_MemberList, self).__setitem__(key, value)
+        self._group._invalidate()
+
+    def __setslice__(self, i, j, sequence):
+        super(_MemberList, self).__setslice__(i, j, sequence)
+        self._group._invalidate()
+
+    def append(self, item):
+        super(_MemberList, self).append(item)
+        self._group._invalidate()
+
+    def extend(self, items):
+        super(_MemberList, self).extend(items)
+        self._group._invalidate()
+
+    def insert(self, index, item):
+        super(_MemberList, self).insert(index, item)
+        self._group._invalidate()
+
+    def pop(self, *args):
+        item = super(_MemberList, self).pop(*args)
+        self._group._invalidate()
+
+        return item
+
+    def remove(self, item):
+        super(_MemberList, self).remove(item)
+        self._group._invalidate()
+
+    def reverse(self):
+        super(_MemberList, self).reverse()
+        self._group._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super(_MemberList, self).sort(*args, **kwargs)
+        self._group._invalidate()
+
+# =============================================================================
 # EXCEPTIONS
 # =============================================================================
 
@@ -739,11 +1451,187 @@ class MissingVexTypeError(AOVError):
             self.vextype
         )
 
+
+class RecursiveGroupError(AOVError):
+    """Exception for groups which include themselves."""
+
+    def __init__(self, names, path=None):
+        super(RecursiveGroupError, self).__init__()
+        self.names = names
+        self.path = path
+
+    def __str__(self):
+        value = "Recursive group includes: {}".format(
+            " -> ".join(["@" + name for name in self.names])
+        )
+
+        if self.path is not None:
+            value = "{}: {}".format(self.path, value)
+
+        return value
+
 # =============================================================================
 # NON-PUBLIC FUNCTIONS
 # =============================================================================
 
 
+def _buildCategoryIndex(lights):
+    """Build a list of (category, lightexport) tuples for light export
+    information.
+
+    """
+    category_map = _buildCategoryMap(lights)
+
+    # Construct the export strings to contain all the member lights.
+    return [
+        (category, ' '.join(names))
+        for category, names in category_map.iteritems()
+    ]
+
+
+def _buildCategoryMap(lights):
+    """Build a dictionary of category names and the names of their member
+    lights.
+
+    """
+    # A mapping between category names and their member lights.
+    category_map = {}
+
+    # Process each selected light.
+    for name, _, _, categories in lights:
+        # Light doesn't have a 'categories' parameter.
+        if categories is None:
+            continue
+
+        # Since the categories value can be space or comma separated we
+        # replace the commas with spaces then split.
+        categories = categories.replace(',', ' ')
+        categories = categories.split()
+
+        # If the categories list was empty, put the light in a fake category.
+        if not categories:
+            no_category_lights = category_map.setdefault("__none__", [])
+            no_category_lights.append(name)
+
+        else:
+            # For each category the light belongs to, add it to the list.
+            for category in categories:
+                category_lights = category_map.setdefault(category, [])
+                category_lights.append(name)
+
+    return category_map
+
+
+def _buildLightClusters(lights, max_clusters, cluster_by, positions=None):
+    """Build a list of (cluster, lightexport) tuples grouping the lights into
+    at most a maximum number of clusters.
+
+    Clustering by category groups the lights the same as 'per-category'
+    exports, so lights are in each of their categories and lights without a
+    'categories' parameter are skipped.  Clustering by position requires the
+    positions of the lights.
+
+    """
+    if not lights:
+        return []
+
+    max_clusters = max(int(max_clusters), 1)
+
+    if cluster_by == "position":
+        return _clusterLightsByPosition(lights, positions, max_clusters)
+
+    if cluster_by == "category":
+        cluster_map = _buildCategoryMap(lights)
+
+    else:
+        cluster_map = {}
+
+        # Lights are clustered by their export prefix, or name, without any
+        # trailing numbers.
+        for name, _, prefix, _ in lights:
+            if prefix is None:
+                prefix = name.split('/')[-1]
+
+            cluster = re.sub(r"[\d_]+$", '', prefix) or prefix
+
+            cluster_map.setdefault(cluster, []).append(name)
+
+    clusters = sorted(cluster_map.iteritems())
+
+    # Keep the largest clusters and merge the rest into a single cluster.
+    if len(clusters) > max_clusters:
+        clusters.sort(key=lambda item: (-len(item[1]), item[0]))
+
+        other = []
+
+        # Lights in several categories are only added once.
+        merged = set()
+
+        for _, names in clusters[max_clusters - 1:]:
+            for name in names:
+                if name not in merged:
+                    merged.add(name)
+                    other.append(name)
+
+        clusters = sorted(clusters[:max_clusters - 1])
+        clusters.append((_OTHER_CLUSTER, other))
+
+    return [(cluster, ' '.join(names)) for cluster, names in clusters]
+
+
+def _buildLightExportPlanes(lightexport, base_channel, lights,
+                            category_index=None):
+    """Build a list of (channel, lightexport) tuples for the export mode.
+
+    Per-category and per-cluster exports require the category or cluster
+    index of the lights.
+
+    """
+    planes = []
+    empty_suffix = False
+
+    if lightexport == "per-light":
+        # Process each light.
+        for name, suffix, prefix, _ in lights:
+            # If there is a prefix we construct the channel name using it and
+            # the suffix.
+            if prefix is not None:
+                channel = "{}_{}{}".format(prefix, base_channel, suffix)
+
+            # If not and there is a valid suffix, add it to the channel name.
+            elif suffix:
+                channel = "{}{}".format(base_channel, suffix)
+
+            # All the per-light channels will have the same name.
+            else:
+                empty_suffix = True
+                channel = base_channel
+
+            planes.append((channel, name))
+
+    elif lightexport == "single":
+        # Take all the light names and join them together.
+        lightexport = ' '.join([light[0] for light in lights])
+
+        # If there are no lights, we can't pass in an empty string since then
+        # mantra will think that light exports are disabled.  So pass down an
+        # string that presumably doesn't match any light name.
+        if not lightexport:
+            lightexport = "__nolights__"
+
+        planes.append((base_channel, lightexport))
+
+    elif lightexport in ("per-category", "per-cluster"):
+        # The channel is the regular channel named prefixed with the category
+        # or cluster name.
+        for category, lightexport in category_index:
+            planes.append(
+                ("{}_{}".format(category, base_channel), lightexport)
+            )
+
+    return planes, empty_suffix
+
+
 def _callPostDefPlane(data, wrangler, cam, now):
     """Call the post_defplane hook."""
     import IFDhooks
@@ -777,3 +1665,231 @@ def _callPreDefPlane(data, wrangler, cam, now):
         data.get("lightexport")
     )
 
+
+def _clusterLightsByPosition(lights, positions, max_clusters):
+    """Build a list of (cluster, lightexport) tuples grouping the lights into
+    at most a maximum number of clusters by their positions.
+
+    The lights are clustered using k-means, seeded with the lights furthest
+    from the existing seeds so the result is the same for the same lights.
+
+    """
+    def distance(pos1, pos2):
+        return sum([(val1 - val2) ** 2 for val1, val2 in zip(pos1, pos2)])
+
+    centers = [positions[0]]
+
+    while len(centers) < min(max_clusters, len(positions)):
+        furthest = max(
+            positions,
+            key=lambda pos: min([distance(pos, center) for center in centers])
+        )
+
+        # All the remaining lights are at the existing seeds.
+        if furthest in centers:
+            break
+
+        centers.append(furthest)
+
+    assignments = None
+
+    for _ in range(_MAX_CLUSTER_ITERATIONS):
+        new_assignments = [
+            min(
+                range(len(centers)),
+                key=lambda idx: distance(position, centers[idx])
+            )
+            for position in positions
+        ]
+
+        if new_assignments == assignments:
+            break
+
+        assignments = new_assignments
+
+        # Move each center to the average position of its lights.
+        for idx in range(len(centers)):
+            members = [
+                position for position, assignment
+                in zip(positions, assignments) if assignment == idx
+            ]
+
+            if members:
+                centers[idx] = tuple(
+                    [sum(values) / len(members) for values in zip(*members)]
+                )
+
+    cluster_map = {}
+
+    for light, assignment in zip(lights, assignments):
+        cluster_map.setdefault(assignment, []).append(light[0])
+
+    # Order and name the clusters by their first light so the channel names
+    # are consistent.
+    clusters = sorted(cluster_map.values())
+
+    return [
+        ("cluster{}".format(idx), ' '.join(names))
+        for idx, names in enumerate(clusters)
+    ]
+
+
+def _formatPlaneProperty(name, value):
+    """Format a plane property line the same as IFDapi.ray_property."""
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+    return '\tray_property plane {} "{}"\n'.format(name, value)
+
+
+def _formatPlaneTemplate(data):
+    """Format the (start, middle, end) sections of a plane block which are
+    the same for all the planes of an AOV.
+
+    """
+    start = "ray_start plane\n{}{}".format(
+        _formatPlaneProperty("variable", data["variable"]),
+        _formatPlaneProperty("vextype", data["vextype"]),
+    )
+
+    middle = []
+
+    if "quantize" in data:
+        middle.append(_formatPlaneProperty("quantize", data["quantize"]))
+
+    planefile = data.get("planefile")
+
+    if planefile is not None:
+        middle.append(_formatPlaneProperty("planefile", planefile))
+
+    end = []
+
+    if "pfilter" in data:
+        end.append(_formatPlaneProperty("pfilter", data["pfilter"]))
+
+    if "sfilter" in data:
+        end.append(_formatPlaneProperty("sfilter", data["sfilter"]))
+
+    return start, ''.join(middle), ''.join(end)
+
+
+def _getLightExportInfo(light, now):
+    """Get a (name, suffix, prefix, categories) tuple of light export
+    information for a light.
+
+    """
+    name = light.getName()
+
+    # Try and find the suffix using the 'vm_export_suffix' parameter.  If it
+    # doesn't exist, use an empty string.
+    suffix = light.getDefaultedString("vm_export_suffix", now, [''])[0]
+
+    prefix = []
+
+    # Look for the prefix parameter.  If it doesn't exist, use the light's
+    # name and replace the '/' with '_'.  The default value of
+    # 'vm_export_prefix' is usually $OS.
+    if not light.evalString("vm_export_prefix", now, prefix):
+        prefix = [name[1:].replace('/', '_')]
+
+    prefix = prefix[0] if prefix else None
+
+    # Get the raw categories string.  If the light doesn't have a
+    # 'categories' parameter there is no value.
+    categories = []
+    light.evalString("categories", now, categories)
+
+    categories = categories[0] if categories else None
+
+    return (name, suffix, prefix, categories)
+
+
+def _getLightPosition(light, now):
+    """Get the world space position of a light."""
+    xform = []
+
+    # If the light has no transform use the origin.
+    if not light.evalFloat("space:world", now, xform):
+        return (0.0, 0.0, 0.0)
+
+    return tuple(xform[12:15])
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+
+def getExportComponents(wrangler, cam, now):
+    """Get the list of components to export from the Mantra ROP's
+    vm_exportcomponents parameter.
+
+    """
+    import soho
+
+    parms = {
+        "components": soho.SohoParm(
+            "vm_exportcomponents",
+            "str",
+            [""],
+            skipdefault=False
+        ),
+    }
+
+    plist = cam.wrangle(wrangler, parms, now)
+
+    if plist:
+        return plist["vm_exportcomponents"].Value[0].split()
+
+    return []
+
+
+def getLightExportCache():
+    """Get the shared light export cache."""
+    return _LIGHT_EXPORT_CACHE
+
+
+@contextlib.contextmanager
+def planeBatch():
+    """Context manager for batching the output of image planes.
+
+    Duplicate planes written inside the context are skipped and any planes
+    with conflicting channels are reported as an error when the context exits.
+
+    If there are no 'pre_defplane' or 'post_defplane' hooks, the planes are
+    formatted and written to the ifd in a single write when the context
+    exits.  Otherwise each plane is written through IFDapi so the hooks can
+    be called for it.
+
+    """
+    global _PLANE_BATCH
+
+    # Already batching.
+    if _PLANE_BATCH is not None:
+        yield _PLANE_BATCH
+
+        return
+
+    hook_manager = getManager()
+
+    deferred = not hook_manager.getHooks("pre_defplane") and \
+        not hook_manager.getHooks("post_defplane")
+
+    batch = PlaneBatch(deferred)
+
+    _PLANE_BATCH = batch
+
+    try:
+        yield batch
+
+    finally:
+        _PLANE_BATCH = None
+
+        # Write any planes which were added before an error.
+        batch.write()
+
+    batch.reportConflicts()
+
+# =============================================================================
+
+_LIGHT_EXPORT_CACHE = LightExportCache()
+
+_PLANE_BATCH = None
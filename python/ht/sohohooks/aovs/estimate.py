@@ -0,0 +1,312 @@
+"""This module contains functionality for estimating the memory and output
+size of AOV image planes.
+
+"""
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The number of bytes per channel of the framebuffer.  Mantra accumulates
+# samples at full float precision regardless of the plane quantization.
+_FRAMEBUFFER_BYTES = 4
+
+# The number of bytes per channel for each quantization.
+_QUANTIZE_BYTES = {
+    "8": 1,
+    "16": 2,
+    "half": 2,
+    "float": 4,
+}
+
+# The quantization of planes which don't set one.
+_DEFAULT_QUANTIZE = "half"
+
+# The number of channels of each VEX type.
+_VEXTYPE_CHANNELS = {
+    "float": 1,
+    "unitvector": 3,
+    "vector": 3,
+    "vector4": 4,
+}
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class AOVEstimate(object):
+    """This class represents the estimated cost of a number of image
+    planes.
+
+    """
+
+    def __init__(self, planes, resolution):
+        self._planes = planes
+        self._resolution = tuple(resolution)
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<AOVEstimate ({} planes)>".format(self.num_planes)
+
+    def __str__(self):
+        return self.getSummary()
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def num_planes(self):
+        """The total number of image planes."""
+        return sum([plane.count for plane in self.planes])
+
+    # =========================================================================
+
+    @property
+    def planes(self):
+        """A list of PlaneEstimates."""
+        return self._planes
+
+    # =========================================================================
+
+    @property
+    def resolution(self):
+        """The (width, height) image resolution."""
+        return self._resolution
+
+    # =========================================================================
+
+    @property
+    def total_memory(self):
+        """The total framebuffer memory of all planes in bytes."""
+        return sum([plane.total_memory for plane in self.planes])
+
+    # =========================================================================
+
+    @property
+    def total_output_size(self):
+        """The total uncompressed output size of all planes in bytes."""
+        return sum([plane.total_output_size for plane in self.planes])
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def getLines(self):
+        """Get a list of lines describing the estimate of each plane and
+        the totals.
+
+        """
+        lines = [self.getSummary()]
+
+        for plane in self.planes:
+            lines.append("  {}".format(plane))
+
+        return lines
+
+    def getSummary(self):
+        """Get a single line summary of the estimate."""
+        return "{} planes at {}x{}: {} framebuffer, {} output".format(
+            self.num_planes,
+            self.resolution[0],
+            self.resolution[1],
+            formatSize(self.total_memory),
+            formatSize(self.total_output_size)
+        )
+
+# =============================================================================
+
+
+class PlaneEstimate(object):
+    """This class represents the estimated cost of an image plane, or a
+    number of identical image planes.
+
+    """
+
+    def __init__(self, channel, vextype, quantize, resolution, count=1):
+        self._channel = channel
+        self._count = count
+        self._quantize = quantize or _DEFAULT_QUANTIZE
+        self._vextype = vextype
+
+        pixels = resolution[0] * resolution[1]
+
+        self._num_channels = _VEXTYPE_CHANNELS.get(vextype, 1)
+
+        self._memory = pixels * self.num_channels * _FRAMEBUFFER_BYTES
+
+        self._output_size = pixels * self.num_channels * _QUANTIZE_BYTES.get(
+            self.quantize,
+            _QUANTIZE_BYTES[_DEFAULT_QUANTIZE]
+        )
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<PlaneEstimate {}>".format(self.channel)
+
+    def __str__(self):
+        value = "{} ({} {}): {} framebuffer, {} output".format(
+            self.channel,
+            self.vextype,
+            self.quantize,
+            formatSize(self.total_memory),
+            formatSize(self.total_output_size)
+        )
+
+        if self.count != 1:
+            value = "{} x {}".format(value, self.count)
+
+        return value
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def channel(self):
+        """The channel name of the plane."""
+        return self._channel
+
+    # =========================================================================
+
+    @property
+    def count(self):
+        """The number of identical planes."""
+        return self._count
+
+    # =========================================================================
+
+    @property
+    def memory(self):
+        """The framebuffer memory of a single plane in bytes."""
+        return self._memory
+
+    # =========================================================================
+
+    @property
+    def num_channels(self):
+        """The number of channels of the plane."""
+        return self._num_channels
+
+    # =========================================================================
+
+    @property
+    def output_size(self):
+        """The uncompressed output size of a single plane in bytes."""
+        return self._output_size
+
+    # =========================================================================
+
+    @property
+    def quantize(self):
+        """The quantization of the plane."""
+        return self._quantize
+
+    # =========================================================================
+
+    @property
+    def total_memory(self):
+        """The framebuffer memory of all the planes in bytes."""
+        return self.memory * self.count
+
+    # =========================================================================
+
+    @property
+    def total_output_size(self):
+        """The uncompressed output size of all the planes in bytes."""
+        return self.output_size * self.count
+
+    # =========================================================================
+
+    @property
+    def vextype(self):
+        """The VEX type of the plane."""
+        return self._vextype
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def estimateAOVs(aovs, resolution, num_lights=1, num_categories=1,
+                 components=()):
+    """Estimate the cost of a list of AOVs.
+
+    Light exports are expanded using the number of lights and categories and
+    component exports using the components if the AOV doesn't set any.
+
+    """
+    planes = []
+
+    for aov in aovs:
+        channel = aov.channel or aov.variable
+
+        count = 1
+
+        if aov.lightexport == "per-light":
+            count = num_lights
+
+        elif aov.lightexport == "per-category":
+            count = num_categories
+
+        elif aov.lightexport == "per-cluster":
+            count = min(aov.lightexport_clusters, num_lights)
+
+        if aov.componentexport:
+            for component in aov.components or components:
+                planes.append(
+                    PlaneEstimate(
+                        "{}_{}".format(channel, component),
+                        aov.vextype,
+                        aov.quantize,
+                        resolution,
+                        count
+                    )
+                )
+
+        else:
+            planes.append(
+                PlaneEstimate(
+                    channel,
+                    aov.vextype,
+                    aov.quantize,
+                    resolution,
+                    count
+                )
+            )
+
+    return AOVEstimate(planes, resolution)
+
+
+def estimatePlanes(planes, resolution):
+    """Estimate the cost of a list of image plane data."""
+    return AOVEstimate(
+        [
+            PlaneEstimate(
+                data["channel"],
+                data["vextype"],
+                data.get("quantize"),
+                resolution
+            )
+            for data in planes
+        ],
+        resolution
+    )
+
+
+def formatSize(num_bytes):
+    """Format a number of bytes as a readable size."""
+    size = float(num_bytes)
+
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return "{:0.1f} {}".format(size, unit)
+
+        size /= 1024
+
+    return "{:0.1f} TB".format(size)
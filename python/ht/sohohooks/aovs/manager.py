@@ -8,17 +8,35 @@ with AOVs.
 # =============================================================================
 
 # Python Imports
+import bisect
+import copy
 import glob
+import hashlib
 import json
+from multiprocessing.pool import ThreadPool
 import os
+import shutil
+import sys
+import tempfile
 
 # Houdini Toolbox Imports
 from ht.sohohooks.aovs.aov import AOV, AOVGroup, IntrinsicAOVGroup
+from ht.sohohooks.aovs.aov import RecursiveGroupError, getExportComponents
+from ht.sohohooks.aovs.aov import getLightExportCache, planeBatch
+from ht.sohohooks.aovs.estimate import estimatePlanes
+from ht.sohohooks.aovs.validation import DefinitionError, DefinitionValidator
 from ht.utils import convertFromUnicode
 
 # Houdini Imports
 import hou
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The maximum number of threads used to read AOV files.
+_MAX_READ_THREADS = 8
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -27,9 +45,20 @@ class AOVManager(object):
     """This class is for managing and applying AOVs at render time."""
 
     def __init__(self):
+        self._aov_names = []
         self._aovs = {}
+        self._errors = []
+        self._file_paths = []
+        self._file_states = {}
+        self._generation = 0
+        self._group_names = []
         self._groups = {}
         self._interface = None
+        self._loaded_paths = []
+        self._menu = None
+        self._plane_plans = {}
+        self._readers = {}
+        self._resolved = {}
 
         self._initFromFiles()
 
@@ -47,6 +76,18 @@ class AOVManager(object):
     # NON-PUBLIC METHODS
     # =========================================================================
 
+    def _addMenuName(self, names, name):
+        """Add a name to a sorted list of menu names."""
+        idx = bisect.bisect_left(names, name)
+
+        # Replacing an existing definition doesn't change the menu.
+        if idx < len(names) and names[idx] == name:
+            return
+
+        names.insert(idx, name)
+
+        self._menu = None
+
     def _buildIntrinsicGroups(self):
         """Build intrinsic groups."""
         # Process any AOVs that we have to look for any intrinsic groups.
@@ -67,11 +108,99 @@ class AOVManager(object):
                 # Add this AOV to the group.
                 group.aovs.append(aov)
 
+    def _definitionsChanged(self):
+        """Note that the definitions have changed."""
+        self._generation += 1
+
+        # Any resolved strings and plane plans are no longer valid.
+        self._plane_plans.clear()
+        self._resolved.clear()
+
+    def _getPlanePlan(self, aov_str, wrangler, cam, now):
+        """Get the plane plan for a string, building it if necessary.
+
+        Plans are shared by all drivers using the same string and are reused
+        as long as the resolved AOVs, the exported components and the lights
+        matching each light export mask and selection, and their positions
+        if clustered by position, are unchanged.
+
+        """
+        import soho
+
+        aovs = self._resolveString(aov_str)[1]
+
+        components = None
+
+        # Only evaluate the driver's components if an AOV will use them.
+        for aov in aovs:
+            if aov.componentexport and not aov.components:
+                components = tuple(getExportComponents(wrangler, cam, now))
+                break
+
+        light_cache = getLightExportCache()
+
+        masks = set(
+            [
+                (aov.lightexport_scope, aov.lightexport_select)
+                for aov in aovs if aov.lightexport is not None
+            ]
+        )
+
+        # The light export information for each mask and selection.  The
+        # information is shared between evaluations while it is unchanged so
+        # it acts as a fingerprint of the light set.
+        lights = [
+            (mask, light_cache.getLights(cam, now, *mask))
+            for mask in sorted(masks)
+        ]
+
+        position_masks = set(
+            [
+                (aov.lightexport_scope, aov.lightexport_select)
+                for aov in aovs if aov.lightexport == "per-cluster" and
+                aov.lightexport_cluster_by == "position"
+            ]
+        )
+
+        # Lights clustered by position also depend on the light positions.
+        for mask in sorted(position_masks):
+            lights.append(
+                (
+                    ("position",) + mask,
+                    light_cache.getLightPositions(cam, now, *mask)
+                )
+            )
+
+        lights = tuple(lights)
+
+        plan = self._plane_plans.get(aov_str)
+
+        # Reused plans don't go through the light export planning so any
+        # errors need to be reported again.
+        if plan is not None and plan.isValid(aovs, components, lights):
+            if plan.empty_suffix:
+                soho.error("Empty suffix for per-light exports.")
+
+        else:
+            planes = []
+
+            for aov in aovs:
+                planes.extend(aov.getPlanes(wrangler, cam, now))
+
+            plan = PlanePlan(aovs, components, lights, planes)
+
+            self._plane_plans[aov_str] = plan
+
+        return plan
+
     def _initFromFiles(self):
         """Initialize the manager from files on disk."""
-        file_paths = _findAOVFiles()
+        self._file_paths = _findAOVFiles()
+
+        readers, errors = self._readFiles(self._file_paths)
 
-        readers = [AOVFile(file_path) for file_path in file_paths]
+        self._errors = []
+        self._reportErrors(errors)
 
         self._mergeReaders(readers)
 
@@ -85,6 +214,273 @@ class AOVManager(object):
             if include in self.aovs:
                 group.aovs.append(self.aovs[include])
 
+    def _mergeChangedReaders(self, old_readers, new_readers):
+        """Merge the definitions of changed files.
+
+        Priorities are only resolved again for the AOVs and groups defined in
+        the old and new versions of the files.
+
+        """
+        readers = [
+            self._readers[path] for path in self._file_paths
+            if path in self._readers
+        ]
+
+        variables = set()
+        group_names = set()
+
+        for reader in old_readers + new_readers:
+            variables.update([aov.variable for aov in reader.aovs])
+            group_names.update([group.name for group in reader.groups])
+
+        # Find the definitions of the affected AOVs and groups in file order.
+        aov_definitions = dict([(variable, []) for variable in variables])
+        group_definitions = dict([(name, []) for name in group_names])
+
+        for reader in readers:
+            for aov in reader.aovs:
+                if aov.variable in aov_definitions:
+                    aov_definitions[aov.variable].append(aov)
+
+            for group in reader.groups:
+                if group.name in group_definitions:
+                    group_definitions[group.name].append(group)
+
+        changed_variables = set()
+        intrinsics = set()
+
+        for variable in sorted(variables):
+            aov = _findHighestPriority(aov_definitions[variable])
+            current = self.aovs.get(variable)
+
+            if aov is current:
+                continue
+
+            changed_variables.add(variable)
+
+            if current is not None and current.intrinsic is not None:
+                intrinsics.add(current.intrinsic)
+
+            if aov is None:
+                self.removeAOV(current)
+
+            else:
+                if aov.intrinsic is not None:
+                    intrinsics.add(aov.intrinsic)
+
+                self.addAOV(aov)
+
+        changed_groups = set()
+
+        for name in sorted(group_names):
+            group = _findHighestPriority(group_definitions[name])
+            current = self.groups.get(name)
+
+            if group is current:
+                continue
+
+            changed_groups.add(name)
+
+            if group is None:
+                self.removeGroup(current)
+
+            else:
+                del group.aovs[:]
+                self._initGroupMembers(group)
+
+                self.addGroup(group)
+
+        # Update the members of any other groups which include changed AOVs.
+        for group in self.groups.values():
+            if isinstance(group, IntrinsicAOVGroup):
+                continue
+
+            if group.name in changed_groups:
+                continue
+
+            if changed_variables.intersection(group.includes):
+                del group.aovs[:]
+                self._initGroupMembers(group)
+
+                self.updateGroup(group)
+
+        for intrinsic in sorted(intrinsics):
+            self._updateIntrinsicGroup(intrinsic)
+
+        self._resolveGroupIncludes()
+
+    def _readFiles(self, file_paths):
+        """Read a list of files, recording their state so changes can be
+        detected.
+
+        """
+        # Get the state before reading so changes made while reading are
+        # detected.
+        stats = dict([(path, _getFileStat(path)) for path in file_paths])
+
+        readers, errors, checksums = _readAOVFiles(file_paths)
+
+        for path, checksum in checksums.iteritems():
+            self._file_states[path] = (stats[path], checksum)
+
+            # Files which can't be decoded have no reader.
+            self._readers.pop(path, None)
+
+        for reader in readers:
+            self._readers[reader.path] = reader
+
+        return readers, errors
+
+    def _removeMenuName(self, names, name):
+        """Remove a name from a sorted list of menu names."""
+        idx = bisect.bisect_left(names, name)
+
+        if idx < len(names) and names[idx] == name:
+            del names[idx]
+
+            self._menu = None
+
+    def _reportErrors(self, errors):
+        """Report errors found in definition files."""
+        for error in errors:
+            sys.stderr.write("AOV definition error: {}\n".format(error))
+
+        self._errors.extend(errors)
+
+    def _resolveGroupIncludes(self):
+        """Resolve the groups included by each group.
+
+        Includes which would make a group include itself are not added and
+        are reported as errors instead.
+
+        """
+        for group in self.groups.itervalues():
+            group.clearGroups()
+
+        errors = []
+
+        for group_name in sorted(self.groups):
+            group = self.groups[group_name]
+
+            for include in group.includes:
+                # Included groups are prefixed with '@'.
+                if include.startswith('@'):
+                    name = include[1:]
+
+                    if name not in self.groups:
+                        continue
+
+                    included = self.groups[name]
+
+                    names = _findGroupIncludePath(included, group)
+
+                    if names is not None:
+                        errors.append(
+                            RecursiveGroupError(
+                                [group.name] + names,
+                                group.path
+                            )
+                        )
+
+                        continue
+
+                    group.addGroup(included)
+
+        # Replace any errors from previously resolving the includes.
+        self._errors = [
+            error for error in self._errors
+            if not isinstance(error, RecursiveGroupError)
+        ]
+
+        self._reportErrors(errors)
+
+    def _updateIntrinsicGroup(self, intrinsic):
+        """Update the members of an intrinsic group, creating or removing
+        the group as necessary.
+
+        """
+        # Intrinsic groups are prefixed with "i:".
+        intrinsic_name = "i:" + intrinsic
+
+        aovs = [
+            aov for aov in self.aovs.itervalues()
+            if aov.intrinsic == intrinsic
+        ]
+
+        group = self.groups.get(intrinsic_name)
+
+        if not aovs:
+            if group is not None:
+                self.removeGroup(group)
+
+            return
+
+        if group is None:
+            group = IntrinsicAOVGroup(intrinsic_name)
+            group.aovs.extend(aovs)
+
+            self.addGroup(group)
+
+        else:
+            del group.aovs[:]
+            group.aovs.extend(aovs)
+
+            self.updateGroup(group)
+
+    def _resolveString(self, aov_str):
+        """Resolve a string into a tuple of AOVs and AOVGroups and a tuple
+        of the flattened, de-duplicated AOVs.
+
+        """
+        key = (aov_str, self.generation)
+
+        resolved = self._resolved.get(key)
+
+        # The resolved AOVs are only valid if the flattened AOVs of all the
+        # groups are the same as when they were resolved.
+        if resolved is not None:
+            for group, flattened in resolved[2]:
+                if group.flattened_aovs is not flattened:
+                    resolved = None
+                    break
+
+        if resolved is None:
+            items = []
+
+            aov_str = aov_str.replace(',', ' ')
+
+            for name in aov_str.split():
+                if name.startswith('@'):
+                    name = name[1:]
+
+                    if name in self.groups:
+                        items.append(self.groups[name])
+
+                else:
+                    if name in self._aovs:
+                        items.append(self._aovs[name])
+
+            aovs = []
+            variables = set()
+
+            for aov in flattenedList(items):
+                if aov.variable not in variables:
+                    variables.add(aov.variable)
+                    aovs.append(aov)
+
+            groups = tuple(
+                [
+                    (item, item.flattened_aovs) for item in items
+                    if isinstance(item, AOVGroup)
+                ]
+            )
+
+            resolved = (tuple(items), tuple(aovs), groups)
+
+            self._resolved[key] = resolved
+
+        return resolved
+
     def _mergeReaders(self, readers):
         """Merge the data of multiple AOVFile objects."""
         # We need to handle AOVs first since AOVs in other files may overwrite
@@ -122,10 +518,29 @@ class AOVManager(object):
                 else:
                     self.addGroup(group)
 
+        # Now that all groups are available, resolve any included groups.
+        self._resolveGroupIncludes()
+
     # =========================================================================
     # PROPERTIES
     # =========================================================================
 
+    @property
+    def errors(self):
+        """List of DefinitionErrors for invalid definitions which were not
+        loaded.
+
+        """
+        return self._errors
+
+    @property
+    def generation(self):
+        """The generation of the definitions, changed each time they are
+        modified.
+
+        """
+        return self._generation
+
     @property
     def interface(self):
         """Any AOVViewerInterface assigned to the manager."""
@@ -181,18 +596,46 @@ class AOVManager(object):
             # Construct a manager-laf
             manager = findOrCreateSessionAOVManager()
 
-            # Parse the string to get any aovs/groups.
-            aovs = manager.getAOVsFromString(aov_str)
+            # Parse the string to get any aovs.
+            aovs = manager.getFlattenedAOVsFromString(aov_str)
 
-            # Write any found items to the ifd.
-            for aov in aovs:
-                aov.writeToIfd(wrangler, cam, now)
+            # The lights may have changed since the last ifd, even if it was
+            # for the same frame.
+            getLightExportCache().expireLights()
+
+            # Get the planes to output.  Other drivers using the same string
+            # share the plan.
+            plan = manager._getPlanePlan(aov_str, wrangler, cam, now)
+
+            # Write the planes to the ifd, skipping any duplicates.
+            with planeBatch() as batch:
+                num_planes = len(batch.planes)
+
+                for data in plan.planes:
+                    AOV.writeDataToIfd(data, wrangler, cam, now)
+
+                written = batch.planes[num_planes:]
+
+            # Note the estimated cost of the planes which were written.
+            if written:
+                resolution = cam.wrangleInt(wrangler, "res", now, [640, 480])
+
+                # The plan's estimate is reused when no planes were skipped.
+                if len(written) == len(plan.planes):
+                    estimate = plan.getEstimate(resolution)
+
+                else:
+                    estimate = estimatePlanes(written, resolution)
+
+                IFDapi.ray_comment(
+                    "Automatic AOVs: {}".format(estimate.getSummary())
+                )
 
             # If we are generating the "Op_Id" plane we will need to tell SOHO
             # to generate these properties when outputting object.  Look for
             # the "Op_Id" variable being exported and if so enable operator id
             # generation
-            for aov in flattenedList(aovs):
+            for aov in aovs:
                 if aov.variable == "Op_Id":
                     IFDapi.ray_comment("Forcing object id generation")
                     IFDsettings._GenerateOpId = True
@@ -207,6 +650,10 @@ class AOVManager(object):
         """Add an AOV to the manager."""
         self._aovs[aov.variable] = aov
 
+        self._addMenuName(self._aov_names, aov.variable)
+
+        self._definitionsChanged()
+
         if self.interface is not None:
             self.interface.aovAddedSignal.emit(aov)
 
@@ -214,32 +661,60 @@ class AOVManager(object):
         """Add an AOVGroup to the manager."""
         self.groups[group.name] = group
 
+        self._addMenuName(self._group_names, group.name)
+
+        self._definitionsChanged()
+
         if self.interface is not None:
             self.interface.groupAddedSignal.emit(group)
 
     def clear(self):
         """Clear all definitions."""
+        self._aov_names = []
         self._aovs = {}
+        self._file_states = {}
+        self._group_names = []
         self._groups = {}
+        self._menu = None
+        self._readers = {}
+
+        self._definitionsChanged()
 
     def getAOVsFromString(self, aov_str):
         """Get a list of AOVs and AOVGroups from a string."""
-        aovs = []
+        return list(self._resolveString(aov_str)[0])
 
-        aov_str = aov_str.replace(',', ' ')
+    def getFlattenedAOVsFromString(self, aov_str):
+        """Get a tuple of all the AOVs from a string.
 
-        for name in aov_str.split():
-            if name.startswith('@'):
-                name = name[1:]
+        Any groups are expanded into their AOVs and duplicate AOVs are
+        removed.  The result is cached until the definitions change.
 
-                if name in self.groups:
-                    aovs.append(self.groups[name])
+        """
+        return self._resolveString(aov_str)[1]
 
-            else:
-                if name in self._aovs:
-                    aovs.append(self._aovs[name])
+    def getMenuItems(self):
+        """Get a menu list for choosing AOVs and groups.
 
-        return aovs
+        The list is sorted and cached until AOVs or groups are added or
+        removed.  It should not be modified.
+
+        """
+        if self._menu is None:
+            menu = []
+
+            if self._group_names:
+                for name in self._group_names:
+                    menu.extend(["@{}".format(name), name])
+
+                menu.extend(["_separator_", "---------"])
+
+            for name in self._aov_names:
+                menu.extend([name, name])
+
+            self._menu = menu
+
+        return self._menu
 
     def initInterface(self):
         """Initialize an AOVViewerInterface for this manager."""
@@ -249,20 +724,147 @@ class AOVManager(object):
 
     def load(self, path):
         """Load a file."""
-        readers = [AOVFile(path)]
+        if path not in self._loaded_paths:
+            self._loaded_paths.append(path)
+
+        if path not in self._file_paths:
+            self._file_paths.append(path)
+
+        readers, errors = self._readFiles([path])
+
+        self._reportErrors(errors)
 
         self._mergeReaders(readers)
 
+    def recordFile(self, path, checksum, data):
+        """Record the contents of a file written by this session so it
+        isn't read again when reloading changed files.
+
+        The definitions in the data are merged the same as if the file had
+        been reloaded.  The manager builds its own definitions from a copy
+        of the data.  Only files the manager has read are recorded.
+
+        """
+        if path not in self._file_states:
+            return
+
+        self._file_states[path] = (_getFileStat(path), checksum)
+
+        old_readers = []
+
+        if path in self._readers:
+            old_readers.append(self._readers[path])
+
+        reader = AOVFile(path, copy.deepcopy(data))
+
+        self._readers[path] = reader
+
+        # Replace any errors from the previous contents.
+        self._errors = [error for error in self._errors if error.path != path]
+
+        self._mergeChangedReaders(old_readers, [reader])
+
     def reload(self):
         """Reload all definitions."""
         self.clear()
         self._initFromFiles()
 
+        for path in self._loaded_paths:
+            self.load(path)
+
+    def reloadChanged(self):
+        """Reload only the files which have changed since they were read.
+
+        Files are considered changed if they were added or removed or their
+        contents changed.  Only the AOVs and groups defined in those files are
+        added, removed or updated.  Returns whether any files changed.
+
+        """
+        file_paths = _findAOVFiles()
+
+        for path in self._loaded_paths:
+            if path not in file_paths:
+                file_paths.append(path)
+
+        file_paths = [path for path in file_paths if os.path.isfile(path)]
+
+        # Only read files whose modification time or size has changed.
+        modified = [
+            path for path in file_paths
+            if path not in self._file_states or
+            self._file_states[path][0] != _getFileStat(path)
+        ]
+
+        removed = [
+            path for path in self._file_states if path not in file_paths
+        ]
+
+        checksums = dict(
+            [(path, self._file_states[path][1]) for path in modified
+             if path in self._file_states]
+        )
+
+        old_readers = [
+            self._readers[path] for path in modified + removed
+            if path in self._readers
+        ]
+
+        self._file_paths = file_paths
+
+        for path in removed:
+            self._file_states.pop(path)
+            self._readers.pop(path, None)
+
+        new_readers, errors = self._readFiles(modified)
+
+        # Files which were touched but have the same contents don't need to
+        # be merged again.
+        unchanged = set(
+            [
+                path for path in modified
+                if checksums.get(path) == self._file_states[path][1]
+            ]
+        )
+
+        for reader in old_readers:
+            if reader.path in unchanged:
+                self._readers[reader.path] = reader
+
+        old_readers = [
+            reader for reader in old_readers if reader.path not in unchanged
+        ]
+
+        new_readers = [
+            reader for reader in new_readers if reader.path not in unchanged
+        ]
+
+        changed = (set(modified) - unchanged).union(removed)
+
+        if not changed:
+            return False
+
+        # Replace any errors from the changed files.
+        self._errors = [
+            error for error in self._errors if error.path not in changed
+        ]
+
+        self._reportErrors(
+            [error for error in errors if error.path not in unchanged]
+        )
+
+        self._mergeChangedReaders(old_readers, new_readers)
+
+        return True
+
     def removeAOV(self, aov):
         """Remove the specified AOV from the manager."""
         if aov.variable in self.aovs:
             self.aovs.pop(aov.variable)
 
+            self._removeMenuName(self._aov_names, aov.variable)
+
+            self._definitionsChanged()
+
             if self.interface is not None:
                 self.interface.aovRemovedSignal.emit(aov)
 
@@ -271,39 +873,166 @@ class AOVManager(object):
         if group.name in self.groups:
             self.groups.pop(group.name)
 
+            self._removeMenuName(self._group_names, group.name)
+
+            self._definitionsChanged()
+
             if self.interface is not None:
                 self.interface.groupRemovedSignal.emit(group)
 
+    def updateAOV(self, aov):
+        """Note that an AOV in the manager has been modified."""
+        self._definitionsChanged()
+
+        if self.interface is not None:
+            self.interface.aovUpdatedSignal.emit(aov)
+
+    def updateGroup(self, group):
+        """Note that an AOVGroup in the manager has been modified."""
+        self._definitionsChanged()
+
+        if self.interface is not None:
+            self.interface.groupUpdatedSignal.emit(group)
+
+# =============================================================================
+
+class PlanePlan(object):
+    """This class represents the image planes resolved from an automatic
+    AOV string.
+
+    """
+
+    def __init__(self, aovs, components, lights, planes):
+        self._aovs = aovs
+        self._components = components
+        self._estimates = {}
+        self._lights = lights
+        self._planes = planes
+
+        self._empty_suffix = _hasEmptySuffix(aovs, components, lights)
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<PlanePlan ({} planes)>".format(len(self.planes))
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def aovs(self):
+        """The tuple of AOVs the plan was built from."""
+        return self._aovs
+
+    # =========================================================================
+
+    @property
+    def components(self):
+        """The exported components the plan was built with, if any."""
+        return self._components
+
+    # =========================================================================
+
+    @property
+    def empty_suffix(self):
+        """Whether or not per-light exports had no prefix or suffix."""
+        return self._empty_suffix
+
+    # =========================================================================
+
+    @property
+    def lights(self):
+        """A tuple of light export information for each light mask and
+        selection.
+
+        """
+        return self._lights
+
+    # =========================================================================
+
+    @property
+    def planes(self):
+        """A list of image plane data to output."""
+        return self._planes
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def getEstimate(self, resolution):
+        """Get the estimated cost of the planes at a resolution."""
+        resolution = tuple(resolution)
+
+        estimate = self._estimates.get(resolution)
+
+        if estimate is None:
+            estimate = estimatePlanes(self.planes, resolution)
+
+            self._estimates[resolution] = estimate
+
+        return estimate
+
+    def isValid(self, aovs, components, lights):
+        """Check if the plan is still valid for the AOVs, components and
+        light export information.
+
+        """
+        if aovs is not self.aovs or components != self.components:
+            return False
+
+        if len(lights) != len(self.lights):
+            return False
+
+        # Unchanged light information is shared between evaluations so this
+        # is an identity check.
+        for (mask, records), plan_lights in zip(lights, self.lights):
+            if mask != plan_lights[0] or records is not plan_lights[1]:
+                return False
+
+        return True
+
 # =============================================================================
 
 class AOVFile(object):
-    """Class to handle reading and writing AOV .json files."""
+    """Class to handle reading and writing AOV .json files.
+
+    If data is passed it is used instead of reading the file.
 
-    def __init__(self, path):
+    """
+
+    def __init__(self, path, data=None):
         self._path = path
 
         self._aovs = []
         self._data = {}
+        self._dirty = False
         self._groups = []
 
-        if self.exists:
+        if data is not None:
+            self._initFromData(data)
+
+        elif self.exists:
             self._initFromFile()
 
     # =========================================================================
     # NON-PUBLIC METHODS
     # =========================================================================
 
-    def _initFromFile(self):
-        """Read data from the file and create the appropriate entities."""
-        with open(self.path) as handle:
-            data = json.load(handle, object_hook=convertFromUnicode)
-
+    def _initFromData(self, data):
+        """Create the appropriate entities from file data."""
         if "definitions" in data:
             self._createAOVs(data["definitions"])
 
         if "groups" in data:
             self._createGroups(data["groups"])
 
+    def _initFromFile(self):
+        """Read data from the file and create the appropriate entities."""
+        self._initFromData(_loadJsonFile(self.path))
+
     # =========================================================================
 
     def _createAOVs(self, definitions):
@@ -370,6 +1099,16 @@ class AOVFile(object):
 
     # =========================================================================
 
+    @property
+    def dirty(self):
+        """Whether or not the definitions have changed since the file was
+        read or written.
+
+        """
+        return self._dirty
+
+    # =========================================================================
+
     @property
     def exists(self):
         """Check if the file actually exists."""
@@ -383,10 +1122,14 @@ class AOVFile(object):
         """Add an AOV for writing."""
         self.aovs.append(aov)
 
+        self._dirty = True
+
     def addGroup(self, group):
         """Add An AOVGroup for writing."""
         self.groups.append(group)
 
+        self._dirty = True
+
     def containsAOV(self, aov):
         """Check if this file contains an AOV with the same variable name."""
         return aov in self.aovs
@@ -401,26 +1144,48 @@ class AOVFile(object):
 
         del self.aovs[idx]
 
+        self._dirty = True
+
     def removeGroup(self, group):
         """Remove a group from the file."""
         idx = self.groups.index(group)
 
         del self.groups[idx]
 
+        self._dirty = True
+
     def replaceAOV(self, aov):
         """Replace an AOV in the file."""
         idx = self.aovs.index(aov)
 
         self.aovs[idx] = aov
 
+        self._dirty = True
+
     def replaceGroup(self, group):
         """Replace a group in the file."""
         idx = self.groups.index(group)
 
         self.groups[idx] = group
 
+        self._dirty = True
+
     def writeToFile(self, path=None):
-        """Write data to file."""
+        """Write data to file.
+
+        The file is only written if the definitions have changed or a
+        different path is passed, and its contents would be different.  The
+        data is written to a temporary file which then replaces the file so
+        readers never see a partially written file.  Returns whether the file
+        was written.
+
+        """
+        if path is None:
+            path = self.path
+
+        if not self.dirty and path == self.path:
+            return False
+
         data = {}
 
         for group in self.groups:
@@ -433,11 +1198,29 @@ class AOVFile(object):
 
             aovs.append(aov.getData())
 
-        if path is None:
-            path = self.path
+        text = json.dumps(data, indent=4)
+
+        checksum = hashlib.md5(text).hexdigest()
 
-        with open(path, 'w') as handle:
-            json.dump(data, handle, indent=4)
+        # The file already contains the data.
+        if os.path.isfile(path) and _getFileChecksum(path) == checksum:
+            if path == self.path:
+                self._dirty = False
+
+            return False
+
+        _writeFileAtomically(path, text)
+
+        # Only mark the definitions as saved once the file was written.
+        if path == self.path:
+            self._dirty = False
+
+        # Let the session manager know about the new contents so it doesn't
+        # need to read the file again.
+        if hasattr(hou.session, "aov_manager"):
+            hou.session.aov_manager.recordFile(path, checksum, data)
+
+        return True
 
 # =============================================================================
 # NON-PUBLIC FUNCTIONS
@@ -473,6 +1256,40 @@ def _findAOVFiles():
     return all_files
 
 
+def _findGroupIncludePath(group, target):
+    """Find the names of the groups from a group to a group it includes,
+    directly or indirectly.
+
+    Returns None if the group doesn't include the target.
+
+    """
+    if group is target:
+        return [group.name]
+
+    for included in group.groups:
+        names = _findGroupIncludePath(included, target)
+
+        if names is not None:
+            return [group.name] + names
+
+    return None
+
+
+def _findHighestPriority(items):
+    """Find the item with the highest priority.
+
+    The first item wins if there are multiple items with the same priority.
+
+    """
+    highest = None
+
+    for item in items:
+        if highest is None or item.priority > highest.priority:
+            highest = item
+
+    return highest
+
+
 def _findHoudiniPathAOVFolders():
     """Look for any config/aovs folders in the HOUDINI_PATH."""
     # Try to find HOUDINI_PATH directories.
@@ -484,6 +1301,166 @@ def _findHoudiniPathAOVFolders():
 
     return directories
 
+def _getFileChecksum(path):
+    """Get the checksum of the contents of a file."""
+    with open(path) as handle:
+        return hashlib.md5(handle.read()).hexdigest()
+
+
+def _getFileStat(path):
+    """Get a (modification time, size) tuple for a file."""
+    stat = os.stat(path)
+
+    return (stat.st_mtime, stat.st_size)
+
+
+def _hasEmptySuffix(aovs, components, lights):
+    """Check if any per-light exports will have no prefix or suffix."""
+    records = dict(lights)
+
+    for aov in aovs:
+        if aov.lightexport != "per-light":
+            continue
+
+        # Component exports without any components output nothing.
+        if aov.componentexport and not (aov.components or components):
+            continue
+
+        mask = (aov.lightexport_scope, aov.lightexport_select)
+
+        for _, suffix, prefix, _ in records[mask]:
+            if prefix is None and not suffix:
+                return True
+
+    return False
+
+
+def _loadJsonFile(path):
+    """Load the data from a .json file, converting any unicode to normal
+    strings.
+
+    """
+    with open(path) as handle:
+        return json.load(handle, object_hook=convertFromUnicode)
+
+
+def _readAOVFiles(file_paths):
+    """Read AOVFiles for a list of paths.
+
+    The files are read and decoded concurrently but the readers are created
+    in the same order as the paths so priority resolution is not affected.
+
+    All definitions are validated before the readers are created.  Returns
+    the readers, containing only valid definitions, a list of
+    DefinitionErrors for the invalid definitions and a dictionary of the
+    checksum of each file.
+
+    """
+    file_paths = [path for path in file_paths if os.path.isfile(path)]
+
+    if len(file_paths) < 2:
+        all_data = [_readJsonData(path) for path in file_paths]
+
+    else:
+        pool = ThreadPool(min(len(file_paths), _MAX_READ_THREADS))
+
+        # Only read and decode the files in the threads.  Converting the data
+        # and creating the readers may import modules, which would deadlock
+        # if the manager is being created during an import, so that is done
+        # here.
+        try:
+            all_data = pool.map(_readJsonData, file_paths)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    validator = DefinitionValidator()
+
+    checksums = {}
+    readers = []
+    errors = []
+
+    for file_path, (checksum, data) in zip(file_paths, all_data):
+        checksums[file_path] = checksum
+
+        # The file could not be decoded.
+        if isinstance(data, ValueError):
+            errors.append(DefinitionError(file_path, None, str(data)))
+            continue
+
+        data, file_errors = validator.validateData(
+            file_path,
+            convertFromUnicode(data)
+        )
+
+        errors.extend(file_errors)
+
+        readers.append(AOVFile(file_path, data))
+
+    return readers, errors, checksums
+
+
+def _readJsonData(path):
+    """Read the checksum and data from a .json file, returning any decoding
+    error instead of raising it.
+
+    """
+    with open(path) as handle:
+        text = handle.read()
+
+    checksum = hashlib.md5(text).hexdigest()
+
+    try:
+        return checksum, json.loads(text)
+
+    except ValueError as e:
+        return checksum, e
+
+
+def _writeFileAtomically(path, text):
+    """Write text to a file by replacing it with a temporary file."""
+    directory, file_name = os.path.split(os.path.abspath(path))
+
+    handle, temp_path = tempfile.mkstemp(
+        prefix=".{}.".format(file_name),
+        dir=directory
+    )
+
+    try:
+        with os.fdopen(handle, 'w') as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        # Keep the permissions of any existing file, otherwise use the
+        # default permissions instead of the private temporary file ones.
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+
+            os.chmod(temp_path, 0o666 & ~umask)
+
+        try:
+            os.rename(temp_path, path)
+
+        # Windows can't rename over an existing file.
+        except OSError:
+            if os.name != "nt" or not os.path.exists(path):
+                raise
+
+            os.remove(path)
+            os.rename(temp_path, path)
+
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        raise
+
 # =============================================================================
 # FUNCTIONS
 # =============================================================================
@@ -492,18 +1469,7 @@ def buildMenuScript():
     """Build a menu script for choosing AOVs and groups."""
     manager = findOrCreateSessionAOVManager()
 
-    menu = []
-
-    if manager.groups:
-        for group in sorted(manager.groups.keys()):
-            menu.extend(["@{}".format(group), group])
-
-        menu.extend(["_separator_", "---------"])
-
-    for aov in sorted(manager.aovs):
-        menu.extend([aov, aov])
-
-    return menu
+    return manager.getMenuItems()
 
 
 def createSessionAOVManager():
@@ -533,7 +1499,7 @@ def flattenedList(items):
 
     for item in items:
         if isinstance(item, AOVGroup):
-            aovs.extend(item.aovs)
+            aovs.extend(item.flattened_aovs)
 
         else:
             aovs.append(item)
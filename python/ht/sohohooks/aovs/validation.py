@@ -0,0 +1,380 @@
+"""This module contains functionality for validating AOV definition files.
+
+All the AOV and group definitions of a number of files can be checked in a
+single pass, collecting every problem instead of stopping at the first one.
+The module can also be run to lint AOV files:
+
+    python -m ht.sohohooks.aovs.validation file1.json file2.json
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Python Imports
+import argparse
+import bisect
+import json
+import re
+import sys
+
+# Houdini Toolbox Imports
+from ht.sohohooks.aovs.aov import ALLOWABLE_VALUES, AOVError
+from ht.sohohooks.aovs.aov import InvalidAOVValueError, MissingVariableError
+from ht.sohohooks.aovs.aov import MissingVexTypeError
+from ht.utils import convertFromUnicode
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class DefinitionValidator(object):
+    """This class validates AOV and group definitions.
+
+    The allowable values are compiled into sets when the validator is created
+    so each definition is checked with a lookup per setting.
+
+    """
+
+    def __init__(self):
+        self._allowable = {}
+
+        for name, values in ALLOWABLE_VALUES.iteritems():
+            self._allowable[name] = (frozenset(values), values)
+
+    # =========================================================================
+    # SPECIAL METHODS
+    # =========================================================================
+
+    def __repr__(self):
+        return "<DefinitionValidator>"
+
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _isAllowed(self, name, value):
+        """Check if a value is allowed for a setting."""
+        allowed, values = self._allowable[name]
+
+        try:
+            return value in allowed
+
+        # Unhashable values can't be in the set but fall back to the same
+        # comparison the AOV makes.
+        except TypeError:
+            return value in values
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def validateAOV(self, definition):
+        """Get a list of errors for an AOV definition."""
+        if not isinstance(definition, dict):
+            return ["AOV definition must be an object."]
+
+        errors = []
+
+        for name in self._allowable:
+            if name in definition and \
+               not self._isAllowed(name, definition[name]):
+                errors.append(
+                    InvalidAOVValueError(
+                        name,
+                        definition[name],
+                        self._allowable[name][1]
+                    )
+                )
+
+        if "lightexport_clusters" in definition:
+            clusters = definition["lightexport_clusters"]
+
+            # Booleans are integers but aren't a sensible number of clusters.
+            valid = isinstance(clusters, (int, long)) and \
+                not isinstance(clusters, bool) and clusters > 0
+
+            if not valid:
+                errors.append(
+                    "'lightexport_clusters' must be a positive integer."
+                )
+
+        if definition.get("variable") is None:
+            errors.append(MissingVariableError())
+
+        elif definition.get("vextype") is None:
+            errors.append(MissingVexTypeError(definition["variable"]))
+
+        return errors
+
+    def validateData(self, path, data):
+        """Validate the data of an AOV file.
+
+        Returns a copy of the data containing only the valid definitions and
+        a list of DefinitionErrors.
+
+        """
+        if not isinstance(data, dict):
+            error = DefinitionError(path, None, "File must contain an object.")
+
+            return {}, [error]
+
+        valid_data = dict(data)
+
+        # Tuples of (index or name, problem) for each invalid definition.
+        aov_problems = []
+        group_problems = []
+
+        file_problems = []
+
+        if "definitions" in data:
+            definitions = data["definitions"]
+
+            if isinstance(definitions, list):
+                valid_definitions = []
+
+                for idx, definition in enumerate(definitions):
+                    problems = self.validateAOV(definition)
+
+                    if problems:
+                        aov_problems.extend(
+                            [(idx, problem) for problem in problems]
+                        )
+
+                    else:
+                        valid_definitions.append(definition)
+
+                valid_data["definitions"] = valid_definitions
+
+            else:
+                file_problems.append("'definitions' must be a list.")
+                del valid_data["definitions"]
+
+        if "groups" in data:
+            groups = data["groups"]
+
+            if isinstance(groups, dict):
+                valid_groups = {}
+
+                for name, group_data in groups.iteritems():
+                    problems = self.validateGroup(name, group_data)
+
+                    if problems:
+                        group_problems.extend(
+                            [(name, problem) for problem in problems]
+                        )
+
+                    else:
+                        valid_groups[name] = group_data
+
+                valid_data["groups"] = valid_groups
+
+            else:
+                file_problems.append("'groups' must be an object.")
+                del valid_data["groups"]
+
+        errors = [
+            DefinitionError(path, None, problem) for problem in file_problems
+        ]
+
+        # Only find the lines of the definitions if there are any problems.
+        if aov_problems or group_problems:
+            aov_lines, group_lines = _findDefinitionLines(path)
+
+            for idx, problem in aov_problems:
+                line = aov_lines[idx] if idx < len(aov_lines) else None
+
+                errors.append(DefinitionError(path, line, problem))
+
+            for name, problem in group_problems:
+                errors.append(
+                    DefinitionError(path, group_lines.get(name), problem)
+                )
+
+        return valid_data, errors
+
+    def validateGroup(self, name, group_data):
+        """Get a list of errors for a group definition."""
+        if not isinstance(group_data, dict):
+            return ["Group '{}' must be an object.".format(name)]
+
+        errors = []
+
+        if "include" in group_data:
+            includes = group_data["include"]
+
+            valid = isinstance(includes, list) and all(
+                [isinstance(include, basestring) for include in includes]
+            )
+
+            if not valid:
+                errors.append(
+                    "Group '{}' 'include' must be a list of names.".format(
+                        name
+                    )
+                )
+
+        return errors
+
+# =============================================================================
+# EXCEPTIONS
+# =============================================================================
+
+
+class DefinitionError(AOVError):
+    """Exception for invalid definitions in an AOV file."""
+
+    def __init__(self, path, line, error):
+        super(DefinitionError, self).__init__()
+        self.error = error
+        self.line = line
+        self.path = path
+
+    def __str__(self):
+        if self.line is None:
+            return "{}: {}".format(self.path, self.error)
+
+        return "{}:{}: {}".format(self.path, self.line, self.error)
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _findDefinitionLines(path):
+    """Find the line numbers of the definitions in an AOV file.
+
+    Returns a list of the line of each AOV definition and a dictionary of the
+    line of each group definition.
+
+    """
+    with open(path) as handle:
+        text = handle.read()
+
+    decoder = json.JSONDecoder()
+
+    # The offsets of each new line so offsets can be converted to lines.
+    newlines = [match.start() for match in re.finditer("\n", text)]
+
+    def getLine(offset):
+        return bisect.bisect_left(newlines, offset) + 1
+
+    aov_lines = []
+    group_lines = {}
+
+    start = _WHITESPACE.match(text).end()
+
+    for key, offset in _iterMembers(decoder, text, start):
+        if key == "definitions" and text[offset] == '[':
+            aov_lines = [
+                getLine(member_offset)
+                for _, member_offset in _iterMembers(decoder, text, offset)
+            ]
+
+        elif key == "groups" and text[offset] == '{':
+            group_lines = dict(
+                (name, getLine(member_offset))
+                for name, member_offset in _iterMembers(decoder, text, offset)
+            )
+
+    return aov_lines, group_lines
+
+
+def _iterMembers(decoder, text, offset):
+    """Iterate over the members of the JSON object or array starting at an
+    offset in valid JSON text.
+
+    Yields (key, offset) tuples for the value of each member.  Array members
+    have no key.
+
+    """
+    is_object = text[offset] == '{'
+
+    offset = _WHITESPACE.match(text, offset + 1).end()
+
+    if text[offset] in "}]":
+        return
+
+    while True:
+        key = None
+
+        if is_object:
+            key, offset = decoder.raw_decode(text, offset)
+
+            # Skip the ':' separating the key and value.
+            offset = _WHITESPACE.match(text, offset).end()
+            offset = _WHITESPACE.match(text, offset + 1).end()
+
+        yield key, offset
+
+        offset = decoder.raw_decode(text, offset)[1]
+        offset = _WHITESPACE.match(text, offset).end()
+
+        if text[offset] != ',':
+            return
+
+        offset = _WHITESPACE.match(text, offset + 1).end()
+
+
+def _parseArgs():
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Check AOV definition files for invalid definitions."
+    )
+
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="AOV definition files to check."
+    )
+
+    return parser.parse_args()
+
+# =============================================================================
+# FUNCTIONS
+# =============================================================================
+
+def main():
+    """Main function."""
+    args = _parseArgs()
+
+    errors = validateFiles(args.paths)
+
+    for error in errors:
+        print error
+
+    sys.exit(1 if errors else 0)
+
+
+def validateFiles(paths):
+    """Get a list of DefinitionErrors for all the definitions in a list of
+    AOV files.
+
+    """
+    validator = DefinitionValidator()
+
+    errors = []
+
+    for path in paths:
+        try:
+            with open(path) as handle:
+                data = json.load(handle, object_hook=convertFromUnicode)
+
+        except (IOError, ValueError) as e:
+            errors.append(DefinitionError(path, None, str(e)))
+            continue
+
+        errors.extend(validator.validateData(path, data)[1])
+
+    return errors
+
+# =============================================================================
+
+if __name__ == "__main__":
+    main()
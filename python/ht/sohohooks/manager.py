@@ -5,8 +5,34 @@
 # =============================================================================
 
 # Standard Library Imports
+import bisect
+import importlib
+import json
+import os
+import time
 import traceback
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The environment variable to enable automatically outputting hook statistics.
+# If the value is a path to a .json file the statistics are appended to the
+# list of records in it, otherwise they are written to the ifd as comments.
+# The statistics are cleared after being output so each output only covers
+# the calls since the previous one.
+STATS_ENV_VAR = "HT_SOHO_HOOK_STATS"
+
+# The environment variable to override the hook after which the statistics
+# are output.
+STATS_HOOK_ENV_VAR = "HT_SOHO_HOOK_STATS_HOOK"
+
+# The default hook to output statistics after.
+_DEFAULT_STATS_HOOK = "post_ifdGen"
+
+# The path of the hook registry files relative to HOUDINI_PATH.
+_REGISTRY_FILE_PATH = "soho/hooks.json"
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -15,11 +41,164 @@ class SohoHookManager(object):
     """This class manages custom soho hooks."""
 
     def __init__(self):
+        self._hook_keys = {}
         self._hooks = {}
+        self._num_registered = 0
+        self._pending = {}
+        self._registry_loaded = False
+        self._stats = {}
 
     def __repr__(self):
         return "<SohoHookManager ({} hooks)>".format(len(self.hooks))
 
+    # =========================================================================
+    # NON-PUBLIC METHODS
+    # =========================================================================
+
+    def _addHook(self, name, hook, key):
+        """Add a hook function in the order given by its sort key."""
+        keys = self._hook_keys.setdefault(name, [])
+        hooks = self.hooks.setdefault(name, [])
+
+        idx = bisect.bisect(keys, key)
+
+        keys.insert(idx, key)
+        hooks.insert(idx, hook)
+
+    def _getHookStats(self, name, hook):
+        """Get the statistics for a hook function under a hook name."""
+        name_stats = self._stats.setdefault(name, {})
+
+        stats = name_stats.get(hook)
+
+        if stats is None:
+            stats = HookStats(name, hook)
+            name_stats[hook] = stats
+
+        return stats
+
+    def _getSortKey(self, priority):
+        """Get a key to sort a hook by.
+
+        Hooks with higher priorities are called first.  Hooks with the same
+        priority are called in the order they were registered.
+
+        """
+        key = (-priority, self._num_registered)
+
+        self._num_registered += 1
+
+        return key
+
+    def _importPendingHooks(self, name):
+        """Import the pending registry hook functions for a soho hook name."""
+        for key, function_path in self._pending.pop(name):
+            try:
+                hook = _importHookFunction(function_path)
+
+            except (AttributeError, ImportError, ValueError) as e:
+                from IFDapi import ray_comment
+
+                ray_comment(
+                    "Hook Error[{}]: Could not import {}: {}".format(
+                        name,
+                        function_path,
+                        str(e)
+                    )
+                )
+
+                continue
+
+            self._addHook(name, hook, key)
+
+    def _loadRegistry(self):
+        """Load the hook registry files.
+
+        The hook modules are not imported until the hooks are first called.
+
+        """
+        import hou
+
+        self._registry_loaded = True
+
+        # Look for files containing hook definitions.
+        try:
+            files = hou.findFiles(_REGISTRY_FILE_PATH)
+
+        # If no files could be found then abort.
+        except hou.OperationFailed:
+            return
+
+        from IFDapi import ray_comment
+
+        for filepath in files:
+            # Invalid files are skipped so they don't prevent the ifd from
+            # being generated.
+            try:
+                with open(filepath) as handle:
+                    data = json.load(handle)
+
+                items = data.get("hooks", {}).items()
+
+            except (AttributeError, IOError, ValueError) as e:
+                ray_comment(
+                    "Hook Error: Could not load {}: {}".format(
+                        filepath,
+                        str(e)
+                    )
+                )
+
+                continue
+
+            for name, entries in items:
+                name = str(name)
+
+                if not isinstance(entries, list):
+                    entries = [entries]
+
+                for entry in entries:
+                    try:
+                        function_path = str(entry["function"])
+                        key = self._getSortKey(entry.get("priority", 0))
+
+                    except (AttributeError, KeyError, TypeError):
+                        ray_comment(
+                            "Hook Error[{}]: Invalid entry in {}: {}".format(
+                                name,
+                                filepath,
+                                repr(entry)
+                            )
+                        )
+
+                        continue
+
+                    self._pending.setdefault(name, []).append(
+                        (key, function_path)
+                    )
+
+    def _outputStats(self, name):
+        """Output the statistics if they are enabled and the hook name is the
+        one to output them after.
+
+        """
+        path = os.environ.get(STATS_ENV_VAR)
+
+        if not path:
+            return
+
+        if name != os.environ.get(STATS_HOOK_ENV_VAR, _DEFAULT_STATS_HOOK):
+            return
+
+        # Each ifd adds a record to the file so earlier frames are kept.
+        if path.endswith(".json"):
+            self.dumpStats(path, append=True)
+
+        else:
+            self.dumpStats()
+
+        # Each output only contains the calls since the last one.
+        self.clearStats()
+
     # =========================================================================
     # PROPERTIES
     # =========================================================================
@@ -29,21 +208,34 @@ class SohoHookManager(object):
         """Dictionary of hook functions grouped by hook name."""
         return self._hooks
 
+    @property
+    def stats(self):
+        """Dictionary of HookStats grouped by hook name and hook function."""
+        return self._stats
+
     # =========================================================================
     # METHODS
     # =========================================================================
 
     def callHook(self, name, *args, **kwargs):
         """Call all hook functions for a given soho hook name."""
-        from IFDapi import ray_comment
+        hooks = self.getHooks(name)
 
-        hooks = self.hooks.get(name, ())
+        handled = False
 
         for hook in hooks:
+            stats = self._getHookStats(name, hook)
+
+            start = time.time()
+
             try:
                 result = hook(*args, **kwargs)
 
             except Exception as e:
+                stats.addCall(time.time() - start, failed=True)
+
+                from IFDapi import ray_comment
+
                 ray_comment(
                     "Hook Error[{}]: {}".format(name, str(e))
                 )
@@ -55,16 +247,224 @@ class SohoHookManager(object):
                 )
 
             else:
+                stats.addCall(time.time() - start)
+
                 if result:
-                    return True
+                    handled = True
+                    break
 
-        return False
+        self._outputStats(name)
 
-    def registerHook(self, name, hook):
-        """Register a hook function for a given soho hook name."""
-        hooks = self.hooks.setdefault(name, [])
+        return handled
+
+    def clearStats(self):
+        """Clear all hook statistics."""
+        self._stats.clear()
+
+    def dumpStats(self, path=None, append=False):
+        """Output the hook statistics.
+
+        If a path is passed the statistics are written to it as json,
+        otherwise they are written to the ifd as a comment block.  When
+        appending, the file contains a list of the statistics of each output
+        and a missing or unreadable file is started again.
+
+        """
+        data = self.getStatsData()
+
+        if path is not None:
+            if append:
+                data = _readStatsRecords(path) + [data]
+
+            with open(path, 'w') as handle:
+                json.dump(data, handle, indent=4, sort_keys=True)
+
+            return
+
+        from IFDapi import ray_comment
+
+        lines = ["Soho Hook Statistics:"]
+
+        for name in sorted(data):
+            lines.append("  {}".format(name))
+
+            for function_name in sorted(data[name]):
+                function_data = data[name][function_name]
+
+                lines.append(
+                    "    {}: calls={} exceptions={} total={:0.6f}s "
+                    "max={:0.6f}s".format(
+                        function_name,
+                        function_data["calls"],
+                        function_data["exceptions"],
+                        function_data["total_time"],
+                        function_data["max_time"],
+                    )
+                )
+
+        ray_comment("\n# ".join(lines))
+
+    def getHooks(self, name):
+        """Get the hook functions for a soho hook name, importing any pending
+        registry hooks for it.
+
+        """
+        if not self._registry_loaded:
+            self._loadRegistry()
+
+        if name in self._pending:
+            self._importPendingHooks(name)
+
+        return self.hooks.get(name, ())
+
+    def getStatsData(self):
+        """Get a dictionary of hook statistics grouped by hook name and
+        function name.
+
+        """
+        data = {}
+
+        for name, name_stats in self.stats.iteritems():
+            name_data = data.setdefault(name, {})
+
+            for stats in name_stats.itervalues():
+                name_data[stats.function_name] = stats.getData()
+
+        return data
+
+    def registerHook(self, name, hook, priority=0):
+        """Register a hook function for a given soho hook name.
+
+        Hooks with higher priorities are called first.
+
+        """
+        self._addHook(name, hook, self._getSortKey(priority))
+
+# =============================================================================
+
+
+class HookStats(object):
+    """This class records call statistics for a hook function."""
+
+    def __init__(self, name, hook):
+        self._calls = 0
+        self._exceptions = 0
+        self._max_time = 0.0
+        self._name = name
+        self._total_time = 0.0
+
+        self._function_name = "{}.{}".format(
+            getattr(hook, "__module__", None),
+            getattr(hook, "__name__", repr(hook))
+        )
+
+    def __repr__(self):
+        return "<HookStats {} {} ({} calls)>".format(
+            self.name,
+            self.function_name,
+            self.calls
+        )
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def calls(self):
+        """The number of times the function was called."""
+        return self._calls
+
+    @property
+    def exceptions(self):
+        """The number of times the function raised an exception."""
+        return self._exceptions
+
+    @property
+    def function_name(self):
+        """The full name of the hook function."""
+        return self._function_name
+
+    @property
+    def max_time(self):
+        """The longest time of a single call."""
+        return self._max_time
+
+    @property
+    def name(self):
+        """The hook name."""
+        return self._name
+
+    @property
+    def total_time(self):
+        """The cumulative time of all calls."""
+        return self._total_time
+
+    # =========================================================================
+    # METHODS
+    # =========================================================================
+
+    def addCall(self, duration, failed=False):
+        """Record a call of the function."""
+        self._calls += 1
+        self._total_time += duration
+
+        if duration > self._max_time:
+            self._max_time = duration
+
+        if failed:
+            self._exceptions += 1
+
+    def getData(self):
+        """Get a dictionary representing the statistics."""
+        return {
+            "calls": self.calls,
+            "exceptions": self.exceptions,
+            "max_time": self.max_time,
+            "total_time": self.total_time,
+        }
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _importHookFunction(function_path):
+    """Import a hook function from a 'module:function' path.
+
+    The function may be an attribute of an object in the module, for example
+    'module:Class.function'.
+
+    """
+    module_name, function_name = function_path.split(':')
+
+    hook = importlib.import_module(module_name)
+
+    for attr in function_name.split('.'):
+        hook = getattr(hook, attr)
+
+    return hook
+
+
+def _readStatsRecords(path):
+    """Read the list of statistics records from a json file.
+
+    Returns an empty list if the file doesn't exist or can't be read.  A file
+    containing a single set of statistics is returned as a list of it.
+
+    """
+    try:
+        with open(path) as handle:
+            records = json.load(handle)
+
+    except (IOError, ValueError):
+        return []
+
+    if isinstance(records, dict):
+        records = [records]
+
+    elif not isinstance(records, list):
+        return []
 
-        hooks.append(hook)
+    return records
 
 # =============================================================================
 # FUNCTIONS
@@ -644,6 +644,8 @@ class EditAOVDialog(_BaseAOVDialog):
         aov_file.replaceAOV(self.aov)
         aov_file.writeToFile()
 
+        manager.MANAGER.updateAOV(self.aov)
+
         self.aovUpdatedSignal.emit(self.aov)
 
         return super(EditAOVDialog, self).accept()
@@ -1045,6 +1047,8 @@ class EditGroupDialog(_BaseGroupDialog):
         aov_file.replaceGroup(group)
         aov_file.writeToFile()
 
+        manager.MANAGER.updateGroup(group)
+
         self.groupUpdatedSignal.emit(group)
 
         return super(EditGroupDialog, self).accept()
@@ -248,6 +248,14 @@ class AOVNode(AOVBaseNode):
             lines.append("Light Mask: {0}".format(aov.lightexport_scope))
             lines.append("Light Selection: {0}".format(aov.lightexport_select))
 
+            if aov.lightexport == "per-cluster":
+                lines.append(
+                    "Cluster By: {0}".format(aov.lightexport_cluster_by)
+                )
+                lines.append(
+                    "Maximum Clusters: {0}".format(aov.lightexport_clusters)
+                )
+
         if aov.comment:
             lines.append("\nComment: {0}".format(aov.comment))
 
@@ -632,19 +640,11 @@ class AOVSelectModel(BaseAOVTreeModel):
 
         # Check to see if an AOV of the same name already exists.  If it does
         # then we want to just update the internal item for the node.
-        for row, child in enumerate(parentNode.children):
+        for child in parentNode.children:
             # Check the child's AOV against the one to be added.
             if child.aov == aov:
                 # Update the internal item.
-                child.aov = aov
-
-                existing_index = self.index(row, 0, index)
-
-                # Signal the internal data changed.
-                self.dataChanged.emit(
-                    existing_index,
-                    existing_index
-                )
+                self.updateAOV(aov)
 
                 # We're done here.
                 break
@@ -669,19 +669,11 @@ class AOVSelectModel(BaseAOVTreeModel):
 
         # Check to see if an AOV Group of the same name already exists.  If it
         # does then we want to just update the internal item for the node.
-        for row, child in enumerate(parentNode.children):
+        for child in parentNode.children:
             # Check the child's group against the one to be added.
             if child.group == group:
-                # Update the internal item.
-                child.group = group
-
-                existing_index = self.index(row, 0, index)
-
-                # Signal the internal data changed.
-                self.dataChanged.emit(
-                    existing_index,
-                    existing_index
-                )
+                # Update the internal item and its members.
+                self.updateGroup(group)
 
                 # We're done here.
                 break
@@ -769,8 +761,31 @@ class AOVSelectModel(BaseAOVTreeModel):
 
                 break
 
+    def updateAOV(self, aov):
+        """Update the AOV of the node with the same name."""
+        index = self.findNamedFolder("AOVs")
+
+        parentNode = self.getNode(index)
+
+        for row, child in enumerate(parentNode.children):
+            if child.aov == aov:
+                # Update the internal item.  The AOV may be a new object with
+                # the same name.
+                child.aov = aov
+
+                existing_index = self.index(row, 0, index)
+
+                # Signal the internal data changed.
+                self.dataChanged.emit(
+                    existing_index,
+                    existing_index
+                )
+
+                # We're done here.
+                break
+
     def updateGroup(self, group):
-        """Update the members of a group.
+        """Update a group and its members.
 
         This works by removing all existing AOVNodes and adding them back
         based on the new group membership.
@@ -786,20 +801,33 @@ class AOVSelectModel(BaseAOVTreeModel):
             if child.group == group:
                 child_index = self.index(row, 0, index)
 
+                # Update the internal item.  The group may be a new object
+                # with the same name.
+                child.group = group
+
                 # Remove all the existing AOV nodes.
-                self.beginRemoveRows(child_index, 0, len(child.children)-1)
+                if child.children:
+                    self.beginRemoveRows(
+                        child_index,
+                        0,
+                        len(child.children) - 1
+                    )
 
-                child.removeAllChildren()
+                    child.removeAllChildren()
 
-                self.endRemoveRows()
+                    self.endRemoveRows()
 
                 # Add all the AOVs from the updated group.
-                self.beginInsertRows(child_index, 0, len(group.aovs) - 1)
+                if group.aovs:
+                    self.beginInsertRows(child_index, 0, len(group.aovs) - 1)
+
+                    for aov in group.aovs:
+                        AOVNode(aov, child)
 
-                for aov in group.aovs:
-                    AOVNode(aov, child)
+                    self.endInsertRows()
 
-                self.endInsertRows()
+                # Signal the internal data changed.
+                self.dataChanged.emit(child_index, child_index)
 
                 # We're done here.
                 break
@@ -1101,6 +1129,13 @@ class AOVInfoTableModel(InfoTableModel):
             self._titles.append("Light Selection")
             self._values.append(aov.lightexport_select)
 
+            if aov.lightexport == "per-cluster":
+                self._titles.append("Cluster By")
+                self._values.append(aov.lightexport_cluster_by)
+
+                self._titles.append("Maximum Clusters")
+                self._values.append(aov.lightexport_clusters)
+
         if aov.priority > -1:
             self._titles.append("Priority")
             self._values.append(aov.priority)
@@ -19,6 +19,7 @@ LIGHTEXPORT_MENU_ITEMS = (
     ("per-light", "Export variable for each light"),
     ("single", "Merge all lights into single channel"),
     ("per-category", "Export variable for each category"),
+    ("per-cluster", "Export variable for each cluster of lights"),
 )
 
 PFILTER_MENU_ITEMS = (
@@ -11,11 +11,22 @@ from PySide import QtCore, QtGui
 # Houdini Toolbox Imports
 from ht.sohohooks.aovs.aov import ALLOWABLE_VALUES
 from ht.sohohooks.aovs.aov import AOV, AOVGroup, IntrinsicAOVGroup
+from ht.sohohooks.aovs.estimate import estimateAOVs
 from ht.ui.aovs import uidata
 
 # Houdini Imports
 import hou
 
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The resolution to use when no camera resolution is available.
+_DEFAULT_RESOLUTION = (640, 480)
+
+# Object node types which are lights.
+_LIGHT_TYPE_NAMES = ("ambient", "envlight", "hlight", "indirectlight")
+
 # =============================================================================
 # CLASSES
 # =============================================================================
@@ -43,6 +54,14 @@ class AOVViewerInterface(QtCore.QObject):
 # NON-PUBLIC FUNCTIONS
 # =============================================================================
 
+def _findLightNodes():
+    """Find all light object nodes."""
+    return [
+        node for node in hou.node("/obj").allSubChildren()
+        if node.type().name().split("::")[0] in _LIGHT_TYPE_NAMES
+    ]
+
+
 def _getItemMenuIndex(items, item):
     """Function to determine which index an item represents."""
     idx = 0
@@ -94,6 +113,9 @@ def applyToNodeAsParms(node, aovs):
 
     node.parm("vm_numaux").set(num_aovs)
 
+    # AOVs whose light exports can't be set on the node.
+    skipped = []
+
     for idx, aov in enumerate(aovs, 1):
         node.parm("vm_variable_plane{}".format(idx)).set(aov.variable)
         node.parm("vm_vextype_plane{}".format(idx)).set(aov.vextype)
@@ -117,12 +139,25 @@ def applyToNodeAsParms(node, aovs):
         if aov.componentexport:
             node.parm("vm_componentexport{}".format(idx)).set(True)
 
-        if aov.lightexport is not None:
+        # Mantra nodes don't support clustered light exports since the
+        # clusters are only built when the ifd is generated.  The plane is
+        # added without a light export.
+        if aov.lightexport == "per-cluster":
+            skipped.append(aov.variable)
+
+        elif aov.lightexport is not None:
             menu_idx = ALLOWABLE_VALUES["lightexport"].index(aov.lightexport)
             node.parm("vm_lightexport{}".format(idx)).set(menu_idx)
             node.parm("vm_lightexport_scope{}".format(idx)).set(aov.lightexport_scope)
             node.parm("vm_lightexport_select{}".format(idx)).set(aov.lightexport_select)
 
+    if skipped:
+        hou.ui.displayMessage(
+            "Per-cluster light exports cannot be set as parameters and were "
+            "not exported for: {}".format(", ".join(skipped)),
+            severity=hou.severityType.Warning
+        )
+
 
 def buildAOVsFromMultiparm(node):
     """Build a list of AOVs from a Mantra node's multiparm."""
@@ -164,6 +199,40 @@ def buildAOVsFromMultiparm(node):
     return aovs
 
 
+def estimateElements(elements, node=None):
+    """Estimate the cost of a list of elements when rendered by a Mantra
+    node.
+
+    Light exports are expanded using the lights and light categories in the
+    scene.
+
+    """
+    aovs = flattenList(elements)
+
+    lights = _findLightNodes()
+
+    categories = set()
+
+    for light in lights:
+        parm = light.parm("categories")
+
+        if parm is not None:
+            categories.update(parm.eval().replace(',', ' ').split())
+
+    components = ()
+
+    if node is not None and node.parm("vm_exportcomponents") is not None:
+        components = node.evalParm("vm_exportcomponents").split()
+
+    return estimateAOVs(
+        sorted(aovs),
+        getNodeResolution(node),
+        num_lights=len(lights),
+        num_categories=max(len(categories), 1),
+        components=components
+    )
+
+
 def filePathIsValid(path):
     """Check if a file path is valid."""
     if path:
@@ -207,7 +276,7 @@ def flattenList(elements):
             aovs.add(element)
 
         else:
-            for aov in element.aovs:
+            for aov in element.flattened_aovs:
                 aovs.add(aov)
 
     return aovs
@@ -253,6 +322,35 @@ def getLightExportMenuIndex(lightexport):
     )
 
 
+def getNodeResolution(node):
+    """Get the resolution a Mantra node renders at."""
+    if node is None:
+        return _DEFAULT_RESOLUTION
+
+    # The camera path may be relative to the node.
+    camera = node.node(node.evalParm("camera"))
+
+    if camera is None:
+        return _DEFAULT_RESOLUTION
+
+    resolution = (camera.evalParm("resx"), camera.evalParm("resy"))
+
+    # The node can override the camera resolution.
+    if node.parm("override_camerares") is not None and \
+       node.evalParm("override_camerares"):
+        fraction = node.evalParm("res_fraction")
+
+        if fraction == "specific":
+            resolution = tuple(node.evalParmTuple("res_override"))
+
+        else:
+            resolution = tuple(
+                [int(value * float(fraction)) for value in resolution]
+            )
+
+    return resolution
+
+
 def getQuantizeMenuIndex(quantize):
     """Find the menu index of the quantize value."""
     return _getItemMenuIndex(
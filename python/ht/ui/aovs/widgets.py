@@ -52,6 +52,8 @@ class AOVManagerWidget(QtGui.QWidget):
         manager.MANAGER.interface.aovRemovedSignal.connect(self.select_widget.aov_tree.removeAOV)
         manager.MANAGER.interface.groupAddedSignal.connect(self.select_widget.aov_tree.insertGroup)
         manager.MANAGER.interface.groupRemovedSignal.connect(self.select_widget.aov_tree.removeGroup)
+        manager.MANAGER.interface.aovUpdatedSignal.connect(self.select_widget.aov_tree.updateAOV)
+        manager.MANAGER.interface.groupUpdatedSignal.connect(self.select_widget.aov_tree.updateGroup)
 
         self.to_add_widget.tree.model().sourceModel().insertedItemsSignal.connect(
             self.select_widget.markItemsInstalled
@@ -596,6 +598,10 @@ class AOVSelectTreeWidget(QtGui.QTreeView):
         if nodes:
             self.uninstallItemsSignal.emit(nodes)
 
+    def updateAOV(self, aov):
+        """Update an AOV in the model."""
+        self.model().sourceModel().updateAOV(aov)
+
     def updateGroup(self, group):
         """Update a group's members."""
         self.model().sourceModel().updateGroup(group)
@@ -626,7 +632,7 @@ class AOVInstallBarWidget(QtGui.QWidget):
         )
         self.reload.setIconSize(QtCore.QSize(14, 14))
         self.reload.setMaximumSize(QtCore.QSize(20, 20))
-        self.reload.setToolTip("Refresh the tree display.")
+        self.reload.setToolTip("Reload changed AOV files.")
         self.reload.setFlat(True)
 
         # =====================================================================
@@ -945,8 +951,12 @@ class AOVSelectWidget(QtGui.QWidget):
         self.aov_tree.markItemsUninstalled(items)
 
     def reload(self):
-        """Reinitialize the tree from the manager."""
-        self.aov_tree.initFromManager()
+        """Reload any changed definition files.
+
+        The tree is updated by the manager's signals.
+
+        """
+        manager.MANAGER.reloadChanged()
 
     def updateToolButtons(self):
         """Enable toolbar buttons based on node selection."""
@@ -1449,6 +1459,19 @@ class AOVsToAddWidget(QtGui.QWidget):
 
         # =====================================================================
 
+        # Estimated memory and output size of the AOVs.
+        self.estimate_label = QtGui.QLabel()
+        layout.addWidget(self.estimate_label)
+
+        # Estimating requires finding the lights in the scene so changes made
+        # together, such as installing a group, only update it once.
+        self._estimate_timer = QtCore.QTimer(self)
+        self._estimate_timer.setSingleShot(True)
+        self._estimate_timer.setInterval(0)
+        self._estimate_timer.timeout.connect(self.updateEstimate)
+
+        # =====================================================================
+
         # Tool bar
         self.toolbar = AOVsToAddToolBar(parent=self)
         layout.addWidget(self.toolbar)
@@ -1525,6 +1548,8 @@ class AOVsToAddWidget(QtGui.QWidget):
         self.toolbar.new_group_button.setEnabled(False)
         self.toolbar.clear_button.setEnabled(False)
 
+        self._estimate_timer.start()
+
         self.updateEnabledSignal.emit()
 
     def dataUpdatedHandler(self, index, start, end):
@@ -1536,6 +1561,8 @@ class AOVsToAddWidget(QtGui.QWidget):
         self.toolbar.new_group_button.setEnabled(enable)
         self.toolbar.clear_button.setEnabled(enable)
 
+        self._estimate_timer.start()
+
         self.updateEnabledSignal.emit()
 
     def installItems(self, items):
@@ -1578,6 +1605,21 @@ class AOVsToAddWidget(QtGui.QWidget):
             if index is not None:
                 model.removeIndex(index)
 
+    def updateEstimate(self):
+        """Update the estimated cost of the AOVs to apply."""
+        elements = self.tree.getElementsToAdd()
+
+        if not elements:
+            self.estimate_label.clear()
+            self.estimate_label.setToolTip("")
+
+            return
+
+        estimate = utils.estimateElements(elements, self.node)
+
+        self.estimate_label.setText(estimate.getSummary())
+        self.estimate_label.setToolTip('\n'.join(estimate.getLines()))
+
 # =============================================================================
 # New Group Widgets
 # =============================================================================
@@ -0,0 +1,1054 @@
+#!/usr/bin/python
+"""This script is a unit test suite for the ht.sohohooks.aovs package.
+
+It uses the offline stand-ins for the hou and SOHO modules in
+python/benchmarks/stubs so it can be run with regular Python without
+Houdini.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import json
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+# Make the stand-in modules and the ht package available.
+_PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(_PYTHON_DIR, "benchmarks", "stubs"))
+sys.path.insert(1, _PYTHON_DIR)
+
+# Houdini Toolbox Imports
+from ht.sohohooks import manager as hook_manager
+from ht.sohohooks.aovs.aov import AOV, PlaneBatch, RecursiveGroupError, \
+    getLightExportCache, planeBatch
+from ht.sohohooks.aovs.aov import _buildCategoryIndex, _buildLightClusters, \
+    _clusterLightsByPosition
+from ht.sohohooks.aovs import manager
+from ht.sohohooks.aovs.estimate import estimateAOVs, estimatePlanes, \
+    formatSize
+from ht.sohohooks.aovs.validation import DefinitionError, DefinitionValidator
+
+# Stand-in Imports
+import hou
+import IFDapi
+import soho
+
+# =============================================================================
+# NON-PUBLIC FUNCTIONS
+# =============================================================================
+
+def _buildLight(name, categories=""):
+    """Build a stand-in light."""
+    return soho.SohoObject(
+        "/obj/{}".format(name),
+        {
+            "categories": categories,
+            "vm_export_prefix": name,
+            "vm_export_suffix": "",
+        }
+    )
+
+
+def _writeAOVs(cam, now=0.0):
+    """Run addAOVsToIfd and return the written ifd text."""
+    stdout = sys.stdout
+    sys.stdout = StringIO.StringIO()
+
+    try:
+        manager.AOVManager.addAOVsToIfd(None, cam, now)
+
+        return sys.stdout.getvalue()
+
+    finally:
+        sys.stdout = stdout
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class _CountingLight(soho.SohoObject):
+    """Stand-in light which counts parameter evaluations."""
+
+    def __init__(self, name, parms=None):
+        super(_CountingLight, self).__init__(name, parms)
+
+        self.num_evaluations = 0
+
+    def evalString(self, name, now, value):
+        self.num_evaluations += 1
+
+        return super(_CountingLight, self).evalString(name, now, value)
+
+    def getDefaultedString(self, name, now, default):
+        self.num_evaluations += 1
+
+        return super(_CountingLight, self).getDefaultedString(
+            name,
+            now,
+            default
+        )
+
+
+class _AOVFileTestCase(unittest.TestCase):
+    """Base class for tests reading AOV files from a temporary directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self._aov_path = os.environ.get("HT_AOV_PATH")
+        os.environ["HT_AOV_PATH"] = self.directory
+
+        self._stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+
+    def tearDown(self):
+        sys.stderr = self._stderr
+
+        if self._aov_path is None:
+            del os.environ["HT_AOV_PATH"]
+
+        else:
+            os.environ["HT_AOV_PATH"] = self._aov_path
+
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, name, data):
+        """Write data to a file in the directory, returning the path."""
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as handle:
+            json.dump(data, handle, indent=4)
+
+        return path
+
+
+class TestDefinitionValidator(unittest.TestCase):
+    """Test validating AOV definitions."""
+
+    def setUp(self):
+        self.validator = DefinitionValidator()
+
+    def test_lightExportClusters(self):
+        """The number of clusters must be a positive integer."""
+        definition = {
+            "variable": "N",
+            "vextype": "vector",
+            "lightexport": "per-cluster",
+        }
+
+        for clusters in (1, 8):
+            definition["lightexport_clusters"] = clusters
+
+            self.assertEqual(self.validator.validateAOV(definition), [])
+
+        for clusters in (0, -2, 2.5, "4", True, None):
+            definition["lightexport_clusters"] = clusters
+
+            self.assertEqual(
+                len(self.validator.validateAOV(definition)),
+                1,
+                clusters
+            )
+
+
+class TestEstimate(unittest.TestCase):
+    """Test estimating the cost of image planes."""
+
+    def test_estimateAOVs(self):
+        """Light and component exports are expanded."""
+        aovs = [
+            AOV({"variable": "N", "vextype": "vector"}),
+            AOV(
+                {
+                    "variable": "Pz",
+                    "vextype": "float",
+                    "quantize": "float",
+                }
+            ),
+            AOV(
+                {
+                    "variable": "direct",
+                    "vextype": "vector",
+                    "lightexport": "per-light",
+                }
+            ),
+            AOV(
+                {
+                    "variable": "indirect",
+                    "vextype": "vector",
+                    "lightexport": "per-category",
+                }
+            ),
+            AOV(
+                {
+                    "variable": "all",
+                    "vextype": "vector",
+                    "lightexport": "per-cluster",
+                    "lightexport_clusters": 4,
+                }
+            ),
+            AOV(
+                {
+                    "variable": "direct_comp",
+                    "vextype": "vector",
+                    "componentexport": True,
+                }
+            ),
+        ]
+
+        estimate = estimateAOVs(
+            aovs,
+            (100, 50),
+            num_lights=3,
+            num_categories=2,
+            components=("diffuse", "reflect")
+        )
+
+        self.assertEqual(
+            [(plane.channel, plane.count) for plane in estimate.planes],
+            [
+                ("N", 1),
+                ("Pz", 1),
+                ("direct", 3),
+                ("indirect", 2),
+                ("all", 3),
+                ("direct_comp_diffuse", 1),
+                ("direct_comp_reflect", 1),
+            ]
+        )
+
+        self.assertEqual(estimate.num_planes, 12)
+
+        # Every plane uses 4 byte framebuffer channels.  Only Pz is output
+        # at full float precision, the others are half.
+        self.assertEqual(estimate.total_memory, 5000 * (11 * 3 + 1) * 4)
+        self.assertEqual(
+            estimate.total_output_size,
+            5000 * (11 * 3 * 2 + 1 * 4)
+        )
+
+    def test_estimatePlanes(self):
+        """Each plane is estimated from its data."""
+        estimate = estimatePlanes(
+            [
+                {"channel": "N", "vextype": "vector"},
+                {"channel": "Pz", "vextype": "float", "quantize": "8"},
+                {"channel": "Cf", "vextype": "vector4", "quantize": "float"},
+            ],
+            [10, 10]
+        )
+
+        self.assertEqual(estimate.resolution, (10, 10))
+        self.assertEqual(
+            [plane.output_size for plane in estimate.planes],
+            [600, 100, 1600]
+        )
+        self.assertEqual(estimate.total_memory, 100 * 8 * 4)
+        self.assertEqual(
+            estimate.getSummary(),
+            "3 planes at 10x10: 3.1 KB framebuffer, 2.2 KB output"
+        )
+
+    def test_formatSize(self):
+        """Sizes are formatted using the largest unit under 1024."""
+        self.assertEqual(formatSize(0), "0.0 B")
+        self.assertEqual(formatSize(1023), "1023.0 B")
+        self.assertEqual(formatSize(1536), "1.5 KB")
+        self.assertEqual(formatSize(5 * 1024 ** 2), "5.0 MB")
+        self.assertEqual(formatSize(3 * 1024 ** 3), "3.0 GB")
+        self.assertEqual(formatSize(2 * 1024 ** 4), "2.0 TB")
+
+
+class TestGroupIncludes(_AOVFileTestCase):
+    """Test resolving groups which include other groups."""
+
+    def setUp(self):
+        super(TestGroupIncludes, self).setUp()
+
+        self.writeFile(
+            "definitions.json",
+            {
+                "definitions": [
+                    {"variable": "N", "vextype": "vector"},
+                    {"variable": "P", "vextype": "vector"},
+                ]
+            }
+        )
+
+    def test_cyclicIncludes(self):
+        """Groups including each other are loaded without the cycle."""
+        self.writeFile(
+            "groups.json",
+            {
+                "groups": {
+                    "g1": {"include": ["N", "@g2"]},
+                    "g2": {"include": ["P", "@g1"]},
+                    "g3": {"include": ["@g1"]},
+                }
+            }
+        )
+
+        aov_manager = manager.AOVManager()
+
+        self.assertEqual(
+            sorted(aov_manager.groups),
+            ["g1", "g2", "g3"]
+        )
+
+        errors = [
+            error for error in aov_manager.errors
+            if isinstance(error, RecursiveGroupError)
+        ]
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].names, ["g2", "g1", "g2"])
+
+        # Only the include closing the cycle is dropped.
+        g1 = aov_manager.groups["g1"]
+        g2 = aov_manager.groups["g2"]
+
+        self.assertEqual(list(g1.groups), [g2])
+        self.assertEqual(list(g2.groups), [])
+
+        self.assertEqual(
+            sorted([aov.variable for aov in g1.flattened_aovs]),
+            ["N", "P"]
+        )
+
+        g3 = aov_manager.groups["g3"]
+
+        self.assertEqual(
+            sorted([aov.variable for aov in g3.flattened_aovs]),
+            ["N", "P"]
+        )
+
+    def test_selfInclude(self):
+        """A group including itself is loaded without the include."""
+        self.writeFile(
+            "groups.json",
+            {"groups": {"g1": {"include": ["N", "@g1"]}}}
+        )
+
+        aov_manager = manager.AOVManager()
+
+        self.assertEqual(list(aov_manager.groups["g1"].groups), [])
+        self.assertEqual(len(aov_manager.errors), 1)
+
+    def test_reloadFixedInclude(self):
+        """Fixing a cyclic include removes the error."""
+        path = self.writeFile(
+            "groups.json",
+            {"groups": {"g1": {"include": ["N", "@g1"]}}}
+        )
+
+        aov_manager = manager.AOVManager()
+
+        self.assertEqual(len(aov_manager.errors), 1)
+
+        self.writeFile(
+            "groups.json",
+            {"groups": {"g1": {"include": ["N", "P"]}}}
+        )
+
+        # Make sure the change is detected on file systems with coarse
+        # modification times.
+        os.utime(path, (0, 0))
+
+        self.assertTrue(aov_manager.reloadChanged())
+        self.assertEqual(aov_manager.errors, [])
+
+
+class TestLightClusters(unittest.TestCase):
+    """Test grouping lights into clusters for 'per-cluster' exports."""
+
+    def test_clusterByCategory(self):
+        """Lights are clustered the same as 'per-category' exports."""
+        lights = (
+            ("/obj/key", "", None, "key"),
+            ("/obj/fill", "", None, "fill, rim"),
+            ("/obj/env", "", None, ""),
+            ("/obj/other", "", None, None),
+        )
+
+        self.assertEqual(
+            _buildLightClusters(lights, 8, "category"),
+            [
+                ("__none__", "/obj/env"),
+                ("fill", "/obj/fill"),
+                ("key", "/obj/key"),
+                ("rim", "/obj/fill"),
+            ]
+        )
+
+        self.assertEqual(
+            sorted(_buildLightClusters(lights, 8, "category")),
+            sorted(_buildCategoryIndex(lights))
+        )
+
+    def test_clusterByPosition(self):
+        """Lights near each other are clustered together."""
+        lights = tuple(
+            ("/obj/light{}".format(idx), "", None, None) for idx in range(4)
+        )
+
+        positions = ((0, 0, 0), (100, 0, 0), (1, 0, 0), (101, 0, 0))
+
+        self.assertEqual(
+            _buildLightClusters(lights, 2, "position", positions),
+            [
+                ("cluster0", "/obj/light0 /obj/light2"),
+                ("cluster1", "/obj/light1 /obj/light3"),
+            ]
+        )
+
+        # There are never more clusters than distinct positions.
+        self.assertEqual(
+            _clusterLightsByPosition(lights, ((5, 5, 5),) * 4, 8),
+            [("cluster0", "/obj/light0 /obj/light1 /obj/light2 /obj/light3")]
+        )
+
+    def test_clusterByPrefix(self):
+        """Lights are clustered by their prefix or name without trailing
+        numbers.
+
+        """
+        lights = (
+            ("/obj/key1", "", None, None),
+            ("/obj/fill", "", "fill_01", None),
+            ("/obj/key2", "", None, None),
+        )
+
+        self.assertEqual(
+            _buildLightClusters(lights, 8, "prefix"),
+            [("fill", "/obj/fill"), ("key", "/obj/key1 /obj/key2")]
+        )
+
+    def test_otherCluster(self):
+        """Lights which don't fit in the clusters are merged together."""
+        lights = tuple(
+            ("/obj/{}{}".format(prefix, idx), "", None, None)
+            for prefix, count in (("a", 3), ("b", 2), ("c", 1), ("d", 1))
+            for idx in range(count)
+        )
+
+        self.assertEqual(
+            _buildLightClusters(lights, 3, "prefix"),
+            [
+                ("a", "/obj/a0 /obj/a1 /obj/a2"),
+                ("b", "/obj/b0 /obj/b1"),
+                ("__other__", "/obj/c0 /obj/d0"),
+            ]
+        )
+
+        # Lights in several merged categories are only exported once.
+        lights = (
+            ("/obj/key", "", None, "key"),
+            ("/obj/fill", "", None, "fill rim"),
+        )
+
+        self.assertEqual(
+            _buildLightClusters(lights, 1, "category"),
+            [("__other__", "/obj/fill /obj/key")]
+        )
+
+
+class TestPlaneBatch(unittest.TestCase):
+    """Test skipping duplicate and conflicting planes."""
+
+    def setUp(self):
+        self.manager = manager.AOVManager()
+
+        for variable, channel in (("N", "N"), ("P", "P"), ("Pz", "P")):
+            self.manager.addAOV(
+                AOV(
+                    {
+                        "variable": variable,
+                        "vextype": "vector",
+                        "channel": channel,
+                    }
+                )
+            )
+
+        hou.session.aov_manager = self.manager
+
+        del soho.ERRORS[:]
+
+    def tearDown(self):
+        del hou.session.aov_manager
+
+        del soho.ERRORS[:]
+
+    def test_conflictingChannels(self):
+        """Planes using an existing channel are skipped and reported."""
+        cam = soho.SohoCamera("/obj/cam1", {}, [])
+        cam.parms["auto_aovs"] = "N P Pz"
+
+        text = _writeAOVs(cam)
+
+        self.assertEqual(text.count("ray_start plane"), 2)
+        self.assertIn('ray_property plane variable "P"', text)
+        self.assertNotIn('ray_property plane variable "Pz"', text)
+
+        self.assertEqual(len(soho.ERRORS), 1)
+        self.assertIn("'P' (P and Pz)", soho.ERRORS[0])
+
+        # Only the planes which were written are estimated.
+        self.assertIn("Automatic AOVs: 2 planes", text)
+
+    def test_duplicatePlanes(self):
+        """Identical planes are only written once, without an error."""
+        batch = PlaneBatch()
+
+        data = {"variable": "N", "channel": "N", "vextype": "vector"}
+
+        self.assertTrue(batch.checkPlane(data))
+        self.assertFalse(batch.checkPlane(dict(data)))
+
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch.conflicts, [])
+        self.assertEqual(batch.planes, [data])
+
+    def test_deferredPlanes(self):
+        """Planes are written in a single write if there are no hooks."""
+        self.manager.addAOV(
+            AOV(
+                {
+                    "variable": "Ce",
+                    "vextype": "vector",
+                    "quantize": "half",
+                    "sfilter": "alpha",
+                    "componentexport": True,
+                    "components": ["diffuse", "reflect"],
+                    "lightexport": "per-light",
+                }
+            )
+        )
+
+        cam = soho.SohoCamera("/obj/cam1", {}, [_buildLight("key")])
+        cam.parms["auto_aovs"] = "N Ce"
+
+        # Writing the planes through IFDapi gives the expected output.
+        hooks = hook_manager.getManager().hooks
+        hooks["post_defplane"] = [lambda *args: False]
+
+        try:
+            expected = _writeAOVs(cam)
+
+        finally:
+            del hooks["post_defplane"]
+
+        ray_property = IFDapi.ray_property
+
+        def fail(*args):
+            raise AssertionError("Plane written with IFDapi.")
+
+        IFDapi.ray_property = fail
+
+        try:
+            text = _writeAOVs(cam)
+
+        finally:
+            IFDapi.ray_property = ray_property
+
+        self.assertEqual(text, expected)
+        self.assertEqual(text.count("ray_start plane"), 3)
+
+    def test_nestedBatch(self):
+        """Nested batches share the outer batch."""
+        with planeBatch() as outer:
+            with planeBatch() as inner:
+                self.assertIs(inner, outer)
+
+
+class TestInvalidDefinitions(_AOVFileTestCase):
+    """Test loading files containing invalid definitions."""
+
+    def test_invalidDefinition(self):
+        """Invalid definitions are reported and the rest are loaded."""
+        path = self.writeFile(
+            "definitions.json",
+            {
+                "definitions": [
+                    {"variable": "N", "vextype": "vector"},
+                    {"variable": "P"},
+                    {"variable": "Pz", "vextype": "matrix"},
+                ],
+                "groups": {
+                    "g1": {"include": "N"},
+                    "g2": {"include": ["N"]},
+                }
+            }
+        )
+
+        aov_manager = manager.AOVManager()
+
+        self.assertEqual(sorted(aov_manager.aovs), ["N"])
+        self.assertEqual(sorted(aov_manager.groups), ["g2"])
+
+        errors = aov_manager.errors
+
+        self.assertEqual(len(errors), 3)
+
+        for error in errors:
+            self.assertIsInstance(error, DefinitionError)
+            self.assertEqual(error.path, path)
+
+        # The errors point at the line each definition starts on.
+        with open(path) as handle:
+            lines = handle.read().split('\n')
+
+        for error in errors:
+            self.assertIn(lines[error.line - 1].strip(), ('{', '"g1": {'))
+
+    def test_invalidFile(self):
+        """Files which can't be decoded are reported."""
+        path = os.path.join(self.directory, "definitions.json")
+
+        with open(path, 'w') as handle:
+            handle.write("{")
+
+        aov_manager = manager.AOVManager()
+
+        self.assertEqual(aov_manager.aovs, {})
+        self.assertEqual(len(aov_manager.errors), 1)
+        self.assertIsNone(aov_manager.errors[0].line)
+
+
+class TestLightExportCache(unittest.TestCase):
+    """Test caching light export planes between ifds."""
+
+    def setUp(self):
+        self.manager = manager.AOVManager()
+
+        for lightexport in ("per-light", "per-category"):
+            self.manager.addAOV(
+                AOV(
+                    {
+                        "variable": lightexport.replace('-', '_'),
+                        "vextype": "vector",
+                        "lightexport": lightexport,
+                    }
+                )
+            )
+
+        hou.session.aov_manager = self.manager
+
+    def tearDown(self):
+        del hou.session.aov_manager
+
+        hou.NODES.clear()
+
+    def _buildCamera(self, lights):
+        cam = soho.SohoCamera("/obj/cam1", {}, lights)
+        cam.parms["auto_aovs"] = "per_light per_category"
+
+        return cam
+
+    def _buildNodeLight(self, name, categories, time_dependent=()):
+        """Build a stand-in light with a node."""
+        light = _CountingLight(
+            "/obj/{}".format(name),
+            {
+                "categories": categories,
+                "vm_export_prefix": name,
+                "vm_export_suffix": "",
+            }
+        )
+
+        hou.NODES[light.getName()] = hou.Node(
+            light.getName(),
+            time_dependent
+        )
+
+        return light
+
+    def test_animatedLight(self):
+        """Lights with animated export parameters are evaluated for each
+        frame.
+
+        """
+        light = self._buildNodeLight("animated", "a", ["categories"])
+        cam = self._buildCamera([light])
+
+        _writeAOVs(cam, 1.0)
+        count = light.num_evaluations
+
+        _writeAOVs(cam, 1.0)
+        self.assertEqual(light.num_evaluations, count)
+
+        light.parms["categories"] = "b"
+
+        text = _writeAOVs(cam, 2.0)
+
+        self.assertGreater(light.num_evaluations, count)
+        self.assertIn("b_per_category", text)
+
+    def test_addedLight(self):
+        """Re-rendering the same frame after adding a light."""
+        lights = [_buildLight("key", "a")]
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("key_per_light", text)
+        self.assertNotIn("fill_per_light", text)
+
+        lights.append(_buildLight("fill", "b"))
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("key_per_light", text)
+        self.assertIn("fill_per_light", text)
+        self.assertIn("b_per_category", text)
+
+    def test_staticLight(self):
+        """Lights with nodes are only evaluated once if they don't change."""
+        light = self._buildNodeLight("static", "a")
+
+        _writeAOVs(self._buildCamera([light]), 1.0)
+        count = light.num_evaluations
+
+        text = _writeAOVs(self._buildCamera([light]), 1.0)
+        text += _writeAOVs(self._buildCamera([light]), 2.0)
+
+        self.assertEqual(light.num_evaluations, count)
+        self.assertIn("static_per_light", text)
+        self.assertIn("a_per_category", text)
+
+    def test_changedCategories(self):
+        """Re-rendering the same frame after changing light categories."""
+        lights = [_buildLight("key", "a")]
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("a_per_category", text)
+
+        lights[0].parms["categories"] = "c"
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("c_per_category", text)
+        self.assertNotIn("a_per_category", text)
+
+    def test_deletedNode(self):
+        """Lights are watched again if their node is deleted."""
+        light = self._buildNodeLight("deleted", "a")
+        cam = self._buildCamera([light])
+
+        _writeAOVs(cam)
+
+        node = hou.NODES[light.getName()]
+        node.sendEvent(hou.nodeEventType.BeingDeleted)
+
+        # A new node with the same name.
+        new_node = hou.Node(light.getName())
+        hou.NODES[light.getName()] = new_node
+
+        light.parms["categories"] = "b"
+
+        self.assertIn("b_per_category", _writeAOVs(cam))
+        self.assertEqual(len(new_node.eventCallbacks()), 1)
+
+        light.parms["categories"] = "c"
+        new_node.sendEvent(hou.nodeEventType.ParmTupleChanged)
+
+        self.assertIn("c_per_category", _writeAOVs(cam))
+
+    def test_editedLight(self):
+        """Lights are evaluated again after their node changes."""
+        light = self._buildNodeLight("edited", "a")
+        cam = self._buildCamera([light])
+
+        _writeAOVs(cam)
+        count = light.num_evaluations
+
+        # Each export parameter is evaluated once.
+        self.assertEqual(count, 3)
+
+        light.parms["categories"] = "b"
+        hou.NODES[light.getName()].sendEvent(
+            hou.nodeEventType.ParmTupleChanged
+        )
+
+        text = _writeAOVs(cam)
+
+        self.assertEqual(light.num_evaluations, count * 2)
+        self.assertIn("b_per_category", text)
+        self.assertNotIn("a_per_category", text)
+
+    def test_removedLight(self):
+        """Re-rendering the same frame after removing a light."""
+        lights = [_buildLight("key"), _buildLight("fill")]
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("fill_per_light", text)
+
+        del lights[1]
+
+        text = _writeAOVs(self._buildCamera(lights))
+
+        self.assertIn("key_per_light", text)
+        self.assertNotIn("fill_per_light", text)
+
+
+class TestPlanePlans(unittest.TestCase):
+    """Test sharing plane plans between drivers and ifds."""
+
+    def setUp(self):
+        self.manager = manager.AOVManager()
+
+        for variable, lightexport in (("N", None), ("Ce", "per-light")):
+            data = {"variable": variable, "vextype": "vector"}
+
+            if lightexport is not None:
+                data["lightexport"] = lightexport
+
+            self.manager.addAOV(AOV(data))
+
+        self.lights = [_buildLight("key")]
+
+    def _getPlan(self, aov_str="N Ce"):
+        cam = soho.SohoCamera("/obj/cam1", {}, self.lights)
+
+        getLightExportCache().expireLights()
+
+        return self.manager._getPlanePlan(aov_str, None, cam, 0.0)
+
+    def test_changedDefinitions(self):
+        """Plans are rebuilt when the definitions change."""
+        plan = self._getPlan()
+
+        self.manager.addAOV(
+            AOV({"variable": "N", "vextype": "vector", "channel": "Nn"})
+        )
+
+        new_plan = self._getPlan()
+
+        self.assertIsNot(new_plan, plan)
+        self.assertIn("Nn", [data["channel"] for data in new_plan.planes])
+
+    def test_changedLights(self):
+        """Plans are rebuilt when the exported lights change."""
+        plan = self._getPlan()
+
+        self.lights.append(_buildLight("fill"))
+
+        new_plan = self._getPlan()
+
+        self.assertIsNot(new_plan, plan)
+        self.assertEqual(len(new_plan.planes), len(plan.planes) + 1)
+
+    def test_sharedPlan(self):
+        """Plans are reused while nothing has changed."""
+        plan = self._getPlan()
+
+        self.assertIs(self._getPlan(), plan)
+        self.assertIsNot(self._getPlan("N"), plan)
+
+
+class TestReloadChanged(_AOVFileTestCase):
+    """Test reloading only the definition files which have changed."""
+
+    def setUp(self):
+        super(TestReloadChanged, self).setUp()
+
+        self.writeFile(
+            "a.json",
+            {
+                "definitions": [
+                    {"variable": "N", "vextype": "vector"},
+                    {"variable": "P", "vextype": "vector"},
+                ],
+                "groups": {
+                    "g1": {"include": ["N", "P"]},
+                }
+            }
+        )
+
+        self.path = self.writeFile(
+            "b.json",
+            {
+                "definitions": [
+                    {"variable": "Pz", "vextype": "float"},
+                ]
+            }
+        )
+
+        self.manager = manager.AOVManager()
+
+    def modifyFile(self, name, data):
+        """Rewrite a file so its change is detected."""
+        path = self.writeFile(name, data)
+
+        # Make sure the change is detected on file systems with coarse
+        # modification times.
+        os.utime(path, (0, 0))
+
+        return path
+
+    def test_changedAOV(self):
+        """Only AOVs defined in changed files are replaced."""
+        aovs = dict(self.manager.aovs)
+        g1 = self.manager.groups["g1"]
+
+        self.modifyFile(
+            "b.json",
+            {
+                "definitions": [
+                    {"variable": "Pz", "vextype": "float", "priority": 1},
+                    {"variable": "N", "vextype": "vector", "priority": 1},
+                ]
+            }
+        )
+
+        self.assertTrue(self.manager.reloadChanged())
+
+        self.assertIs(self.manager.aovs["P"], aovs["P"])
+        self.assertIsNot(self.manager.aovs["Pz"], aovs["Pz"])
+        self.assertEqual(self.manager.aovs["N"].path, self.path)
+
+        # Groups including the changed AOV use the new definition.
+        self.assertIs(self.manager.groups["g1"], g1)
+        members = [id(aov) for aov in g1.aovs]
+
+        self.assertIn(id(self.manager.aovs["N"]), members)
+        self.assertNotIn(id(aovs["N"]), members)
+
+    def test_removedFile(self):
+        """Definitions from removed files are removed."""
+        os.remove(self.path)
+
+        self.assertTrue(self.manager.reloadChanged())
+
+        self.assertNotIn("Pz", self.manager.aovs)
+        self.assertEqual(sorted(self.manager.aovs), ["N", "P"])
+
+    def test_removedOverride(self):
+        """Lower priority definitions are used when an override is
+        removed.
+
+        """
+        aov = self.manager.aovs["N"]
+
+        self.modifyFile(
+            "b.json",
+            {
+                "definitions": [
+                    {"variable": "N", "vextype": "vector", "priority": 1},
+                ]
+            }
+        )
+
+        self.assertTrue(self.manager.reloadChanged())
+        self.assertEqual(self.manager.aovs["N"].path, self.path)
+
+        self.modifyFile("b.json", {})
+
+        self.assertTrue(self.manager.reloadChanged())
+        self.assertIs(self.manager.aovs["N"], aov)
+        self.assertNotIn("Pz", self.manager.aovs)
+
+    def test_touchedFile(self):
+        """Files whose contents didn't change aren't merged again."""
+        aov = self.manager.aovs["Pz"]
+
+        os.utime(self.path, (0, 0))
+
+        self.assertFalse(self.manager.reloadChanged())
+        self.assertIs(self.manager.aovs["Pz"], aov)
+
+    def test_unchanged(self):
+        """Nothing is reloaded if no files have changed."""
+        aovs = dict(self.manager.aovs)
+
+        self.assertFalse(self.manager.reloadChanged())
+
+        for variable, aov in aovs.iteritems():
+            self.assertIs(self.manager.aovs[variable], aov)
+
+
+class TestWriteToFile(_AOVFileTestCase):
+    """Test writing AOV files read by the session manager."""
+
+    def setUp(self):
+        super(TestWriteToFile, self).setUp()
+
+        self.path = self.writeFile(
+            "definitions.json",
+            {"definitions": [{"variable": "N", "vextype": "vector"}]}
+        )
+
+        self.manager = manager.AOVManager()
+
+        hou.session.aov_manager = self.manager
+
+    def tearDown(self):
+        del hou.session.aov_manager
+
+        super(TestWriteToFile, self).tearDown()
+
+    def test_failedWrite(self):
+        """Definitions stay unsaved if the file can't be written."""
+        aov_file = manager.AOVFile(self.path)
+        aov_file.addAOV(AOV({"variable": "P", "vextype": "vector"}))
+
+        write = manager._writeFileAtomically
+
+        def fail(path, text):
+            raise IOError("Permission denied")
+
+        manager._writeFileAtomically = fail
+
+        try:
+            self.assertRaises(IOError, aov_file.writeToFile)
+
+        finally:
+            manager._writeFileAtomically = write
+
+        self.assertTrue(aov_file.dirty)
+        self.assertTrue(aov_file.writeToFile())
+        self.assertFalse(aov_file.dirty)
+
+    def test_writtenFileIsRecorded(self):
+        """The manager uses written definitions without reading the file."""
+        aov_file = manager.AOVFile(self.path)
+        aov_file.addAOV(AOV({"variable": "P", "vextype": "vector"}))
+
+        self.assertTrue(aov_file.writeToFile())
+
+        self.assertEqual(sorted(self.manager.aovs), ["N", "P"])
+
+        # The manager builds its own definitions.
+        self.assertIsNot(self.manager._readers[self.path], aov_file)
+        self.assertFalse(
+            [aov for aov in aov_file.aovs if aov is self.manager.aovs["P"]]
+        )
+
+        read = manager._readJsonData
+
+        def fail(path):
+            raise AssertionError("File was read.")
+
+        manager._readJsonData = fail
+
+        try:
+            self.assertFalse(self.manager.reloadChanged())
+
+        finally:
+            manager._readJsonData = read
+
+        self.assertEqual(sorted(self.manager.aovs), ["N", "P"])
+
+# =============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,885 @@
+#!/usr/bin/python
+"""This script is a unit test suite for the ht.nodes.colors package.
+
+It uses the offline stand-in for the hou module in python/benchmarks/stubs
+so it can be run with regular Python without Houdini.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import json
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+# Make the stand-in modules and the ht package available.
+_PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(_PYTHON_DIR, "benchmarks", "stubs"))
+sys.path.insert(1, _PYTHON_DIR)
+
+# Houdini Toolbox Imports
+import ht.nodes.colors
+from ht.nodes.colors import manager
+from ht.nodes.colors.colors import ColorEntry, EntryMatcher
+
+# Stand-in Imports
+import hou
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+_DEFAULT_COLOR = hou.Color((0.8, 0.8, 0.8))
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class _Node(object):
+    """Stand-in for hou.Node."""
+
+    def __init__(self, node_type, name, locked=False):
+        self._color = node_type.defaultColor()
+        self._deleted = False
+        self._locked = locked
+        self._name = name
+        self._type = node_type
+
+        # The number of times the color was set.
+        self.num_set = 0
+
+        node_type.nodes.append(self)
+
+    def color(self):
+        if self._deleted:
+            raise hou.ObjectWasDeleted()
+
+        return self._color
+
+    def destroy(self):
+        self._deleted = True
+
+    def isInsideLockedHDA(self):
+        return self._locked
+
+    def name(self):
+        return self._name
+
+    def setColor(self, color):
+        self._color = color
+        self.num_set += 1
+
+    def type(self):
+        return self._type
+
+
+class _NodeType(object):
+    """Stand-in for hou.NodeType."""
+
+    def __init__(self, category_name, name):
+        self._category = _NodeTypeCategory(category_name)
+        self._name = name
+
+        self.nodes = []
+
+    def category(self):
+        return self._category
+
+    def defaultColor(self):
+        return _DEFAULT_COLOR
+
+    def instances(self):
+        return tuple(self.nodes)
+
+    def isGenerator(self):
+        return False
+
+    def isManager(self):
+        return False
+
+    def name(self):
+        return self._name
+
+    def nameComponents(self):
+        return ("", "", self._name, "")
+
+
+class _Root(object):
+    """Stand-in for a hou.Node containing other nodes."""
+
+    def __init__(self, nodes):
+        self._nodes = nodes
+
+    def allSubChildren(self):
+        return tuple(self._nodes)
+
+
+class _NodeTypeCategory(object):
+    """Stand-in for hou.NodeTypeCategory."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+# =============================================================================
+
+
+class _ColorTestCase(unittest.TestCase):
+    """Base class for tests using color files in a temporary directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.config_directory = os.path.join(self.directory, "colors")
+        os.mkdir(self.config_directory)
+
+        self._find_directories = hou.findDirectories
+        hou.findDirectories = lambda name: [self.config_directory]
+
+        self._pref_dir = os.environ.get("HOUDINI_USER_PREF_DIR")
+        os.environ["HOUDINI_USER_PREF_DIR"] = self.directory
+
+        manager._COMPILED_MAPPINGS.clear()
+
+    def tearDown(self):
+        hou.findDirectories = self._find_directories
+        hou.UI_AVAILABLE = False
+        del hou.ui.callbacks[:]
+
+        if self._pref_dir is None:
+            del os.environ["HOUDINI_USER_PREF_DIR"]
+
+        else:
+            os.environ["HOUDINI_USER_PREF_DIR"] = self._pref_dir
+
+        manager._COMPILED_MAPPINGS.clear()
+
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, name, data):
+        """Write color data to a file in the config directory."""
+        path = os.path.join(self.config_directory, name)
+
+        with open(path, 'w') as handle:
+            json.dump(data, handle, indent=4)
+
+        return path
+
+
+class TestCompiledMappings(_ColorTestCase):
+    """Test caching compiled color mappings."""
+
+    def setUp(self):
+        super(TestCompiledMappings, self).setUp()
+
+        self.path = self.writeFile(
+            "colors.json",
+            {
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        self.null_type = _NodeType("Sop", "null")
+
+        self._build_rgb_color = manager._buildRGBColor
+        self._load = manager.json.load
+
+    def tearDown(self):
+        manager._buildRGBColor = self._build_rgb_color
+        manager.json.load = self._load
+
+        super(TestCompiledMappings, self).tearDown()
+
+    def _disableReading(self):
+        """Make reading a color file fail."""
+        def load(*args, **kwargs):
+            raise AssertionError("Color file was read.")
+
+        manager.json.load = load
+
+    def _getNodeColor(self, color_manager):
+        node = _Node(self.null_type, "null1")
+
+        color_manager.colorNode(node)
+
+        return node.color()
+
+    def test_cacheFile(self):
+        """New sessions use the compiled mappings in the cache file."""
+        manager.ColorManager()
+
+        manager._COMPILED_MAPPINGS.clear()
+
+        self._disableReading()
+
+        color_manager = manager.ColorManager()
+
+        self.assertEqual(
+            self._getNodeColor(color_manager),
+            hou.Color((1, 0, 0))
+        )
+
+    def test_changedFile(self):
+        """Changed files are read instead of using the compiled mappings."""
+        manager.ColorManager()
+
+        self.writeFile(
+            "colors.json",
+            {
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [0, 1, 0]}
+                    ]
+                }
+            }
+        )
+
+        # Make sure the change is detected on file systems with coarse
+        # modification times.
+        os.utime(self.path, (0, 0))
+
+        color_manager = manager.ColorManager()
+
+        self.assertEqual(
+            self._getNodeColor(color_manager),
+            hou.Color((0, 1, 0))
+        )
+
+    def test_corruptCacheFile(self):
+        """The files are read if the cache file can't be loaded."""
+        manager.ColorManager()
+
+        manager._COMPILED_MAPPINGS.clear()
+
+        with open(manager._getCachePath(), 'w') as handle:
+            handle.write("corrupt")
+
+        color_manager = manager.ColorManager()
+
+        self.assertEqual(
+            self._getNodeColor(color_manager),
+            hou.Color((1, 0, 0))
+        )
+
+    def test_sessionCache(self):
+        """Managers in the same session share the built mappings."""
+        manager.ColorManager()
+
+        os.remove(manager._getCachePath())
+
+        self._disableReading()
+
+        def build_rgb_color(rgb):
+            raise AssertionError("Color was built.")
+
+        manager._buildRGBColor = build_rgb_color
+
+        color_manager = manager.ColorManager()
+
+        self.assertEqual(
+            self._getNodeColor(color_manager),
+            hou.Color((1, 0, 0))
+        )
+
+    def test_updateAfterCacheFile(self):
+        """Updating after using the cache file only reads changed files."""
+        path = self.writeFile("other.json", {})
+
+        manager.ColorManager()
+
+        manager._COMPILED_MAPPINGS.clear()
+
+        color_manager = manager.ColorManager()
+
+        self.writeFile(
+            "other.json",
+            {
+                "nodes": {
+                    "Sop": [
+                        {"name": "box", "type": "RGB", "color": [0, 1, 0]}
+                    ]
+                }
+            }
+        )
+
+        os.utime(path, (0, 0))
+
+        read_paths = []
+
+        def load(handle, *args, **kwargs):
+            read_paths.append(handle.name)
+
+            return self._load(handle, *args, **kwargs)
+
+        manager.json.load = load
+
+        self.assertTrue(color_manager.update())
+
+        self.assertEqual(read_paths, [path])
+
+        self.assertEqual(
+            self._getNodeColor(color_manager),
+            hou.Color((1, 0, 0))
+        )
+
+
+class TestEntryMatcher(unittest.TestCase):
+    """Test matching names against color entries."""
+
+    def _buildMatcher(self, names):
+        entries = [
+            ColorEntry(name, hou.Color(), hou.colorType.RGB) for name in names
+        ]
+
+        return entries, EntryMatcher(entries)
+
+    def _findFirstMatch(self, entries, name):
+        """Find the first matching entry by checking each entry."""
+        for entry in entries:
+            if hou.patternMatch(entry.name, name):
+                return entry
+
+        return None
+
+    def test_chunkedPatterns(self):
+        """Patterns are matched in order across compiled expressions."""
+        names = ["x{}?".format(idx) for idx in range(150)]
+        names[120] = "y*"
+        names[140] = "y?"
+
+        entries, matcher = self._buildMatcher(names)
+
+        self.assertIs(matcher.match("x130a"), entries[130])
+        self.assertIs(matcher.match("yz"), entries[120])
+
+    def test_complexPatterns(self):
+        """Patterns with exclusions are matched in order."""
+        entries, matcher = self._buildMatcher(["geo", "* ^null", "n*"])
+
+        self.assertIs(matcher.match("geo"), entries[0])
+        self.assertIs(matcher.match("null"), entries[2])
+        self.assertIs(matcher.match("box"), entries[1])
+
+    def test_firstEntry(self):
+        """The first matching entry is used regardless of entry kind."""
+        entries, matcher = self._buildMatcher(["n*", "null", "*"])
+
+        self.assertIs(matcher.match("null"), entries[0])
+        self.assertIs(matcher.match("box"), entries[2])
+
+        entries, matcher = self._buildMatcher(["null", "n*"])
+
+        self.assertIs(matcher.match("null"), entries[0])
+        self.assertIs(matcher.match("nope"), entries[1])
+
+    def test_matchesEachEntry(self):
+        """Matching gives the same result as checking each entry."""
+        entries, matcher = self._buildMatcher(
+            [
+                "OUT*", "null", "*_geo ^box*", "?ox", "box", "file*",
+                "[ab]*", "*", "merge",
+            ]
+        )
+
+        for name in ("OUT_geo", "null", "box_geo", "fox", "box", "file1",
+                     "attrib", "merge", "", "a.b"):
+            self.assertIs(
+                matcher.match(name),
+                self._findFirstMatch(entries, name),
+                name
+            )
+
+    def test_noMatch(self):
+        """Names which match no entries return None."""
+        _, matcher = self._buildMatcher(["null", "OUT*", "* ^box"])
+
+        self.assertIsNone(matcher.match("box"))
+
+
+class TestQueuedNodes(_ColorTestCase):
+    """Test coloring created nodes when Houdini is idle."""
+
+    def setUp(self):
+        super(TestQueuedNodes, self).setUp()
+
+        self.writeFile(
+            "colors.json",
+            {
+                "names": {
+                    "Sop": [
+                        {"name": "OUT*", "type": "RGB", "color": [0, 0, 1]}
+                    ]
+                },
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        hou.UI_AVAILABLE = True
+
+        self.manager = manager.ColorManager()
+        self.null_type = _NodeType("Sop", "null")
+
+    def test_defaultColor(self):
+        """Nodes which still have their default color are colored."""
+        node = _Node(self.null_type, "null1")
+
+        self.manager.queueNode(node)
+
+        self.assertEqual(node.color(), _DEFAULT_COLOR)
+
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(node.color(), hou.Color((1, 0, 0)))
+        self.assertEqual(hou.ui.callbacks, [])
+
+    def test_deletedNode(self):
+        """Nodes deleted before Houdini is idle are skipped."""
+        node = _Node(self.null_type, "null1")
+
+        self.manager.queueNode(node)
+
+        node.destroy()
+
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(hou.ui.callbacks, [])
+
+    def test_manualColor(self):
+        """Nodes colored by a script before Houdini is idle are kept."""
+        node = _Node(self.null_type, "null1")
+
+        self.manager.queueNode(node)
+
+        node.setColor(hou.Color((0, 1, 0)))
+
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(node.color(), hou.Color((0, 1, 0)))
+
+    def test_renamedNode(self):
+        """Nodes colored by name before Houdini is idle are kept."""
+        node = _Node(self.null_type, "null1")
+
+        self.manager.queueNode(node)
+
+        node._name = "OUT_geo"
+        self.manager.colorNodeByName(node)
+
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(node.color(), hou.Color((0, 0, 1)))
+
+    def test_undoGroup(self):
+        """Queued nodes are colored in an undo group."""
+        del hou.undos.groups[:]
+
+        self.manager.queueNode(_Node(self.null_type, "null1"))
+
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(hou.undos.groups, ["Color nodes"])
+
+
+class TestRecolorScene(_ColorTestCase):
+    """Test coloring all the nodes in a scene."""
+
+    def setUp(self):
+        super(TestRecolorScene, self).setUp()
+
+        self.writeFile(
+            "colors.json",
+            {
+                "names": {
+                    "Sop": [
+                        {"name": "OUT*", "type": "RGB", "color": [0, 0, 1]}
+                    ]
+                },
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        self.manager = manager.ColorManager()
+        self.null_type = _NodeType("Sop", "null")
+        self.box_type = _NodeType("Sop", "box")
+
+    def test_lockedNodes(self):
+        """Nodes inside locked digital assets aren't colored."""
+        node = _Node(self.null_type, "null1", locked=True)
+
+        self.manager.recolorScene(_Root([node]))
+
+        self.assertEqual(node.color(), _DEFAULT_COLOR)
+
+    def test_recolorScene(self):
+        """Nodes are colored by type and then by name."""
+        nodes = [
+            _Node(self.null_type, "null1"),
+            _Node(self.null_type, "OUT_geo"),
+            _Node(self.box_type, "OUT_box"),
+            _Node(self.box_type, "box1"),
+        ]
+
+        self.manager.recolorScene(_Root(nodes))
+
+        self.assertEqual(
+            [node.color() for node in nodes],
+            [
+                hou.Color((1, 0, 0)),
+                hou.Color((0, 0, 1)),
+                hou.Color((0, 0, 1)),
+                _DEFAULT_COLOR,
+            ]
+        )
+
+    def test_unchangedColors(self):
+        """Nodes which already have their color aren't modified."""
+        nodes = [_Node(self.null_type, "null1"), _Node(self.box_type, "box1")]
+
+        self.manager.recolorScene(_Root(nodes))
+        self.manager.recolorScene(_Root(nodes))
+
+        self.assertEqual([node.num_set for node in nodes], [1, 0])
+
+
+class TestToolLocations(_ColorTestCase):
+    """Test building the table of tool Tab menu locations."""
+
+    def setUp(self):
+        super(TestToolLocations, self).setUp()
+
+        self.writeFile(
+            "colors.json",
+            {
+                "tools": {
+                    "Sop": [
+                        {"name": "Extras", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        hou.UI_AVAILABLE = True
+
+        self.manager = manager.ColorManager()
+
+        self.num_built = 0
+        self.tools = {}
+
+        self._build_tool_menu_locations = manager._buildToolMenuLocations
+        manager._buildToolMenuLocations = self._buildToolMenuLocations
+
+    def tearDown(self):
+        manager._buildToolMenuLocations = self._build_tool_menu_locations
+
+        super(TestToolLocations, self).tearDown()
+
+    def _buildToolMenuLocations(self):
+        self.num_built += 1
+
+        return self.tools.copy()
+
+    def test_addedTool(self):
+        """Tools added later are found once Houdini has been idle."""
+        self.manager.colorNode(_Node(_NodeType("Sop", "box"), "box1"))
+
+        self.tools["sop_null"] = ("Extras",)
+
+        hou.ui.runEventLoopCallbacks()
+
+        node = _Node(_NodeType("Sop", "null"), "null1")
+
+        self.manager.colorNode(node)
+
+        self.assertEqual(node.color(), hou.Color((1, 0, 0)))
+        self.assertEqual(self.num_built, 2)
+        self.assertEqual(hou.ui.callbacks, [self.manager._expireToolLocations])
+
+    def test_missingTools(self):
+        """The table is only rebuilt once for types without tools."""
+        nodes = [
+            _Node(_NodeType("Sop", name), name + "1")
+            for name in ("box", "null", "sphere")
+        ]
+
+        self.manager.colorNodes(nodes)
+
+        self.assertEqual(self.num_built, 1)
+        self.assertEqual(hou.ui.callbacks, [self.manager._expireToolLocations])
+
+
+class TestUpdate(_ColorTestCase):
+    """Test updating the color mappings when color files change."""
+
+    def setUp(self):
+        super(TestUpdate, self).setUp()
+
+        self.path = self.writeFile(
+            "colors.json",
+            {
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        self.manager = manager.ColorManager()
+
+        self.box_type = _NodeType("Sop", "box")
+        self.null_type = _NodeType("Sop", "null")
+
+        node_types = dict(
+            [(node_type.name(), node_type)
+             for node_type in (self.box_type, self.null_type)]
+        )
+
+        self._node_type = hou.nodeType
+        self._node_type_categories = hou.nodeTypeCategories
+
+        hou.nodeType = lambda category, name: node_types.get(name)
+        hou.nodeTypeCategories = lambda: {
+            "Sop": self.null_type.category()
+        }
+
+    def tearDown(self):
+        hou.nodeType = self._node_type
+        hou.nodeTypeCategories = self._node_type_categories
+
+        hou.NODES.clear()
+
+        super(TestUpdate, self).tearDown()
+
+    def modifyFile(self, entries):
+        """Rewrite the color file with node entries."""
+        self.writeFile("colors.json", {"nodes": {"Sop": entries}})
+
+        # Make sure the change is detected on file systems with coarse
+        # modification times.
+        os.utime(self.path, (0, 0))
+
+    def modifyNameEntries(self, entries):
+        """Rewrite the color file with the null entry and name entries."""
+        self.writeFile(
+            "colors.json",
+            {
+                "names": {"Sop": entries},
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        os.utime(self.path, (0, 0))
+
+    def test_addedNameColor(self):
+        """Nodes with their type color get a new name color."""
+        nodes = [
+            _Node(self.null_type, "null1"),
+            _Node(self.null_type, "null2"),
+            _Node(self.null_type, "other1")
+        ]
+
+        hou.NODES["/"] = _Root(nodes)
+
+        self.manager.colorNodes(nodes)
+
+        nodes[1].setColor(hou.Color((0, 0, 1)))
+
+        self.modifyNameEntries(
+            [{"name": "null*", "type": "RGB", "color": [0, 1, 0]}]
+        )
+
+        self.assertTrue(self.manager.update())
+
+        self.assertEqual(
+            [node.color() for node in nodes],
+            [hou.Color((0, 1, 0)), hou.Color((0, 0, 1)), hou.Color((1, 0, 0))]
+        )
+
+    def test_changedColor(self):
+        """Nodes with the previous type color are recolored."""
+        nodes = [
+            _Node(self.null_type, "null1"),
+            _Node(self.null_type, "null2")
+        ]
+
+        self.manager.colorNodes(nodes)
+
+        nodes[1].setColor(hou.Color((0, 0, 1)))
+
+        self.modifyFile(
+            [{"name": "null", "type": "RGB", "color": [0, 1, 0]}]
+        )
+
+        self.assertTrue(self.manager.update())
+
+        self.assertEqual(nodes[0].color(), hou.Color((0, 1, 0)))
+        self.assertEqual(nodes[1].color(), hou.Color((0, 0, 1)))
+
+    def test_invalidFile(self):
+        """Invalid files raise an error and the previous colors are kept."""
+        with open(self.path, 'w') as handle:
+            handle.write("{")
+
+        os.utime(self.path, (0, 0))
+
+        self.assertRaises(ValueError, self.manager.update)
+
+        # The files aren't read again until they change.
+        self.assertFalse(self.manager.update())
+
+        node = _Node(self.null_type, "null1")
+
+        self.manager.colorNode(node)
+
+        self.assertEqual(node.color(), hou.Color((1, 0, 0)))
+
+    def test_newColor(self):
+        """Nodes of types which didn't have a color are colored."""
+        node = _Node(self.box_type, "box1")
+
+        self.manager.colorNode(node)
+
+        self.modifyFile(
+            [
+                {"name": "null", "type": "RGB", "color": [1, 0, 0]},
+                {"name": "box", "type": "RGB", "color": [0, 1, 0]},
+            ]
+        )
+
+        self.assertTrue(self.manager.update())
+
+        self.assertEqual(node.color(), hou.Color((0, 1, 0)))
+
+    def test_removedNameColor(self):
+        """Nodes which no longer match a name entry get their type color."""
+        node = _Node(self.null_type, "null1")
+
+        hou.NODES["/"] = _Root([node])
+
+        self.modifyNameEntries(
+            [{"name": "null*", "type": "RGB", "color": [0, 1, 0]}]
+        )
+
+        self.manager.update()
+
+        self.assertEqual(node.color(), hou.Color((0, 1, 0)))
+
+        self.modifyNameEntries([])
+
+        self.assertTrue(self.manager.update())
+
+        self.assertEqual(node.color(), hou.Color((1, 0, 0)))
+
+    def test_removedColor(self):
+        """Nodes of types which no longer have a color get their default
+        color.
+
+        """
+        node = _Node(self.null_type, "null1")
+
+        self.manager.colorNode(node)
+
+        self.modifyFile([])
+
+        self.assertTrue(self.manager.update())
+
+        self.assertEqual(node.color(), _DEFAULT_COLOR)
+
+    def test_unchanged(self):
+        """Nothing is updated if the files haven't changed."""
+        node = _Node(self.null_type, "null1")
+
+        self.manager.colorNode(node)
+
+        self.assertFalse(self.manager.update())
+        self.assertEqual(node.num_set, 1)
+
+
+class TestWatchColorFiles(_ColorTestCase):
+    """Test updating the session color manager when color files change."""
+
+    def setUp(self):
+        super(TestWatchColorFiles, self).setUp()
+
+        self.path = self.writeFile(
+            "colors.json",
+            {
+                "nodes": {
+                    "Sop": [
+                        {"name": "null", "type": "RGB", "color": [1, 0, 0]}
+                    ]
+                }
+            }
+        )
+
+        hou.session.color_manager = manager.ColorManager()
+
+        self.null_type = _NodeType("Sop", "null")
+
+        self._stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+
+        ht.nodes.colors.startWatching(0)
+
+    def tearDown(self):
+        ht.nodes.colors.stopWatching()
+
+        sys.stderr = self._stderr
+
+        del hou.session.color_manager
+
+        super(TestWatchColorFiles, self).tearDown()
+
+    def test_invalidFile(self):
+        """Invalid files are reported once and the previous colors kept."""
+        with open(self.path, 'w') as handle:
+            handle.write("{")
+
+        # Make sure the change is detected on file systems with coarse
+        # modification times.
+        os.utime(self.path, (0, 0))
+
+        hou.ui.runEventLoopCallbacks()
+        hou.ui.runEventLoopCallbacks()
+
+        self.assertEqual(
+            sys.stderr.getvalue().count("Could not update node colors"),
+            1
+        )
+
+        node = _Node(self.null_type, "null1")
+
+        hou.session.color_manager.colorNode(node)
+
+        self.assertEqual(node.color(), hou.Color((1, 0, 0)))
+
+# =============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
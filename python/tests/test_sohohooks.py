@@ -0,0 +1,296 @@
+#!/usr/bin/python
+"""This script is a unit test suite for the ht.sohohooks.manager module.
+
+It uses the offline stand-ins for the hou and SOHO modules in
+python/benchmarks/stubs so it can be run with regular Python without
+Houdini.
+
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+# Standard Library Imports
+import json
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import unittest
+
+# Make the stand-in modules and the ht package available.
+_PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(_PYTHON_DIR, "benchmarks", "stubs"))
+sys.path.insert(1, _PYTHON_DIR)
+
+# Houdini Toolbox Imports
+from ht.sohohooks import manager
+
+# Stand-in Imports
+import hou
+
+# =============================================================================
+# GLOBALS
+# =============================================================================
+
+# The name of the module written for registry hooks.
+_MODULE_NAME = "ht_test_hooks"
+
+# =============================================================================
+# CLASSES
+# =============================================================================
+
+class TestHookStats(unittest.TestCase):
+    """Test the automatic output of hook statistics."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "stats.json")
+
+        self._environment = dict(os.environ)
+
+        os.environ[manager.STATS_ENV_VAR] = self.path
+        os.environ.pop(manager.STATS_HOOK_ENV_VAR, None)
+
+        self.manager = manager.SohoHookManager()
+        self.manager.registerHook("pre_frame", lambda *args: False)
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self._environment)
+
+        shutil.rmtree(self.directory)
+
+    def _renderIfd(self, num_calls):
+        """Simulate generating an ifd, returning the output statistics."""
+        for _ in range(num_calls):
+            self.manager.callHook("pre_frame")
+
+        self.manager.callHook("post_ifdGen")
+
+        with open(self.path) as handle:
+            return json.load(handle)
+
+    def test_invalidStatsFile(self):
+        """An unreadable statistics file is started again."""
+        with open(self.path, 'w') as handle:
+            handle.write("{")
+
+        data = self._renderIfd(1)
+
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["pre_frame"].values()[0]["calls"], 1)
+
+    def test_statsPerIfd(self):
+        """Each ifd appends a record of only the calls for that ifd."""
+        self._renderIfd(3)
+
+        data = self._renderIfd(2)
+
+        self.assertEqual(
+            [record["pre_frame"].values()[0]["calls"] for record in data],
+            [3, 2]
+        )
+
+        self.assertEqual(self.manager.stats, {})
+
+
+class TestHookRegistry(unittest.TestCase):
+    """Test registering hooks and loading hook registry files."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        # Make modules written to the directory importable.
+        sys.path.insert(0, self.directory)
+
+        self.registry_paths = []
+
+        self._find_files = hou.findFiles
+        hou.findFiles = lambda path: list(self.registry_paths)
+
+        self._stdout = sys.stdout
+        sys.stdout = StringIO.StringIO()
+
+        self.manager = manager.SohoHookManager()
+
+        # A record of the hooks which were called.
+        self.calls = []
+
+    def tearDown(self):
+        sys.stdout = self._stdout
+
+        hou.findFiles = self._find_files
+
+        sys.path.remove(self.directory)
+
+        sys.modules.pop(_MODULE_NAME, None)
+
+        shutil.rmtree(self.directory)
+
+    def _buildHook(self, label, result=False):
+        """Build a hook function which records its call."""
+        def hook(*args, **kwargs):
+            self.calls.append(label)
+
+            return result
+
+        return hook
+
+    def writeModule(self):
+        """Write a module with hook functions, returning the module name."""
+        path = os.path.join(self.directory, _MODULE_NAME + ".py")
+
+        with open(path, 'w') as handle:
+            handle.write(
+                "CALLS = []\n"
+                "\n"
+                "def hook(*args):\n"
+                "    CALLS.append('registry')\n"
+            )
+
+        return _MODULE_NAME
+
+    def writeRegistry(self, data, name="hooks.json"):
+        """Write a hook registry file."""
+        path = os.path.join(self.directory, name)
+
+        with open(path, 'w') as handle:
+            if isinstance(data, basestring):
+                handle.write(data)
+
+            else:
+                json.dump(data, handle)
+
+        self.registry_paths.append(path)
+
+        return path
+
+    def test_handled(self):
+        """Hooks after one returning True are not called."""
+        self.manager.registerHook("pre_frame", self._buildHook("a", True))
+        self.manager.registerHook("pre_frame", self._buildHook("b"))
+
+        self.assertTrue(self.manager.callHook("pre_frame"))
+        self.assertEqual(self.calls, ["a"])
+
+    def test_invalidEntry(self):
+        """Invalid registry entries are reported and skipped."""
+        module_name = self.writeModule()
+
+        self.writeRegistry(
+            {
+                "hooks": {
+                    "pre_frame": [
+                        {"priority": 1},
+                        "not an entry",
+                        {"function": module_name + ":hook", "priority": "x"},
+                        {"function": module_name + ":hook"},
+                    ]
+                }
+            }
+        )
+
+        self.manager.callHook("pre_frame")
+
+        self.assertEqual(sys.modules[module_name].CALLS, ["registry"])
+        self.assertEqual(sys.stdout.getvalue().count("Invalid entry"), 3)
+
+    def test_invalidFile(self):
+        """Files which can't be decoded are reported and skipped."""
+        module_name = self.writeModule()
+
+        bad_path = self.writeRegistry('{"hooks": {', "bad.json")
+        self.writeRegistry(["not", "an", "object"], "list.json")
+        self.writeRegistry(
+            {"hooks": {"pre_frame": [{"function": module_name + ":hook"}]}}
+        )
+
+        self.assertFalse(self.manager.callHook("pre_frame"))
+
+        self.assertEqual(sys.modules[module_name].CALLS, ["registry"])
+
+        output = sys.stdout.getvalue()
+
+        self.assertIn("Could not load {}".format(bad_path), output)
+        self.assertEqual(output.count("Could not load"), 2)
+
+    def test_invalidFunction(self):
+        """Functions which can't be imported are reported and skipped."""
+        self.writeRegistry(
+            {"hooks": {"pre_frame": [{"function": "ht_missing_module:hook"}]}}
+        )
+
+        self.manager.registerHook("pre_frame", self._buildHook("a"))
+
+        self.assertFalse(self.manager.callHook("pre_frame"))
+
+        self.assertEqual(self.calls, ["a"])
+        self.assertIn("Could not import ht_missing_module:hook",
+                      sys.stdout.getvalue())
+
+    def test_lazyImport(self):
+        """Registry hook modules are only imported when their hook is
+        called.
+
+        """
+        module_name = self.writeModule()
+
+        self.writeRegistry(
+            {"hooks": {"post_frame": [{"function": module_name + ":hook"}]}}
+        )
+
+        self.manager.callHook("pre_frame")
+
+        self.assertNotIn(module_name, sys.modules)
+
+        self.manager.callHook("post_frame")
+
+        self.assertEqual(sys.modules[module_name].CALLS, ["registry"])
+
+    def test_noHooks(self):
+        """Calling a hook without any functions does nothing."""
+        self.assertFalse(self.manager.callHook("pre_frame"))
+
+        self.assertEqual(self.manager.getHooks("pre_frame"), ())
+        self.assertEqual(sys.stdout.getvalue(), "")
+
+    def test_priorities(self):
+        """Hooks are called by priority and then registration order."""
+        module_name = self.writeModule()
+
+        self.writeRegistry(
+            {
+                "hooks": {
+                    "pre_frame": [
+                        {"function": module_name + ":hook", "priority": 5},
+                    ]
+                }
+            }
+        )
+
+        self.manager.registerHook("pre_frame", self._buildHook("low"), -1)
+        self.manager.registerHook("pre_frame", self._buildHook("first"))
+        self.manager.registerHook("pre_frame", self._buildHook("high"), 10)
+        self.manager.registerHook("pre_frame", self._buildHook("second"))
+
+        self.manager.callHook("pre_frame")
+
+        module = sys.modules[module_name]
+
+        self.assertEqual(module.CALLS, ["registry"])
+
+        # The registry hook is called after 'high' and before 'first'.
+        hooks = self.manager.getHooks("pre_frame")
+
+        self.assertEqual(len(hooks), 5)
+        self.assertIs(hooks[1], module.hook)
+        self.assertEqual(self.calls, ["high", "first", "second", "low"])
+
+# =============================================================================
+
+if __name__ == '__main__':
+    unittest.main()